@@ -18,13 +18,19 @@ class Settings(BaseSettings):
     
     # OpenAI
     openai_api_key: str = ""
+    openai_base_url: str = ""  # empty = api.openai.com
+    openai_max_concurrency: int = 4
+    openai_max_retries: int = 3
+    ai_context_token_budget: int = 600
     
     # Telegram
     telegram_bot_token: str = ""
     telegram_chat_id: str = ""
+    telegram_api_url: str = "https://api.telegram.org"
     
     # Weather
     weather_api_key: str = ""
+    weather_api_url: str = "https://api.openweathermap.org/data/2.5"
     default_city: str = "Warsaw"
     
     # CORS
@@ -36,6 +42,16 @@ class Settings(BaseSettings):
     # Timezone
     timezone: str = "Europe/Warsaw"
     
+    # Notes full-text search (Postgres text search config per UI language).
+    # Postgres ships no Ukrainian/Polish stemmers, so "simple" is the default;
+    # point these at installed hunspell configs (e.g. "ukrainian", "polish").
+    search_config_ua: str = "simple"
+    search_config_pl: str = "simple"
+    
+    # Note attachments (content-addressed local store)
+    attachments_dir: str = "data/attachments"
+    attachment_max_mb: int = 50
+    
     @property
     def cors_origins(self) -> List[str]:
         """Get CORS origins list."""
@@ -47,6 +63,11 @@ class Settings(BaseSettings):
             ])
         return origins
     
+    @property
+    def search_configs(self) -> dict:
+        """Text search config by UI language."""
+        return {"ua": self.search_config_ua, "pl": self.search_config_pl}
+    
     @property
     def database_url_sync(self) -> str:
         """Get sync database URL for Alembic migrations."""
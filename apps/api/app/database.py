@@ -33,7 +33,42 @@ def get_db():
         db.close()
 
 
+def dialect_insert(db, table):
+    """INSERT construct with ON CONFLICT support for the session's dialect."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def local_day(db, column):
+    """SQL expression for the calendar day of a timestamp column in the app timezone."""
+    from sqlalchemy import func
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date(func.timezone(settings.timezone, column))
+    return func.date(column)
+
+
 def init_db():
     """Initialize database tables."""
-    from app.models import task, calendar_event, finance, health, habit, goal, note, settings as settings_model
+    from sqlalchemy import inspect
+    from app.models import task, calendar_event, finance, health, habit, goal, note, settings as settings_model, ai_cache, notification
+    inspector = inspect(engine)
+    links_existed = inspector.has_table(note.NoteLink.__tablename__)
+    attachments_existed = inspector.has_table(note.NoteAttachment.__tablename__)
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        goal.ensure_goal_columns(connection)
+        calendar_event.ensure_calendar_indexes(connection)
+        note.ensure_notes_fts(connection)
+    
+    # Index links and attachments of notes written before their tables existed (once, on the start that creates each)
+    if not links_existed:
+        from app.services.note_links import backfill_note_links
+        with SessionLocal() as db:
+            backfill_note_links(db)
+    if not attachments_existed:
+        from app.services.note_attachments import backfill_note_attachments
+        with SessionLocal() as db:
+            backfill_note_attachments(db)
@@ -7,6 +7,8 @@ from fastapi.responses import JSONResponse
 from app.config import settings
 from app.database import init_db, engine, Base
 from app.services.scheduler import scheduler_service
+from app.services.reminder_dispatcher import reminder_dispatcher
+from app.services.openai_service import openai_service
 
 
 # Lifespan handler for startup/shutdown
@@ -24,11 +26,14 @@ async def lifespan(app: FastAPI):
     scheduler_service.start()
     scheduler_service.setup_notifications()
     print("Scheduler started")
+    reminder_dispatcher.start()
     
     yield
     
     # Shutdown
+    reminder_dispatcher.stop()
     scheduler_service.stop()
+    await openai_service.close()
     print("LifeHub API stopped")
 
 
@@ -92,7 +97,8 @@ from app.routers import (
     settings_router,
     dashboard_router,
     weather_router,
-    telegram_router
+    telegram_router,
+    analytics_router
 )
 
 # Mount all routers under /api prefix
@@ -107,6 +113,7 @@ app.include_router(notes_router, prefix="/api", dependencies=[Depends(verify_tok
 app.include_router(ai_router, prefix="/api", dependencies=[Depends(verify_token)])
 app.include_router(settings_router, prefix="/api", dependencies=[Depends(verify_token)])
 app.include_router(weather_router, prefix="/api", dependencies=[Depends(verify_token)])
+app.include_router(analytics_router, prefix="/api", dependencies=[Depends(verify_token)])
 app.include_router(telegram_router, prefix="/api")  # Telegram webhook needs to be public
 
 
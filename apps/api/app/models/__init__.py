@@ -4,9 +4,11 @@ from app.models.calendar_event import CalendarEvent
 from app.models.finance import Transaction, Budget, Subscription
 from app.models.health import HealthLog
 from app.models.habit import Habit, HabitLog
-from app.models.goal import Goal
-from app.models.note import Note
+from app.models.goal import Goal, GoalProgressSnapshot
+from app.models.note import Note, NoteLink, NoteAttachment
 from app.models.settings import UserSettings
+from app.models.ai_cache import AIResponse
+from app.models.notification import SentNotification
 
 __all__ = [
     "Task",
@@ -18,6 +20,11 @@ __all__ = [
     "Habit",
     "HabitLog",
     "Goal",
+    "GoalProgressSnapshot",
     "Note",
+    "NoteLink",
+    "NoteAttachment",
     "UserSettings",
+    "AIResponse",
+    "SentNotification",
 ]
@@ -0,0 +1,21 @@
+"""Cached AI responses."""
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class AIResponse(Base):
+    """LLM answer cached per (mode, prompt, context fingerprint) until `expires_at`."""
+    __tablename__ = "ai_response_cache"
+    
+    id = Column(Integer, primary_key=True)
+    key = Column(String(64), unique=True, nullable=False)  # sha256 hex
+    mode = Column(String(50), nullable=False)
+    response = Column(Text, nullable=False)
+    hits = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<AIResponse {self.mode}: {self.key[:12]}>"
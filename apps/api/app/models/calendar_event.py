@@ -1,6 +1,6 @@
 """Calendar event model."""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Enum, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Enum, JSON, Index, inspect
 from sqlalchemy.sql import func
 import enum
 
@@ -57,11 +57,65 @@ class CalendarEvent(Base):
     
     # External sync
     external_id = Column(String(255), nullable=True)  # For Google Calendar sync
-    ical_uid = Column(String(255), nullable=True)
+    ical_uid = Column(String(255), nullable=True, unique=True)  # Upsert key for iCal import
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    __table_args__ = (
+        # Portable index for the `start <= window_end AND end >= window_start` strategy
+        Index("ix_calendar_events_start_end", "start_time", "end_time"),
+        # Postgres: GiST over the event period so overlap (&&) lookups never scan the table
+        Index(
+            "ix_calendar_events_period",
+            func.tstzrange(start_time, func.coalesce(end_time, start_time), "[]"),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
+    
     def __repr__(self):
         return f"<CalendarEvent {self.id}: {self.title[:30]}>"
+
+
+def native_uid(event_id: int) -> str:
+    """iCal UID of an event created in the app (stored, so re-imports update it)."""
+    return f"{event_id}@lifehub"
+
+
+def ensure_calendar_indexes(connection):
+    """Bring a calendar_events table created by an older version up to the model.
+
+    Runs on every start, since `create_all` skips existing tables: the
+    period lookup indexes are created (after clamping legacy rows that
+    end before they start, which tstzrange rejects), native events get
+    the UID they are exported with, and the unique index that the
+    importer's ON CONFLICT (ical_uid) needs is created, keeping only the
+    newest row of any duplicated UID.
+    """
+    connection.exec_driver_sql("UPDATE calendar_events SET end_time = start_time WHERE end_time < start_time")
+    for index in CalendarEvent.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+    connection.exec_driver_sql(
+        "UPDATE calendar_events SET ical_uid = CAST(id AS VARCHAR(20)) || '@lifehub' "
+        "WHERE ical_uid IS NULL AND NOT EXISTS ("
+        "SELECT 1 FROM calendar_events other WHERE other.ical_uid = CAST(calendar_events.id AS VARCHAR(20)) || '@lifehub')"
+    )
+
+    inspector = inspect(connection)
+    uid_unique = any(
+        constraint["column_names"] == ["ical_uid"]
+        for constraint in inspector.get_unique_constraints(CalendarEvent.__tablename__)
+    ) or any(
+        index["unique"] and index["column_names"] == ["ical_uid"]
+        for index in inspector.get_indexes(CalendarEvent.__tablename__)
+    )
+    if not uid_unique:
+        connection.exec_driver_sql(
+            "DELETE FROM calendar_events WHERE ical_uid IS NOT NULL AND id NOT IN ("
+            "SELECT MAX(id) FROM calendar_events WHERE ical_uid IS NOT NULL GROUP BY ical_uid)"
+        )
+        connection.exec_driver_sql(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_calendar_events_ical_uid ON calendar_events (ical_uid)"
+        )
@@ -1,12 +1,16 @@
 """Goal tracking model."""
 from datetime import date, datetime
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Enum, Boolean, Numeric, JSON
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Enum, Boolean, Numeric, JSON, ForeignKey, Index, inspect
+from sqlalchemy.orm import column_property
 from sqlalchemy.sql import func
 import enum
 
 from app.database import Base
 
 
+DESCRIPTION_EXCERPT_LENGTH = 200
+
+
 class GoalType(str, enum.Enum):
     """Goal type enum."""
     SHORT_TERM = "short_term"  # Days to weeks
@@ -48,6 +52,9 @@ class Goal(Base):
     description = Column(Text, nullable=True)
     motivation = Column(Text, nullable=True)  # Why this goal matters
     
+    # Leading slice of description for list views, computed in SQL (loaded only when asked for)
+    description_excerpt = column_property(func.substr(description, 1, DESCRIPTION_EXCERPT_LENGTH), deferred=True)
+    
     # Classification
     type = Column(Enum(GoalType), default=GoalType.SHORT_TERM)
     category = Column(Enum(GoalCategory), default=GoalCategory.PERSONAL)
@@ -64,6 +71,7 @@ class Goal(Base):
     # Progress
     progress_percent = Column(Numeric(5, 2), default=0)  # 0-100
     progress_notes = Column(Text, nullable=True)
+    auto_progress = Column(Boolean, default=False)  # Derived from linked tasks + key results
     
     # Milestones/Subgoals as JSON
     milestones = Column(JSON, default=list)  # [{title, completed, date}]
@@ -84,3 +92,32 @@ class Goal(Base):
     
     def __repr__(self):
         return f"<Goal {self.id}: {self.title[:30]}>"
+
+
+class GoalProgressSnapshot(Base):
+    """Append-only history of goal progress values (never updated in place)."""
+    __tablename__ = "goal_progress_snapshots"
+    
+    id = Column(Integer, primary_key=True)
+    goal_id = Column(Integer, ForeignKey("goals.id", ondelete="CASCADE"), nullable=False)
+    progress_percent = Column(Numeric(5, 2), nullable=False)
+    source = Column(String(20), nullable=False)  # create, manual, update, auto
+    recorded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index("ix_goal_progress_snapshots_goal_recorded", "goal_id", "recorded_at"),
+    )
+    
+    def __repr__(self):
+        return f"<GoalProgressSnapshot {self.goal_id}: {self.progress_percent}%>"
+
+
+def ensure_goal_columns(connection):
+    """Add goal columns missing from a database created before they existed.
+
+    Runs on every start, since `create_all` never alters existing tables.
+    """
+    columns = {column["name"] for column in inspect(connection).get_columns(Goal.__tablename__)}
+    if "auto_progress" not in columns:
+        if_not_exists = "IF NOT EXISTS " if connection.dialect.name == "postgresql" else ""
+        connection.exec_driver_sql(f"ALTER TABLE goals ADD COLUMN {if_not_exists}auto_progress BOOLEAN DEFAULT FALSE")
@@ -1,12 +1,17 @@
 """Notes and journal model."""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Boolean, JSON, Index, ForeignKey, UniqueConstraint, literal_column
+from sqlalchemy.orm import column_property
 from sqlalchemy.sql import func
 import enum
 
+from app.config import settings
 from app.database import Base
 
 
+EXCERPT_LENGTH = 200
+
+
 class NoteType(str, enum.Enum):
     """Note type enum."""
     NOTE = "note"
@@ -17,6 +22,32 @@ class NoteType(str, enum.Enum):
     BOOKMARK = "bookmark"
 
 
+class NoteLinkKind(str, enum.Enum):
+    """Note link kind enum."""
+    NOTE = "note"  # [[Note title]]
+    TAG = "tag"  # #tag
+
+
+def _document(title, content, config: str):
+    """Weighted tsvector (title A, content B) for a Postgres text search config."""
+    regconfig = literal_column(f"'{config}'::regconfig")
+    return func.setweight(func.to_tsvector(regconfig, func.coalesce(title, literal_column("''"))), literal_column("'A'")).op("||")(
+        func.setweight(func.to_tsvector(regconfig, content), literal_column("'B'"))
+    )
+
+
+def _fts_indexes(title, content) -> tuple:
+    """Postgres GIN index per configured search language."""
+    return tuple(
+        Index(
+            f"ix_notes_fts_{config}",
+            _document(title, content, config),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql")
+        for config in sorted(set(settings.search_configs.values()))
+    )
+
+
 class Note(Base):
     """Note/journal entry model."""
     __tablename__ = "notes"
@@ -38,8 +69,8 @@ class Note(Base):
     is_pinned = Column(Boolean, default=False)
     is_starred = Column(Boolean, default=False)
     
-    # Attachments (v2)
-    attachments = Column(JSON, default=list)  # [{name, url, type}]
+    # Attachments (references only; files live in the attachment store)
+    attachments = Column(JSON, default=list)  # [{sha256, name, type, size, url}]
     
     # Links (for bookmarks)
     url = Column(String(1000), nullable=True)
@@ -54,6 +85,96 @@ class Note(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    # Leading slice of content for list views, computed in SQL (loaded only when asked for)
+    excerpt = column_property(func.substr(content, 1, EXCERPT_LENGTH), deferred=True)
+    
+    __table_args__ = _fts_indexes(title, content)
+    
     def __repr__(self):
         title = self.title or self.content[:30]
         return f"<Note {self.id}: {title}>"
+
+
+
+class NoteLink(Base):
+    """Outgoing link from a note's content to another note (by title) or a tag."""
+    __tablename__ = "note_links"
+    
+    id = Column(Integer, primary_key=True)
+    source_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(Enum(NoteLinkKind), nullable=False)
+    
+    # Normalized lookup key (casefolded title or tag) and the text as written
+    target = Column(String(500), nullable=False)
+    label = Column(String(500), nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("source_id", "kind", "target", name="uq_note_links_source_target"),
+        Index("ix_note_links_kind_target", "kind", "target"),
+    )
+    
+    def __repr__(self):
+        return f"<NoteLink {self.source_id} -> {self.kind.value}:{self.target}>"
+
+
+class NoteAttachment(Base):
+    """A note's reference to a stored attachment blob, so blob use is an indexed lookup."""
+    __tablename__ = "note_attachments"
+    
+    id = Column(Integer, primary_key=True)
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), nullable=False, index=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    
+    __table_args__ = (
+        UniqueConstraint("note_id", "sha256", name="uq_note_attachments_note_sha256"),
+    )
+    
+    def __repr__(self):
+        return f"<NoteAttachment {self.note_id} -> {self.sha256[:12]}>"
+
+
+def note_document(config: str):
+    """Note tsvector expression; matches the GIN index for `config`."""
+    return _document(Note.title, Note.content, config)
+
+
+# SQLite: external-content FTS5 table kept in sync by triggers
+NOTES_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        title, content, content='notes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE OF title, content ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+]
+
+
+def ensure_notes_fts(connection):
+    """Create the note search structures missing from an existing database.
+
+    Runs on every start, since `create_all` skips tables that already
+    exist: on SQLite it creates the FTS5 table and triggers (indexing all
+    notes if the table is new), on Postgres the GIN indexes.
+    """
+    if connection.dialect.name == "sqlite":
+        existed = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notes_fts'"
+        ).first() is not None
+        for statement in NOTES_FTS_DDL:
+            connection.exec_driver_sql(statement)
+        if not existed:
+            connection.exec_driver_sql("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+    elif connection.dialect.name == "postgresql":
+        for index in Note.__table__.indexes:
+            if index.name.startswith("ix_notes_fts_"):
+                index.create(connection, checkfirst=True)
@@ -0,0 +1,21 @@
+"""Claims on outgoing notifications."""
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class SentNotification(Base):
+    """One push that some worker has taken responsibility for sending.
+
+    Every worker runs the reminder dispatcher and the scheduler, so a push
+    is sent only by the worker whose insert of its `key` wins.
+    """
+    __tablename__ = "sent_notifications"
+    
+    id = Column(Integer, primary_key=True)
+    key = Column(String(255), unique=True, nullable=False)  # e.g. reminder:<event>:<occurrence>:<minutes>
+    claimed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<SentNotification {self.key}>"
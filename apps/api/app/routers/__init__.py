@@ -11,6 +11,7 @@ from app.routers.settings import router as settings_router
 from app.routers.dashboard import router as dashboard_router
 from app.routers.weather import router as weather_router
 from app.routers.telegram import router as telegram_router
+from app.routers.analytics import router as analytics_router
 
 __all__ = [
     "tasks_router",
@@ -25,4 +26,5 @@ __all__ = [
     "dashboard_router",
     "weather_router",
     "telegram_router",
+    "analytics_router",
 ]
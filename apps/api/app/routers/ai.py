@@ -1,14 +1,17 @@
 """AI Assistant API router."""
 # pyright: reportMissingImports=false
-from datetime import date, datetime, timedelta
+import json
+from datetime import date
 from typing import Optional, List
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.config import settings
 from app.services.openai_service import OpenAIService, get_openai_service
+from app.services.ai_cache import ai_cache
+from app.services.ai_context import get_user_context
 
 router = APIRouter(prefix="/ai", tags=["AI Assistant"])
 
@@ -30,50 +33,85 @@ class ChatResponse(BaseModel):
     """Chat response schema."""
     response: str
     mode: str
+    cached: bool = False
 
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
+    refresh: bool = False,
     db: Session = Depends(get_db),
     ai_service: OpenAIService = Depends(get_openai_service)
 ):
-    """Chat with AI assistant."""
+    """Chat with AI assistant (answers for cacheable modes are reused, see AI_CACHE_TTLS)."""
     # Get user context from database
-    context = await get_user_context(db, request.mode)
+    context = await get_user_context(request.mode)
     if request.context:
         # Allow caller-provided context to extend/override defaults
         context = {**context, **request.context}
     
     # Generate response
-    response = await ai_service.chat(
+    response, cached = await ai_cache.chat(
+        db, ai_service,
         message=request.message,
         mode=request.mode,
-        context=context
+        context=context,
+        refresh=refresh
     )
     
-    return ChatResponse(response=response, mode=request.mode)
+    return ChatResponse(response=response, mode=request.mode, cached=cached)
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    refresh: bool = False,
+    db: Session = Depends(get_db),
+    ai_service: OpenAIService = Depends(get_openai_service)
+):
+    """Chat with AI assistant, streaming the answer as server-sent events.
+
+    Emits `token` events (`{"content": ...}`) as text arrives, then `done`
+    or `error`. If the client disconnects, the response task is cancelled
+    and the upstream completion is closed with it.
+    """
+    context = await get_user_context(request.mode)
+    if request.context:
+        context = {**context, **request.context}
+    
+    async def events():
+        async for event, data in ai_cache.stream(ai_service, request.message, request.mode, context, refresh):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.post("/plan-day")
 async def plan_day(
+    refresh: bool = False,
     db: Session = Depends(get_db),
     ai_service: OpenAIService = Depends(get_openai_service)
 ):
     """Generate AI-powered daily plan."""
-    context = await get_user_context(db, "plan_day")
+    context = await get_user_context("plan_day")
     
     prompt = """На основі моїх задач, цілей та звичок на сьогодні, створи оптимальний план дня.
     Врахуй пріоритети, дедлайни та мій рівень енергії. 
     Дай конкретні рекомендації по часу та послідовності виконання."""
     
-    response = await ai_service.chat(
+    response, cached = await ai_cache.chat(
+        db, ai_service,
         message=prompt,
         mode="plan_day",
-        context=context
+        context=context,
+        refresh=refresh
     )
     
-    return {"plan": response}
+    return {"plan": response, "cached": cached}
 
 
 @router.post("/break-goal")
@@ -81,6 +119,8 @@ async def break_goal(
     goal_title: str,
     goal_description: Optional[str] = None,
     target_date: Optional[date] = None,
+    refresh: bool = False,
+    db: Session = Depends(get_db),
     ai_service: OpenAIService = Depends(get_openai_service)
 ):
     """Break down a goal into actionable steps."""
@@ -96,22 +136,25 @@ async def break_goal(
 3. Приблизні часові рамки
 4. Ключові показники успіху (KR)"""
     
-    response = await ai_service.chat(
+    response, cached = await ai_cache.chat(
+        db, ai_service,
         message=prompt,
         mode="break_goal",
-        context={}
+        context={},
+        refresh=refresh
     )
     
-    return {"breakdown": response}
+    return {"breakdown": response, "cached": cached}
 
 
 @router.post("/week-summary")
 async def week_summary(
+    refresh: bool = False,
     db: Session = Depends(get_db),
     ai_service: OpenAIService = Depends(get_openai_service)
 ):
     """Generate weekly summary and recommendations."""
-    context = await get_user_context(db, "week_summary")
+    context = await get_user_context("week_summary")
     
     prompt = """Проаналізуй мій тиждень і дай:
 1. Що вдалось (виконані задачі, досягнення)
@@ -120,13 +163,15 @@ async def week_summary(
 4. Тренди здоров'я (сон, настрій)
 5. 2-3 конкретні рекомендації на наступний тиждень"""
     
-    response = await ai_service.chat(
+    response, cached = await ai_cache.chat(
+        db, ai_service,
         message=prompt,
         mode="week_summary",
-        context=context
+        context=context,
+        refresh=refresh
     )
     
-    return {"summary": response}
+    return {"summary": response, "cached": cached}
 
 
 @router.post("/anti-procrastination")
@@ -162,11 +207,12 @@ async def anti_procrastination(
 
 @router.get("/daily-briefing")
 async def daily_briefing(
+    refresh: bool = False,
     db: Session = Depends(get_db),
     ai_service: OpenAIService = Depends(get_openai_service)
 ):
     """Generate daily briefing."""
-    context = await get_user_context(db, "daily_briefing")
+    context = await get_user_context("daily_briefing")
     
     prompt = """Створи короткий ранковий брифінг:
 1. Головний фокус дня (1 речення)
@@ -174,97 +220,19 @@ async def daily_briefing(
 3. Про що не забути
 4. Коротка мотивація (персональна, не цитата)"""
     
-    response = await ai_service.chat(
+    response, cached = await ai_cache.chat(
+        db, ai_service,
         message=prompt,
         mode="daily_briefing",
-        context=context
+        context=context,
+        refresh=refresh
     )
     
-    return {"briefing": response}
+    return {"briefing": response, "cached": cached}
 
 
-async def get_user_context(db: Session, mode: str) -> dict:
-    """Get relevant user context for AI."""
-    from app.models.task import Task, TaskStatus
-    from app.models.goal import Goal, GoalStatus
-    from app.models.habit import Habit, HabitLog
-    from app.models.health import HealthLog
-    from app.models.finance import Transaction, TransactionType
-    from sqlalchemy import and_, func
-    
-    today = date.today()
-    week_ago = today - timedelta(days=7)
-    
-    context = {}
-    
-    # Tasks
-    if mode in ["plan_day", "daily_briefing", "week_summary", "general"]:
-        tasks_today = db.query(Task).filter(
-            Task.status.in_([TaskStatus.TODO, TaskStatus.IN_PROGRESS])
-        ).order_by(Task.priority.desc()).limit(10).all()
-        
-        context["tasks"] = [
-            {"title": t.title, "priority": t.priority.value, "is_mit": t.is_mit}
-            for t in tasks_today
-        ]
-    
-    # Goals
-    if mode in ["plan_day", "week_summary", "general"]:
-        goals = db.query(Goal).filter(
-            Goal.status.in_([GoalStatus.NOT_STARTED, GoalStatus.IN_PROGRESS])
-        ).limit(5).all()
-        
-        context["goals"] = [
-            {"title": g.title, "progress": float(g.progress_percent), "type": g.type.value}
-            for g in goals
-        ]
-    
-    # Habits (week summary)
-    if mode in ["week_summary", "daily_briefing"]:
-        habits = db.query(Habit).filter(Habit.is_active == True).all()
-        habit_data = []
-        for h in habits:
-            completed_this_week = db.query(HabitLog).filter(
-                and_(
-                    HabitLog.habit_id == h.id,
-                    HabitLog.log_date >= week_ago,
-                    HabitLog.completed == True
-                )
-            ).count()
-            habit_data.append({
-                "name": h.name,
-                "streak": h.current_streak,
-                "completed_this_week": completed_this_week
-            })
-        context["habits"] = habit_data
-    
-    # Health
-    if mode in ["week_summary", "daily_briefing"]:
-        health_logs = db.query(HealthLog).filter(
-            HealthLog.log_date >= week_ago
-        ).all()
-        
-        if health_logs:
-            avg_sleep = sum(float(h.sleep_hours) for h in health_logs if h.sleep_hours) / max(len([h for h in health_logs if h.sleep_hours]), 1)
-            avg_mood = sum(h.mood.value for h in health_logs if h.mood) / max(len([h for h in health_logs if h.mood]), 1)
-            context["health"] = {
-                "avg_sleep": round(avg_sleep, 1),
-                "avg_mood": round(avg_mood, 1),
-                "days_logged": len(health_logs)
-            }
-    
-    # Finances (week summary)
-    if mode == "week_summary":
-        this_month_start = today.replace(day=1)
-        expenses = db.query(func.sum(Transaction.amount)).filter(
-            and_(
-                Transaction.type == TransactionType.EXPENSE,
-                Transaction.date >= datetime.combine(this_month_start, datetime.min.time())
-            )
-        ).scalar() or 0
-        
-        context["finances"] = {
-            "month_expenses": float(expenses)
-        }
-    
-    return context
+@router.get("/metrics")
+def get_ai_metrics(ai_service: OpenAIService = Depends(get_openai_service)):
+    """Get per-mode call counts, errors, retries, token usage and latency (this worker)."""
+    return ai_service.metrics.snapshot()
+
@@ -0,0 +1,39 @@
+"""Analytics API router."""
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.services.correlations import get_correlations
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+# Longest range accepted by /correlations
+CORRELATIONS_MAX_DAYS = 3 * 365
+
+
+@router.get("/correlations")
+def get_correlations_endpoint(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    max_lag: int = Query(3, ge=0, le=14),
+    min_days: int = Query(14, ge=3, le=365),
+    top: int = Query(15, ge=1, le=100),
+    refresh: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Correlate daily health, habits, spending and task completions, with day lags.
+
+    `matrix[lag][i][j]` is Pearson r between variable i and variable j
+    `lag` days later (null where fewer than `min_days` days overlap).
+    Defaults to the last 90 days; results are cached per range.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=89)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if (end - start).days + 1 > CORRELATIONS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {CORRELATIONS_MAX_DAYS} days")
+
+    return get_correlations(db, start, end, max_lag, min_days, top, refresh)
@@ -1,16 +1,48 @@
 """Calendar API router."""
-from datetime import datetime, date, timedelta
+import hashlib
+from datetime import datetime, date, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from zoneinfo import ZoneInfo
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import func
 
-from app.database import get_db
-from app.models.calendar_event import CalendarEvent, EventType
-from app.schemas.calendar_event import EventCreate, EventUpdate, EventResponse
+from app.config import settings
+from app.database import get_db, SessionLocal, dialect_insert
+from app.models.calendar_event import CalendarEvent, EventType, native_uid
+from app.schemas.calendar_event import EventCreate, EventUpdate, EventResponse, ends_before_start
+from app.services.event_index import event_index, events_overlapping
+from app.services.reminder_dispatcher import reminder_dispatcher
+from app.services.freebusy import get_freebusy
+from app.utils.recurrence import local_naive
+from app.utils.ical import serialize_calendar, unfold_lines, iter_vevents, vevent_to_values
 
 router = APIRouter(prefix="/calendar", tags=["Calendar"])
 
+# Rows fetched per round trip when streaming the iCal feed
+EXPORT_BATCH_SIZE = 200
+
+# Longest window accepted by /freebusy (bounds recurrence expansion)
+FREEBUSY_MAX_DAYS = 62
+
+# Events per INSERT ... ON CONFLICT statement on import
+IMPORT_BATCH_SIZE = 500
+IMPORT_CHUNK_BYTES = 64 * 1024
+
+# Columns overwritten when an imported UID already exists
+IMPORT_UPDATE_COLUMNS = [
+    "title", "description", "location", "start_time", "end_time", "all_day",
+    "recurrence_type", "recurrence_days", "recurrence_end_date", "reminders",
+]
+
+
+def _events_changed():
+    """Refresh in-process indexes after events are written."""
+    event_index.invalidate()
+    reminder_dispatcher.notify_changed()
+
 
 @router.get("/events", response_model=List[EventResponse])
 def get_events(
@@ -19,9 +51,7 @@ def get_events(
     event_type: Optional[EventType] = None,
     db: Session = Depends(get_db)
 ):
-    """Get calendar events with optional date range filter."""
-    query = db.query(CalendarEvent)
-    
+    """Get calendar events overlapping a date range."""
     # Default to current month if no dates provided
     if not start_date:
         start_date = date.today().replace(day=1)
@@ -33,12 +63,7 @@ def get_events(
     start_datetime = datetime.combine(start_date, datetime.min.time())
     end_datetime = datetime.combine(end_date, datetime.max.time())
     
-    query = query.filter(
-        and_(
-            CalendarEvent.start_time >= start_datetime,
-            CalendarEvent.start_time <= end_datetime
-        )
-    )
+    query = events_overlapping(db, start_datetime, end_datetime)
     
     if event_type:
         query = query.filter(CalendarEvent.event_type == event_type)
@@ -55,12 +80,7 @@ def get_today_events(db: Session = Depends(get_db)):
     today_start = datetime.combine(today, datetime.min.time())
     today_end = datetime.combine(today, datetime.max.time())
     
-    query = db.query(CalendarEvent).filter(
-        and_(
-            CalendarEvent.start_time >= today_start,
-            CalendarEvent.start_time <= today_end
-        )
-    ).order_by(CalendarEvent.start_time.asc())
+    query = events_overlapping(db, today_start, today_end).order_by(CalendarEvent.start_time.asc())
     
     return query.all()
 
@@ -76,16 +96,33 @@ def get_week_events(db: Session = Depends(get_db)):
     start_datetime = datetime.combine(start_of_week, datetime.min.time())
     end_datetime = datetime.combine(end_of_week, datetime.max.time())
     
-    query = db.query(CalendarEvent).filter(
-        and_(
-            CalendarEvent.start_time >= start_datetime,
-            CalendarEvent.start_time <= end_datetime
-        )
-    ).order_by(CalendarEvent.start_time.asc())
+    query = events_overlapping(db, start_datetime, end_datetime).order_by(CalendarEvent.start_time.asc())
     
     return query.all()
 
 
+@router.get("/freebusy")
+def get_freebusy_slots(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    min_slot: int = Query(30, ge=5, le=24 * 60, description="Minimum open slot length in minutes"),
+    include_all_day: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Get merged busy blocks and open slots (default: today)."""
+    # Compare in app-local wall-clock time, so naive and aware bounds can be mixed
+    tz = ZoneInfo(settings.timezone)
+    start = local_naive(start, tz) if start else datetime.combine(date.today(), datetime.min.time())
+    end = local_naive(end, tz) if end else datetime.combine(start.date() + timedelta(days=1), datetime.min.time())
+    
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > timedelta(days=FREEBUSY_MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"Range is limited to {FREEBUSY_MAX_DAYS} days")
+    
+    return get_freebusy(db, start, end, timedelta(minutes=min_slot), include_all_day)
+
+
 @router.get("/events/{event_id}", response_model=EventResponse)
 def get_event(event_id: int, db: Session = Depends(get_db)):
     """Get a specific event."""
@@ -100,7 +137,11 @@ def create_event(event_data: EventCreate, db: Session = Depends(get_db)):
     """Create a new event."""
     event = CalendarEvent(**event_data.model_dump())
     db.add(event)
+    db.flush()
+    # The UID it is exported with, so importing the export updates this row
+    event.ical_uid = native_uid(event.id)
     db.commit()
+    _events_changed()
     db.refresh(event)
     return event
 
@@ -113,10 +154,13 @@ def update_event(event_id: int, event_data: EventUpdate, db: Session = Depends(g
         raise HTTPException(status_code=404, detail="Event not found")
     
     update_data = event_data.model_dump(exclude_unset=True)
+    if ends_before_start(update_data.get("start_time", event.start_time), update_data.get("end_time", event.end_time)):
+        raise HTTPException(status_code=400, detail="end_time must not be before start_time")
     for field, value in update_data.items():
         setattr(event, field, value)
     
     db.commit()
+    _events_changed()
     db.refresh(event)
     return event
 
@@ -130,62 +174,134 @@ def delete_event(event_id: int, db: Session = Depends(get_db)):
     
     db.delete(event)
     db.commit()
+    _events_changed()
     return {"message": "Event deleted"}
 
 
+def _export_filter(query, start_date: Optional[date], end_date: Optional[date]):
+    """Apply the export date range (overlap semantics) to a query."""
+    if start_date:
+        query = query.filter(
+            func.coalesce(CalendarEvent.end_time, CalendarEvent.start_time)
+            >= datetime.combine(start_date, datetime.min.time())
+        )
+    if end_date:
+        query = query.filter(CalendarEvent.start_time <= datetime.combine(end_date, datetime.max.time()))
+    return query
+
+
+def _stream_events(start_date: Optional[date], end_date: Optional[date]):
+    """Yield the iCal feed from a server-side cursor.
+
+    Uses its own session: the request-scoped one is closed before a
+    streaming body is consumed.
+    """
+    db = SessionLocal()
+    try:
+        query = _export_filter(db.query(CalendarEvent), start_date, end_date)
+        query = query.order_by(CalendarEvent.start_time.asc())
+        events = query.execution_options(stream_results=True).yield_per(EXPORT_BATCH_SIZE)
+        yield from serialize_calendar(events)
+    finally:
+        db.close()
+
+
 @router.get("/export/ical")
 def export_ical(
+    request: Request,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     db: Session = Depends(get_db)
 ):
-    """Export events as iCal format."""
-    from fastapi.responses import Response
+    """Export events as an RFC 5545 iCal feed.
+
+    Supports ETag / If-None-Match and Last-Modified / If-Modified-Since so
+    polling calendar clients get a 304 until an event changes.
+    """
+    count, last_updated = _export_filter(
+        db.query(func.count(CalendarEvent.id), func.max(CalendarEvent.updated_at)),
+        start_date,
+        end_date
+    ).one()
     
-    # Get events
-    query = db.query(CalendarEvent)
-    if start_date:
-        query = query.filter(CalendarEvent.start_time >= datetime.combine(start_date, datetime.min.time()))
-    if end_date:
-        query = query.filter(CalendarEvent.start_time <= datetime.combine(end_date, datetime.max.time()))
+    fingerprint = f"{count}:{last_updated.isoformat() if last_updated else ''}:{start_date}:{end_date}"
+    etag = f'"{hashlib.sha1(fingerprint.encode()).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_updated:
+        if not last_updated.tzinfo:
+            last_updated = last_updated.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_updated.astimezone(timezone.utc), usegmt=True)
     
-    events = query.all()
-    
-    # Build iCal content
-    ical_lines = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//LifeHub//EN",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH",
-    ]
-    
-    for event in events:
-        ical_lines.extend([
-            "BEGIN:VEVENT",
-            f"UID:{event.id}@lifehub",
-            f"DTSTAMP:{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}",
-            f"DTSTART:{event.start_time.strftime('%Y%m%dT%H%M%SZ')}",
-        ])
-        
-        if event.end_time:
-            ical_lines.append(f"DTEND:{event.end_time.strftime('%Y%m%dT%H%M%SZ')}")
-        
-        ical_lines.append(f"SUMMARY:{event.title}")
-        
-        if event.description:
-            ical_lines.append(f"DESCRIPTION:{event.description}")
-        if event.location:
-            ical_lines.append(f"LOCATION:{event.location}")
-        
-        ical_lines.append("END:VEVENT")
-    
-    ical_lines.append("END:VCALENDAR")
-    
-    ical_content = "\r\n".join(ical_lines)
-    
-    return Response(
-        content=ical_content,
-        media_type="text/calendar",
-        headers={"Content-Disposition": "attachment; filename=lifehub-calendar.ics"}
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match:
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+    elif if_modified_since and last_updated:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError, IndexError):
+            since = None
+        if since and not since.tzinfo:
+            # "-0000" parses naive; HTTP dates are GMT
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have second precision
+        if since and last_updated.replace(microsecond=0) <= since:
+            return Response(status_code=304, headers=headers)
+    
+    headers["Content-Disposition"] = "attachment; filename=lifehub-calendar.ics"
+    return StreamingResponse(
+        _stream_events(start_date, end_date),
+        media_type="text/calendar; charset=utf-8",
+        headers=headers
     )
+
+
+def _upsert_events(db: Session, rows: List[dict]):
+    """Insert or update a batch of events keyed on ical_uid."""
+    stmt = dialect_insert(db, CalendarEvent.__table__)
+    update = {column: stmt.excluded[column] for column in IMPORT_UPDATE_COLUMNS}
+    update["updated_at"] = func.now()
+    stmt = stmt.on_conflict_do_update(index_elements=["ical_uid"], set_=update)
+    db.execute(stmt, rows)
+
+
+@router.post("/import")
+def import_ical(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Import an .ics file, upserting events by UID.
+
+    The file is parsed incrementally and written in batches, so re-importing
+    the same calendar updates events in place instead of duplicating them.
+    """
+    def chunks():
+        while True:
+            chunk = file.file.read(IMPORT_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+    
+    imported = 0
+    skipped = 0
+    batch = {}
+    try:
+        for vevent in iter_vevents(unfold_lines(chunks())):
+            values = vevent_to_values(vevent)
+            if values is None:
+                skipped += 1
+                continue
+            # One row per UID per statement (Postgres rejects double-touching a row)
+            batch[values["ical_uid"]] = values
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _upsert_events(db, list(batch.values()))
+                imported += len(batch)
+                batch = {}
+        if batch:
+            _upsert_events(db, list(batch.values()))
+            imported += len(batch)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Invalid iCal file: {e}")
+    
+    db.commit()
+    _events_changed()
+    return {"imported": imported, "skipped": skipped}
@@ -11,6 +11,7 @@ from app.models.habit import Habit, HabitLog, HabitFrequency
 from app.models.health import HealthLog
 from app.models.finance import Transaction, TransactionType
 from app.models.goal import Goal, GoalStatus
+from app.services.event_index import events_overlapping
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -36,12 +37,9 @@ def get_today_dashboard(db: Session = Depends(get_db)):
     ).order_by(Task.priority.desc(), Task.due_date.asc().nullslast()).limit(10).all()
     
     # Today's events
-    today_events = db.query(CalendarEvent).filter(
-        and_(
-            CalendarEvent.start_time >= today_start,
-            CalendarEvent.start_time <= today_end
-        )
-    ).order_by(CalendarEvent.start_time.asc()).all()
+    today_events = events_overlapping(db, today_start, today_end).order_by(
+        CalendarEvent.start_time.asc()
+    ).all()
     
     # Today's habits
     habits = db.query(Habit).filter(Habit.is_active == True).all()
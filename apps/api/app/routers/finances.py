@@ -1,18 +1,20 @@
 """Finances API router."""
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from typing import List, Optional
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func, extract
+import numpy as np
 
-from app.database import get_db
+from app.database import get_db, local_day
 from app.models.finance import Transaction, Budget, Subscription, TransactionType, TransactionCategory
 from app.schemas.finance import (
     TransactionCreate, TransactionUpdate, TransactionResponse,
     BudgetCreate, BudgetUpdate, BudgetResponse,
     SubscriptionCreate, SubscriptionUpdate, SubscriptionResponse
 )
+from app.utils.downsample import lttb
 
 router = APIRouter(prefix="/finances", tags=["Finances"])
 
@@ -104,6 +106,52 @@ def get_transactions_summary(
     }
 
 
+@router.get("/transactions/daily")
+def get_transactions_daily(
+    type: TransactionType = TransactionType.EXPENSE,
+    category: Optional[TransactionCategory] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    max_points: Optional[int] = Query(None, ge=3, le=5000),
+    db: Session = Depends(get_db)
+):
+    """Get daily totals (expenses by default) for charts, downsampled (LTTB) to at most `max_points`.
+
+    Days without transactions count as 0. Defaults to the last 365 days.
+    """
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=364)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must be before date_to")
+
+    day = local_day(db, Transaction.date)
+    query = db.query(day, func.sum(Transaction.amount)).filter(
+        Transaction.type == type,
+        Transaction.date >= datetime.combine(date_from, datetime.min.time()),
+        Transaction.date < datetime.combine(date_to + timedelta(days=1), datetime.min.time())
+    )
+    if category:
+        query = query.filter(Transaction.category == category)
+
+    days = (date_to - date_from).days + 1
+    totals = np.zeros(days)
+    for day_value, total in query.group_by(day).all():
+        index = (date.fromisoformat(str(day_value)[:10]) - date_from).days
+        if 0 <= index < days:
+            totals[index] = float(total or 0)
+
+    keep = lttb(np.arange(days, dtype=np.float64), totals, max_points) if max_points else np.arange(days)
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "type": type,
+        "points": days,
+        "total": round(float(totals.sum()), 2),
+        "dates": [(date_from + timedelta(days=int(i))).isoformat() for i in keep],
+        "totals": [round(float(totals[i]), 2) for i in keep],
+    }
+
+
 @router.post("/transactions", response_model=TransactionResponse)
 def create_transaction(data: TransactionCreate, db: Session = Depends(get_db)):
     """Create a new transaction."""
@@ -3,16 +3,26 @@ from datetime import date
 from typing import List, Optional
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 
 from app.database import get_db
-from app.models.goal import Goal, GoalType, GoalStatus, GoalCategory
-from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse
+from app.models.goal import Goal, GoalProgressSnapshot, GoalType, GoalStatus, GoalCategory
+from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse, GoalSummary
+from app.services.goal_tree import MAX_DEPTH, goal_tree_cte, goal_rollups
+from app.services.goal_progress import refresh_auto_progress, set_goal_progress
+from app.services.goal_forecast import forecast_goals, record_progress
 
 router = APIRouter(prefix="/goals", tags=["Goals"])
 
+# Columns hydrated for list views; text and JSON detail only via /{id}
+GOAL_SUMMARY_COLUMNS = (
+    Goal.id, Goal.title, Goal.description_excerpt, Goal.type, Goal.category, Goal.status, Goal.parent_id,
+    Goal.start_date, Goal.target_date, Goal.completed_date, Goal.progress_percent,
+    Goal.auto_progress, Goal.color, Goal.icon, Goal.priority, Goal.created_at, Goal.updated_at,
+)
 
-@router.get("", response_model=List[GoalResponse])
+
+@router.get("", response_model=List[GoalSummary])
 def get_goals(
     type: Optional[GoalType] = None,
     category: Optional[GoalCategory] = None,
@@ -20,8 +30,8 @@ def get_goals(
     parent_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all goals with optional filters."""
-    query = db.query(Goal)
+    """Get all goals with optional filters (summaries; full goal via /{id})."""
+    query = db.query(Goal).options(load_only(*GOAL_SUMMARY_COLUMNS))
     
     if type:
         query = query.filter(Goal.type == type)
@@ -41,45 +51,71 @@ def get_goals(
     return query.all()
 
 
-@router.get("/active", response_model=List[GoalResponse])
+@router.get("/active", response_model=List[GoalSummary])
 def get_active_goals(db: Session = Depends(get_db)):
     """Get goals that are in progress."""
-    return db.query(Goal).filter(
+    return db.query(Goal).options(load_only(*GOAL_SUMMARY_COLUMNS)).filter(
         Goal.status.in_([GoalStatus.NOT_STARTED, GoalStatus.IN_PROGRESS])
     ).order_by(Goal.priority.desc()).all()
 
 
 @router.get("/tree")
-def get_goals_tree(db: Session = Depends(get_db)):
-    """Get goals as hierarchical tree."""
-    goals = db.query(Goal).filter(
-        Goal.status != GoalStatus.ABANDONED
-    ).all()
-    
-    # Build tree
-    goal_dict = {g.id: {
-        "id": g.id,
-        "title": g.title,
-        "type": g.type.value,
-        "category": g.category.value,
-        "status": g.status.value,
-        "progress_percent": float(g.progress_percent),
-        "target_date": g.target_date.isoformat() if g.target_date else None,
-        "icon": g.icon,
-        "color": g.color,
-        "children": []
-    } for g in goals}
+def get_goals_tree(
+    root_id: Optional[int] = None,
+    max_depth: Optional[int] = Query(None, ge=0, le=MAX_DEPTH),
+    db: Session = Depends(get_db)
+):
+    """Get goals as hierarchical tree, with progress rolled up from sub-goals.
+
+    `root_id` returns just that goal's subtree, `max_depth` cuts the tree
+    below that many levels; `child_count` tells which nodes have more to load.
+    """
+    tree = goal_tree_cte([root_id] if root_id is not None else None, MAX_DEPTH if max_depth is None else max_depth)
+    rows = db.query(Goal, tree.c.depth, tree.c.root_id).join(tree, tree.c.id == Goal.id).options(load_only(
+        Goal.id, Goal.title, Goal.type, Goal.category, Goal.status, Goal.parent_id,
+        Goal.progress_percent, Goal.target_date, Goal.icon, Goal.color, Goal.priority
+    )).order_by(tree.c.depth, Goal.priority.desc(), Goal.id).all()
+    if root_id is not None and not rows:
+        raise HTTPException(status_code=404, detail="Goal not found")
     
+    rollups = goal_rollups.get(db, {tree_root for _, _, tree_root in rows})
+    
+    goal_dict = {}
     root_goals = []
-    for goal in goals:
-        if goal.parent_id and goal.parent_id in goal_dict:
-            goal_dict[goal.parent_id]["children"].append(goal_dict[goal.id])
+    for g, depth, _ in rows:
+        if g.id in goal_dict:
+            continue  # parent_id cycle
+        rollup, child_count = rollups.get(g.id, (float(g.progress_percent or 0), 0))
+        node = goal_dict[g.id] = {
+            "id": g.id,
+            "parent_id": g.parent_id,
+            "title": g.title,
+            "type": g.type.value,
+            "category": g.category.value,
+            "status": g.status.value,
+            "progress_percent": float(g.progress_percent or 0),
+            "rollup_percent": rollup,
+            "target_date": g.target_date.isoformat() if g.target_date else None,
+            "icon": g.icon,
+            "color": g.color,
+            "depth": depth,
+            "child_count": child_count,
+            "children": []
+        }
+        if depth > 0 and g.parent_id in goal_dict:
+            goal_dict[g.parent_id]["children"].append(node)
         else:
-            root_goals.append(goal_dict[goal.id])
+            root_goals.append(node)
     
     return root_goals
 
 
+@router.get("/forecast")
+def get_goals_forecast(db: Session = Depends(get_db)):
+    """Get completion forecasts for all active goals in one pass."""
+    return forecast_goals(db)
+
+
 @router.get("/{goal_id}", response_model=GoalResponse)
 def get_goal(goal_id: int, db: Session = Depends(get_db)):
     """Get a specific goal."""
@@ -94,8 +130,12 @@ def create_goal(data: GoalCreate, db: Session = Depends(get_db)):
     """Create a new goal."""
     goal = Goal(**data.model_dump())
     db.add(goal)
+    db.flush()
+    if not (goal.auto_progress and refresh_auto_progress(db, [goal.id])):
+        record_progress(db, goal, "create")
     db.commit()
     db.refresh(goal)
+    goal_rollups.invalidate(goal.parent_id)
     return goal
 
 
@@ -107,6 +147,8 @@ def update_goal(goal_id: int, data: GoalUpdate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Goal not found")
     
     update_data = data.model_dump(exclude_unset=True)
+    old_parent_id = goal.parent_id
+    old_progress = goal.progress_percent
     
     # Auto-complete if progress is 100%
     if update_data.get("progress_percent") == Decimal(100):
@@ -117,8 +159,17 @@ def update_goal(goal_id: int, data: GoalUpdate, db: Session = Depends(get_db)):
     for field, value in update_data.items():
         setattr(goal, field, value)
     
+    # Auto-progress goals derive progress from tasks and key results instead
+    recorded = False
+    if goal.auto_progress:
+        db.flush()
+        recorded = bool(refresh_auto_progress(db, [goal.id]))
+    if not recorded and Decimal(goal.progress_percent or 0) != Decimal(old_progress or 0):
+        record_progress(db, goal, "update")
+    
     db.commit()
     db.refresh(goal)
+    goal_rollups.invalidate(goal.id, old_parent_id, goal.parent_id)
     return goal
 
 
@@ -134,6 +185,8 @@ def delete_goal(goal_id: int, db: Session = Depends(get_db)):
     if children > 0:
         raise HTTPException(status_code=400, detail="Cannot delete goal with sub-goals")
     
+    goal_rollups.invalidate(goal.id)
+    db.query(GoalProgressSnapshot).filter(GoalProgressSnapshot.goal_id == goal.id).delete(synchronize_session=False)
     db.delete(goal)
     db.commit()
     return {"message": "Goal deleted"}
@@ -150,24 +203,51 @@ def update_progress(
     goal = db.query(Goal).filter(Goal.id == goal_id).first()
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
+    if goal.auto_progress:
+        raise HTTPException(status_code=400, detail="Goal progress is computed automatically")
     
-    goal.progress_percent = progress
+    # Auto-completes at 100%, reopens below
+    set_goal_progress(goal, progress)
+    record_progress(db, goal, "manual")
     if notes:
         goal.progress_notes = notes
     
-    # Auto-complete if 100%
-    if progress == Decimal(100) and goal.status != GoalStatus.COMPLETED:
-        goal.status = GoalStatus.COMPLETED
-        goal.completed_date = date.today()
-    elif progress < Decimal(100) and goal.status == GoalStatus.COMPLETED:
-        goal.status = GoalStatus.IN_PROGRESS
-        goal.completed_date = None
-    
     db.commit()
     db.refresh(goal)
+    goal_rollups.invalidate(goal.id)
     return goal
 
 
+@router.post("/progress/refresh")
+def refresh_goals_progress(db: Session = Depends(get_db)):
+    """Recompute progress of every auto-progress goal."""
+    changed = refresh_auto_progress(db)
+    db.commit()
+    goal_rollups.invalidate(*changed)
+    return {"updated": len(changed)}
+
+
+@router.get("/{goal_id}/forecast")
+def get_goal_forecast(goal_id: int, db: Session = Depends(get_db)):
+    """Project the goal's completion date from its progress history."""
+    forecast = forecast_goals(db, [goal_id])
+    if not forecast:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    return forecast[0]
+
+
+@router.get("/{goal_id}/history")
+def get_goal_history(goal_id: int, limit: int = Query(200, le=1000), db: Session = Depends(get_db)):
+    """Get the goal's progress snapshots, newest first."""
+    rows = db.query(GoalProgressSnapshot).filter(
+        GoalProgressSnapshot.goal_id == goal_id
+    ).order_by(GoalProgressSnapshot.recorded_at.desc(), GoalProgressSnapshot.id.desc()).limit(limit).all()
+    return [
+        {"progress_percent": float(row.progress_percent), "source": row.source, "recorded_at": row.recorded_at}
+        for row in rows
+    ]
+
+
 @router.post("/{goal_id}/start", response_model=GoalResponse)
 def start_goal(goal_id: int, db: Session = Depends(get_db)):
     """Start working on a goal."""
@@ -181,4 +261,5 @@ def start_goal(goal_id: int, db: Session = Depends(get_db)):
     
     db.commit()
     db.refresh(goal)
+    goal_rollups.invalidate(goal.id)
     return goal
@@ -1,16 +1,27 @@
 """Health tracking API router."""
+import codecs
+import csv
 from datetime import date, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from zoneinfo import ZoneInfo
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 
+from app.config import settings
 from app.database import get_db
-from app.models.health import HealthLog
+from app.models.health import HealthLog, MoodLevel
 from app.schemas.health import HealthLogCreate, HealthLogUpdate, HealthLogResponse
+from app.services.health_logs import add_water as add_water_glasses, upsert_daily
+from app.services.health_alerts import health_alerts
+from app.services.health_trends import DEFAULT_METRICS, DEFAULT_WINDOWS, MAX_WINDOW, METRIC_COLUMNS, get_health_series, get_health_trends
+from app.utils.health_import import DailyAggregator, iter_csv, iter_json
 
 router = APIRouter(prefix="/health", tags=["Health"])
 
+# Bytes read per iteration when importing JSON exports
+IMPORT_CHUNK_BYTES = 256 * 1024
+
 
 @router.get("/logs", response_model=List[HealthLogResponse])
 def get_health_logs(
@@ -61,6 +72,7 @@ def create_health_log(data: HealthLogCreate, db: Session = Depends(get_db)):
     db.add(log)
     db.commit()
     db.refresh(log)
+    health_alerts.invalidate()
     return log
 
 
@@ -79,24 +91,60 @@ def update_health_log(log_date: date, data: HealthLogUpdate, db: Session = Depen
     
     db.commit()
     db.refresh(log)
+    health_alerts.invalidate()
     return log
 
 
 @router.post("/logs/water")
 def add_water(glasses: int = 1, db: Session = Depends(get_db)):
     """Add water intake for today."""
-    today = date.today()
-    log = db.query(HealthLog).filter(HealthLog.log_date == today).first()
-    
-    if not log:
-        log = HealthLog(log_date=today, water_glasses=glasses)
-        db.add(log)
-    else:
-        log.water_glasses = (log.water_glasses or 0) + glasses
-    
+    return {"water_glasses": add_water_glasses(db, glasses)}
+
+
+@router.post("/import")
+def import_health_data(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|json)$"),
+    db: Session = Depends(get_db)
+):
+    """Import a CSV or JSON health export (wide per-day rows or long type/value samples).
+
+    The file is read incrementally; intraday samples are aggregated per
+    local day (steps, sleep and water summed, weight latest, mood/energy
+    averaged) and upserted in batches on log_date. Only imported metrics
+    are overwritten.
+    """
+    name = (file.filename or "").lower()
+    if not format:
+        format = "json" if name.endswith((".json", ".ndjson", ".jsonl")) or "json" in (file.content_type or "") else "csv"
+    
+    aggregator = DailyAggregator(ZoneInfo(settings.timezone))
+    try:
+        # Decoded chunk by chunk; the upload's file object isn't readable() as text on Python < 3.11
+        chunks = codecs.iterdecode(iter(lambda: file.file.read(IMPORT_CHUNK_BYTES), b""), "utf-8-sig")
+        records = iter_csv(chunks) if format == "csv" else iter_json(chunks)
+        for record in records:
+            aggregator.add_record(record)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid {format.upper()} file: {e}")
+    
+    days = []
+    for log_date, values in aggregator.results():
+        if "mood" in values:
+            values["mood"] = MoodLevel(values["mood"])
+        days.append((log_date, values))
+    
+    written = upsert_daily(db, days)
     db.commit()
-    db.refresh(log)
-    return {"water_glasses": log.water_glasses}
+    
+    return {
+        "rows": aggregator.rows,
+        "skipped": aggregator.skipped,
+        "days": written,
+        "start": days[0][0].isoformat() if days else None,
+        "end": days[-1][0].isoformat() if days else None,
+        "metrics": sorted({metric for _, values in days for metric in values}),
+    }
 
 
 @router.get("/stats/weekly")
@@ -136,35 +184,58 @@ def get_weekly_stats(db: Session = Depends(get_db)):
     }
 
 
+def _parse_metrics(metrics: str) -> List[str]:
+    """Split and validate a comma-separated metric list."""
+    metric_list = [m.strip() for m in metrics.split(",") if m.strip()]
+    unknown = [m for m in metric_list if m not in METRIC_COLUMNS]
+    if not metric_list or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown metrics: {', '.join(unknown) or '(none)'}. Available: {', '.join(METRIC_COLUMNS)}"
+        )
+    return list(dict.fromkeys(metric_list))
+
+
+@router.get("/trends")
+def get_trends(
+    metrics: str = ",".join(DEFAULT_METRICS),
+    window: str = ",".join(str(w) for w in DEFAULT_WINDOWS),
+    end: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Get rolling means, window-over-window deltas and target adherence per metric.
+
+    `metrics` and `window` (days) are comma-separated lists.
+    """
+    metric_list = _parse_metrics(metrics)
+    try:
+        windows = [int(w) for w in window.split(",") if w.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="window must be comma-separated day counts")
+    if not windows or any(w < 1 or w > MAX_WINDOW for w in windows):
+        raise HTTPException(status_code=400, detail=f"Windows must be between 1 and {MAX_WINDOW} days")
+    
+    return get_health_trends(db, metric_list, windows, end)
+
+
+@router.get("/series")
+def get_series(
+    metrics: str = ",".join(DEFAULT_METRICS),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    max_points: Optional[int] = Query(None, ge=3, le=5000),
+    db: Session = Depends(get_db)
+):
+    """Get logged values per metric for charts, downsampled (LTTB) to at most `max_points`.
+
+    `metrics` is a comma-separated list; without start/end the full history is returned.
+    """
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return get_health_series(db, _parse_metrics(metrics), start, end, max_points)
+
+
 @router.get("/alerts")
 def get_health_alerts(db: Session = Depends(get_db)):
-    """Get health alerts based on recent data."""
-    today = date.today()
-    yesterday = today - timedelta(days=1)
-    two_days_ago = today - timedelta(days=2)
-    
-    alerts = []
-    
-    # Check last 2 days for sleep
-    recent_logs = db.query(HealthLog).filter(
-        HealthLog.log_date.in_([yesterday, two_days_ago])
-    ).all()
-    
-    low_sleep_days = [l for l in recent_logs if l.sleep_hours and float(l.sleep_hours) < 6]
-    if len(low_sleep_days) >= 2:
-        alerts.append({
-            "type": "sleep",
-            "severity": "warning",
-            "message": "Ви спали менше 6 годин 2 дні поспіль. Рекомендуємо лягти раніше сьогодні."
-        })
-    
-    # Check today's water
-    today_log = db.query(HealthLog).filter(HealthLog.log_date == today).first()
-    if today_log and (today_log.water_glasses or 0) < 4:
-        alerts.append({
-            "type": "water",
-            "severity": "info",
-            "message": f"Ви випили тільки {today_log.water_glasses or 0} склянок води. Не забудьте пити більше!"
-        })
-    
-    return alerts
+    """Get health alerts based on recent data (see HEALTH_ALERT_RULES)."""
+    return health_alerts.get_alerts(db)
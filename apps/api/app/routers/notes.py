@@ -1,18 +1,35 @@
 """Notes API router."""
+import mimetypes
+import os
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
+from fastapi.responses import Response
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session, load_only
 
+from app.config import settings
 from app.database import get_db
 from app.models.note import Note, NoteType
-from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse
+from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse, NoteSummary, NoteSearchResult, NoteAttachment
+from app.services.note_search import apply_search
+from app.services.note_links import sync_note_links, delete_note_links, backlinks_query, get_graph
+from app.services.attachment_store import attachment_store, AttachmentTooLarge
+from app.services.note_attachments import sync_note_attachments, delete_note_attachments, release_attachments
+from app.utils.range_response import RangeFileResponse, RangeNotSatisfiable, parse_range
 
 router = APIRouter(prefix="/notes", tags=["Notes"])
 
+# Columns hydrated for list views; full content and attachments only via /{id}
+NOTE_SUMMARY_COLUMNS = (
+    Note.id, Note.title, Note.excerpt, Note.type, Note.tags, Note.folder,
+    Note.is_pinned, Note.is_starred, Note.is_archived, Note.url, Note.mood,
+    Note.created_at, Note.updated_at,
+)
 
-@router.get("", response_model=List[NoteResponse])
+
+@router.get("", response_model=List[NoteSummary])
 def get_notes(
     type: Optional[NoteType] = None,
     folder: Optional[str] = None,
@@ -25,8 +42,8 @@ def get_notes(
     offset: int = 0,
     db: Session = Depends(get_db)
 ):
-    """Get notes with filters."""
-    query = db.query(Note)
+    """Get notes with filters (summaries; full note via /{id})."""
+    query = db.query(Note).options(load_only(*NOTE_SUMMARY_COLUMNS))
     
     if type:
         query = query.filter(Note.type == type)
@@ -34,13 +51,9 @@ def get_notes(
         query = query.filter(Note.folder == folder)
     if tag:
         query = query.filter(Note.tags.contains([tag]))
+    rank = None
     if search:
-        query = query.filter(
-            or_(
-                Note.title.ilike(f"%{search}%"),
-                Note.content.ilike(f"%{search}%")
-            )
-        )
+        query, rank, _ = apply_search(db, query, search)
     if pinned_only:
         query = query.filter(Note.is_pinned == True)
     if starred_only:
@@ -48,28 +61,78 @@ def get_notes(
     if not include_archived:
         query = query.filter(Note.is_archived == False)
     
-    # Order: pinned first, then by updated_at
-    query = query.order_by(Note.is_pinned.desc(), Note.updated_at.desc())
+    # Order: by relevance when searching, otherwise pinned first, then by updated_at
+    if rank is not None:
+        query = query.order_by(rank.desc(), Note.updated_at.desc())
+    else:
+        query = query.order_by(Note.is_pinned.desc(), Note.updated_at.desc())
     
     return query.offset(offset).limit(limit).all()
 
 
-@router.get("/inbox", response_model=List[NoteResponse])
+@router.get("/search", response_model=List[NoteSearchResult])
+def search_notes(
+    q: str = Query(..., min_length=1),
+    type: Optional[NoteType] = None,
+    include_archived: bool = False,
+    limit: int = Query(20, le=100),
+    offset: int = 0,
+    db: Session = Depends(get_db)
+):
+    """Full-text search over notes and journal, ranked, with highlighted snippets."""
+    query, rank, snippet = apply_search(db, db.query(Note), q)
+    
+    if type:
+        query = query.filter(Note.type == type)
+    if not include_archived:
+        query = query.filter(Note.is_archived == False)
+    
+    # Note bodies stay in the database; only the snippet comes back
+    query = query.options(load_only(
+        Note.id, Note.title, Note.type, Note.folder, Note.tags,
+        Note.is_pinned, Note.created_at, Note.updated_at
+    ))
+    if rank is not None:
+        query = query.add_columns(rank.label("rank"), snippet.label("snippet"))
+        query = query.order_by(rank.desc(), Note.updated_at.desc())
+        rows = query.offset(offset).limit(limit).all()
+    else:
+        query = query.order_by(Note.updated_at.desc())
+        rows = [(note, None, None) for note in query.offset(offset).limit(limit).all()]
+    
+    return [
+        NoteSearchResult(
+            id=note.id,
+            title=note.title,
+            type=note.type,
+            folder=note.folder,
+            tags=note.tags or [],
+            is_pinned=note.is_pinned,
+            rank=float(note_rank) if note_rank is not None else None,
+            snippet=note_snippet,
+            created_at=note.created_at,
+            updated_at=note.updated_at
+        )
+        for note, note_rank, note_snippet in rows
+    ]
+
+
+@router.get("/inbox", response_model=List[NoteSummary])
 def get_inbox(db: Session = Depends(get_db)):
     """Get inbox notes (quick captures)."""
-    return db.query(Note).filter(
+    return db.query(Note).options(load_only(*NOTE_SUMMARY_COLUMNS)).filter(
         Note.type == NoteType.INBOX,
         Note.is_archived == False
     ).order_by(Note.created_at.desc()).limit(20).all()
 
 
-@router.get("/journal", response_model=List[NoteResponse])
+@router.get("/journal", response_model=List[NoteSummary])
 def get_journal_entries(
     limit: int = Query(30, le=100),
     db: Session = Depends(get_db)
 ):
     """Get journal entries."""
-    return db.query(Note).filter(
+    return db.query(Note).options(load_only(*NOTE_SUMMARY_COLUMNS)).filter(
         Note.type == NoteType.JOURNAL,
         Note.is_archived == False
     ).order_by(Note.created_at.desc()).limit(limit).all()
@@ -86,6 +149,63 @@ def get_folders(db: Session = Depends(get_db)):
     return [f[0] for f in folders if f[0]]
 
 
+def _build_folder_tree(rows) -> dict:
+    """Nest (folder, count, pinned, last_updated) rows by "/" path segments.
+
+    Each node carries its own counts plus subtree totals; the root node
+    holds notes without a folder.
+    """
+    def node(name: str, path: str) -> dict:
+        return {
+            "name": name,
+            "path": path,
+            "note_count": 0,
+            "pinned_count": 0,
+            "total_count": 0,
+            "total_pinned": 0,
+            "last_updated": None,
+            "children": {},
+        }
+
+    root = node("", "")
+    for folder, count, pinned, last_updated in rows:
+        parts = [part.strip() for part in (folder or "").split("/") if part.strip()]
+        current = root
+        chain = [root]
+        for i, part in enumerate(parts):
+            current = current["children"].setdefault(part, node(part, "/".join(parts[:i + 1])))
+            chain.append(current)
+        # Folders that normalize to the same path ("a/b", "a/b/") merge
+        current["note_count"] += count
+        current["pinned_count"] += int(pinned or 0)
+        for ancestor in chain:
+            ancestor["total_count"] += count
+            ancestor["total_pinned"] += int(pinned or 0)
+            if last_updated and (ancestor["last_updated"] is None or last_updated > ancestor["last_updated"]):
+                ancestor["last_updated"] = last_updated
+
+    def finish(current: dict) -> dict:
+        current["children"] = [finish(child) for _, child in sorted(current["children"].items())]
+        return current
+
+    return finish(root)
+
+
+@router.get("/folders/tree")
+def get_folder_tree(include_archived: bool = False, db: Session = Depends(get_db)):
+    """Get folders as a nested tree (paths like work/projects/x) with counts."""
+    query = db.query(
+        Note.folder,
+        func.count(Note.id),
+        func.sum(case((Note.is_pinned == True, 1), else_=0)),
+        func.max(Note.updated_at)
+    )
+    if not include_archived:
+        query = query.filter(Note.is_archived == False)
+    
+    return _build_folder_tree(query.group_by(Note.folder).all())
+
+
 @router.get("/tags")
 def get_tags(db: Session = Depends(get_db)):
     """Get list of all tags."""
@@ -99,6 +219,55 @@ def get_tags(db: Session = Depends(get_db)):
     return sorted(list(all_tags))
 
 
+@router.get("/graph")
+def get_note_graph(
+    include_tags: bool = True,
+    include_archived: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Get the note link graph ([[wiki links]] and #tags) from the link index."""
+    return get_graph(db, include_tags=include_tags, include_archived=include_archived)
+
+
+@router.get("/attachments/{sha256}")
+def download_attachment(
+    sha256: str,
+    request: Request,
+    name: Optional[str] = None,
+    download: bool = False
+):
+    """Serve a stored attachment; supports Range requests and caching by hash."""
+    try:
+        path = attachment_store.path_for(sha256)
+        size = os.stat(path).st_size
+    except (ValueError, FileNotFoundError):
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    
+    # Content never changes for a given hash
+    headers = {
+        "etag": f'"{sha256}"',
+        "cache-control": "private, max-age=31536000, immutable",
+    }
+    if request.headers.get("if-none-match") == headers["etag"]:
+        return Response(status_code=304, headers=headers)
+    if name:
+        disposition = "attachment" if download else "inline"
+        headers["content-disposition"] = f"{disposition}; filename*=UTF-8''{quote(name)}"
+    
+    # A stale If-Range means the client's partial copy is of something else
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range != headers["etag"]:
+        range_header = None
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={"content-range": f"bytes */{size}"})
+    
+    media_type = (mimetypes.guess_type(name)[0] if name else None) or "application/octet-stream"
+    return RangeFileResponse(str(path), size, byte_range, media_type=media_type, headers=headers)
+
+
 @router.get("/{note_id}", response_model=NoteResponse)
 def get_note(note_id: int, db: Session = Depends(get_db)):
     """Get a specific note."""
@@ -108,11 +277,28 @@ def get_note(note_id: int, db: Session = Depends(get_db)):
     return note
 
 
+@router.get("/{note_id}/backlinks", response_model=List[NoteSummary])
+def get_backlinks(
+    note_id: int,
+    include_archived: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Get notes that link to this note with [[its title]]."""
+    note = db.query(Note).options(load_only(Note.id, Note.title)).filter(Note.id == note_id).first()
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    
+    return backlinks_query(db, note, include_archived).options(load_only(*NOTE_SUMMARY_COLUMNS)).all()
+
+
 @router.post("", response_model=NoteResponse)
 def create_note(data: NoteCreate, db: Session = Depends(get_db)):
     """Create a new note."""
     note = Note(**data.model_dump())
     db.add(note)
+    db.flush()
+    sync_note_links(db, note)
+    sync_note_attachments(db, note)
     db.commit()
     db.refresh(note)
     return note
@@ -126,6 +312,8 @@ def quick_note(content: str, db: Session = Depends(get_db)):
         type=NoteType.INBOX
     )
     db.add(note)
+    db.flush()
+    sync_note_links(db, note)
     db.commit()
     db.refresh(note)
     return note
@@ -138,10 +326,16 @@ def update_note(note_id: int, data: NoteUpdate, db: Session = Depends(get_db)):
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
-    for field, value in data.model_dump(exclude_unset=True).items():
+    old_content = note.content
+    update_data = data.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
         setattr(note, field, value)
     
+    if note.content != old_content:
+        sync_note_links(db, note, old_content)
+    removed = sync_note_attachments(db, note) if "attachments" in update_data else set()
     db.commit()
+    release_attachments(db, removed)
     db.refresh(note)
     return note
 
@@ -153,11 +347,70 @@ def delete_note(note_id: int, db: Session = Depends(get_db)):
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
+    delete_note_links(db, note.id)
+    digests = delete_note_attachments(db, note.id)
     db.delete(note)
     db.commit()
+    release_attachments(db, digests)
     return {"message": "Note deleted"}
 
 
+@router.post("/{note_id}/attachments", response_model=NoteAttachment)
+def upload_attachment(note_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Attach a file to a note.
+
+    The upload is hashed and written in chunks; identical files are stored
+    once and the note keeps only a reference.
+    """
+    note = db.query(Note).filter(Note.id == note_id).first()
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    
+    try:
+        sha256, size = attachment_store.save(file.file, settings.attachment_max_mb * 1024 * 1024)
+    except AttachmentTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    name = os.path.basename(file.filename or "") or sha256[:12]
+    content_type = file.content_type or mimetypes.guess_type(name)[0] or "application/octet-stream"
+    ref = {
+        "sha256": sha256,
+        "name": name,
+        "type": content_type,
+        "size": size,
+        "url": f"/api/notes/attachments/{sha256}?name={quote(name)}",
+    }
+    # Reassign so the JSON column is marked dirty
+    note.attachments = [
+        existing for existing in note.attachments or []
+        if not (isinstance(existing, dict) and existing.get("sha256") == sha256 and existing.get("name") == name)
+    ] + [ref]
+    sync_note_attachments(db, note)
+    db.commit()
+    return ref
+
+
+@router.delete("/{note_id}/attachments/{sha256}")
+def delete_attachment(note_id: int, sha256: str, db: Session = Depends(get_db)):
+    """Detach a file from a note; the blob is removed when nothing else uses it."""
+    note = db.query(Note).filter(Note.id == note_id).first()
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    
+    remaining = [
+        ref for ref in note.attachments or []
+        if not (isinstance(ref, dict) and ref.get("sha256") == sha256)
+    ]
+    if len(remaining) == len(note.attachments or []):
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    
+    note.attachments = remaining
+    removed = sync_note_attachments(db, note)
+    db.commit()
+    release_attachments(db, removed)
+    return {"message": "Attachment deleted"}
+
+
 @router.post("/{note_id}/pin", response_model=NoteResponse)
 def toggle_pin(note_id: int, db: Session = Depends(get_db)):
     """Toggle pin status."""
@@ -2,17 +2,18 @@
 from datetime import datetime, date
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from sqlalchemy import and_, or_
 
 from app.database import get_db
 from app.models.task import Task, TaskStatus, TaskPriority
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskSummary
+from app.services.goal_progress import sync_goal_progress
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
 
-@router.get("", response_model=List[TaskResponse])
+@router.get("", response_model=List[TaskSummary])
 def get_tasks(
     status: Optional[TaskStatus] = None,
     priority: Optional[TaskPriority] = None,
@@ -25,8 +26,8 @@ def get_tasks(
     offset: int = 0,
     db: Session = Depends(get_db)
 ):
-    """Get all tasks with optional filters."""
-    query = db.query(Task)
+    """Get all tasks with optional filters (summaries; full task via /{id})."""
+    query = db.query(Task).options(defer(Task.description))
     
     if status:
         query = query.filter(Task.status == status)
@@ -55,14 +56,14 @@ def get_tasks(
     return query.offset(offset).limit(limit).all()
 
 
-@router.get("/today", response_model=List[TaskResponse])
+@router.get("/today", response_model=List[TaskSummary])
 def get_today_tasks(db: Session = Depends(get_db)):
     """Get tasks for today (MITs and tasks due today)."""
     today = date.today()
     today_start = datetime.combine(today, datetime.min.time())
     today_end = datetime.combine(today, datetime.max.time())
     
-    query = db.query(Task).filter(
+    query = db.query(Task).options(defer(Task.description)).filter(
         and_(
             Task.status.in_([TaskStatus.TODO, TaskStatus.IN_PROGRESS]),
             or_(
@@ -75,14 +76,14 @@ def get_today_tasks(db: Session = Depends(get_db)):
     return query.all()
 
 
-@router.get("/mit", response_model=List[TaskResponse])
+@router.get("/mit", response_model=List[TaskSummary])
 def get_mit_tasks(db: Session = Depends(get_db)):
     """Get Most Important Tasks for today."""
     today = date.today()
     today_start = datetime.combine(today, datetime.min.time())
     today_end = datetime.combine(today, datetime.max.time())
     
-    query = db.query(Task).filter(
+    query = db.query(Task).options(defer(Task.description)).filter(
         Task.is_mit == True,
         Task.status.in_([TaskStatus.TODO, TaskStatus.IN_PROGRESS]),
         or_(
@@ -110,6 +111,7 @@ def create_task(task_data: TaskCreate, db: Session = Depends(get_db)):
     db.add(task)
     db.commit()
     db.refresh(task)
+    sync_goal_progress(db, task.goal_id)
     return task
 
 
@@ -121,6 +123,7 @@ def update_task(task_id: int, task_data: TaskUpdate, db: Session = Depends(get_d
         raise HTTPException(status_code=404, detail="Task not found")
     
     update_data = task_data.model_dump(exclude_unset=True)
+    old_status, old_goal_id = task.status, task.goal_id
     
     # Auto-set completed_at when marking as done
     if update_data.get("status") == TaskStatus.DONE and not task.completed_at:
@@ -131,6 +134,8 @@ def update_task(task_id: int, task_data: TaskUpdate, db: Session = Depends(get_d
     
     db.commit()
     db.refresh(task)
+    if task.status != old_status or task.goal_id != old_goal_id:
+        sync_goal_progress(db, old_goal_id, task.goal_id)
     return task
 
 
@@ -141,8 +146,10 @@ def delete_task(task_id: int, db: Session = Depends(get_db)):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    goal_id = task.goal_id
     db.delete(task)
     db.commit()
+    sync_goal_progress(db, goal_id)
     return {"message": "Task deleted"}
 
 
@@ -158,6 +165,7 @@ def complete_task(task_id: int, db: Session = Depends(get_db)):
     
     db.commit()
     db.refresh(task)
+    sync_goal_progress(db, task.goal_id)
     return task
 
 
@@ -1,5 +1,5 @@
 """Pydantic schemas for API validation."""
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskSummary
 from app.schemas.calendar_event import EventCreate, EventUpdate, EventResponse
 from app.schemas.finance import (
     TransactionCreate, TransactionUpdate, TransactionResponse,
@@ -8,19 +8,19 @@ from app.schemas.finance import (
 )
 from app.schemas.health import HealthLogCreate, HealthLogUpdate, HealthLogResponse
 from app.schemas.habit import HabitCreate, HabitUpdate, HabitResponse, HabitLogCreate, HabitLogResponse
-from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse
-from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse
+from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse, GoalSummary
+from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse, NoteSummary, NoteSearchResult, NoteAttachment
 from app.schemas.settings import SettingsUpdate, SettingsResponse
 
 __all__ = [
-    "TaskCreate", "TaskUpdate", "TaskResponse",
+    "TaskCreate", "TaskUpdate", "TaskResponse", "TaskSummary",
     "EventCreate", "EventUpdate", "EventResponse",
     "TransactionCreate", "TransactionUpdate", "TransactionResponse",
     "BudgetCreate", "BudgetUpdate", "BudgetResponse",
     "SubscriptionCreate", "SubscriptionUpdate", "SubscriptionResponse",
     "HealthLogCreate", "HealthLogUpdate", "HealthLogResponse",
     "HabitCreate", "HabitUpdate", "HabitResponse", "HabitLogCreate", "HabitLogResponse",
-    "GoalCreate", "GoalUpdate", "GoalResponse",
-    "NoteCreate", "NoteUpdate", "NoteResponse",
+    "GoalCreate", "GoalUpdate", "GoalResponse", "GoalSummary",
+    "NoteCreate", "NoteUpdate", "NoteResponse", "NoteSummary", "NoteSearchResult",
     "SettingsUpdate", "SettingsResponse",
 ]
@@ -1,9 +1,20 @@
 """Calendar event schemas."""
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from zoneinfo import ZoneInfo
+from pydantic import BaseModel, Field, model_validator
 
+from app.config import settings
 from app.models.calendar_event import EventType, RecurrenceType
+from app.utils.recurrence import local_naive
+
+
+def ends_before_start(start: Optional[datetime], end: Optional[datetime]) -> bool:
+    """True if both are set and `end` precedes `start`; naive values are app-local time."""
+    if start is None or end is None:
+        return False
+    tz = ZoneInfo(settings.timezone)
+    return local_naive(end, tz) < local_naive(start, tz)
 
 
 class EventBase(BaseModel):
@@ -24,7 +35,12 @@ class EventBase(BaseModel):
 
 class EventCreate(EventBase):
     """Schema for creating an event."""
-    pass
+    
+    @model_validator(mode="after")
+    def check_period(self):
+        if ends_before_start(self.start_time, self.end_time):
+            raise ValueError("end_time must not be before start_time")
+        return self
 
 
 class EventUpdate(BaseModel):
@@ -41,6 +57,12 @@ class EventUpdate(BaseModel):
     recurrence_end_date: Optional[datetime] = None
     recurrence_days: Optional[List[int]] = None
     reminders: Optional[List[int]] = None
+    
+    @model_validator(mode="after")
+    def check_period(self):
+        if ends_before_start(self.start_time, self.end_time):
+            raise ValueError("end_time must not be before start_time")
+        return self
 
 
 class EventResponse(EventBase):
@@ -20,6 +20,7 @@ class GoalBase(BaseModel):
     target_date: Optional[date] = None
     progress_percent: Decimal = Field(0, ge=0, le=100)
     progress_notes: Optional[str] = None
+    auto_progress: bool = False
     milestones: List[Any] = []
     key_results: List[Any] = []
     color: str = "#8b5cf6"
@@ -46,6 +47,7 @@ class GoalUpdate(BaseModel):
     completed_date: Optional[date] = None
     progress_percent: Optional[Decimal] = Field(None, ge=0, le=100)
     progress_notes: Optional[str] = None
+    auto_progress: Optional[bool] = None
     milestones: Optional[List[Any]] = None
     key_results: Optional[List[Any]] = None
     color: Optional[str] = None
@@ -62,3 +64,27 @@ class GoalResponse(GoalBase):
     
     class Config:
         from_attributes = True
+
+
+class GoalSummary(BaseModel):
+    """Lightweight goal for list views (description truncated; no motivation, milestones or key results)."""
+    id: int
+    title: str
+    description: Optional[str] = Field(None, validation_alias="description_excerpt")
+    type: GoalType
+    category: GoalCategory
+    status: GoalStatus
+    parent_id: Optional[int] = None
+    start_date: Optional[date] = None
+    target_date: Optional[date] = None
+    completed_date: Optional[date] = None
+    progress_percent: Decimal
+    auto_progress: bool = False
+    color: str
+    icon: str
+    priority: int
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
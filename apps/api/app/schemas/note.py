@@ -49,3 +49,46 @@ class NoteResponse(NoteBase):
     
     class Config:
         from_attributes = True
+
+
+class NoteSummary(BaseModel):
+    """Lightweight note for list views: excerpt instead of the full body."""
+    id: int
+    title: Optional[str] = None
+    excerpt: str
+    type: NoteType
+    tags: List[str] = []
+    folder: Optional[str] = None
+    is_pinned: bool = False
+    is_starred: bool = False
+    is_archived: bool = False
+    url: Optional[str] = None
+    mood: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class NoteAttachment(BaseModel):
+    """Reference to a stored attachment blob."""
+    sha256: str
+    name: str
+    type: str
+    size: int
+    url: str
+
+
+class NoteSearchResult(BaseModel):
+    """Search hit with relevance rank and highlighted snippet."""
+    id: int
+    title: Optional[str] = None
+    type: NoteType
+    folder: Optional[str] = None
+    tags: List[str] = []
+    is_pinned: bool = False
+    rank: Optional[float] = None
+    snippet: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
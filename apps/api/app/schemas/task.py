@@ -53,3 +53,25 @@ class TaskResponse(TaskBase):
     
     class Config:
         from_attributes = True
+
+
+class TaskSummary(BaseModel):
+    """Lightweight task for list views (no description)."""
+    id: int
+    title: str
+    status: TaskStatus
+    priority: TaskPriority
+    due_date: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    tags: List[str] = []
+    project: Optional[str] = None
+    is_mit: bool = False
+    mit_date: Optional[datetime] = None
+    goal_id: Optional[int] = None
+    is_recurring: bool = False
+    recurrence_pattern: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,182 @@
+"""Persistent cache of AI responses keyed on mode, prompt and context."""
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal, dialect_insert
+from app.models.ai_cache import AIResponse
+from app.services.openai_service import UNAVAILABLE_MESSAGE, OpenAIService
+
+# How long an answer stays valid per mode; modes not listed are never cached
+# (free-form chat and motivation should vary between calls)
+AI_CACHE_TTLS = {
+    "daily_briefing": timedelta(hours=6),
+    "plan_day": timedelta(minutes=30),
+    "week_summary": timedelta(hours=12),
+    "break_goal": timedelta(days=7),
+}
+
+
+# Context fields that follow the clock rather than the data: plan_day's
+# schedule carries the current time and free slots starting at it, which
+# would change the key every minute. The busy blocks still key the plan,
+# and the TTL bounds how far the clock moves before it is regenerated.
+VOLATILE_CONTEXT_FIELDS = {"schedule": ("now", "free")}
+
+
+def response_key(mode: str, prompt: str, context: Optional[dict]) -> str:
+    """Stable sha256 of (mode, prompt, context); dict order and clock-driven fields don't matter."""
+    context = dict(context or {})
+    for section, fields in VOLATILE_CONTEXT_FIELDS.items():
+        if isinstance(context.get(section), dict):
+            context[section] = {k: v for k, v in context[section].items() if k not in fields}
+    payload = json.dumps([mode, prompt, context], sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AIResponseCache:
+    """Answers stored in `ai_response_cache`, so they survive restarts and are shared by workers.
+
+    A context change produces a new key, so stale answers are never served
+    after the data they were based on changes; TTLs bound how long an
+    unchanged context reuses the same answer. Identical concurrent misses
+    in one worker share a single completion.
+    """
+
+    def __init__(self, ttls: Dict[str, timedelta] = AI_CACHE_TTLS):
+        self.ttls = ttls
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def get(self, db: Session, key: str) -> Optional[str]:
+        entry = db.query(AIResponse).filter(
+            AIResponse.key == key,
+            AIResponse.expires_at > datetime.now(timezone.utc)
+        ).first()
+        if not entry:
+            return None
+        entry.hits += 1
+        db.commit()
+        return entry.response
+
+    def put(self, db: Session, key: str, mode: str, response: str):
+        """Upsert an answer and drop expired ones. Commits."""
+        now = datetime.now(timezone.utc)
+        values = {"key": key, "mode": mode, "response": response, "hits": 0, "created_at": now, "expires_at": now + self.ttls[mode]}
+        stmt = dialect_insert(db, AIResponse.__table__).values(**values)
+        db.execute(stmt.on_conflict_do_update(index_elements=["key"], set_={k: v for k, v in values.items() if k != "key"}))
+        db.query(AIResponse).filter(AIResponse.expires_at <= now).delete(synchronize_session=False)
+        db.commit()
+
+    async def chat(
+        self,
+        db: Session,
+        ai_service: OpenAIService,
+        message: str,
+        mode: str = "general",
+        context: Optional[dict] = None,
+        refresh: bool = False,
+    ) -> Tuple[str, bool]:
+        """Cached `ai_service.chat`; returns (response, served_from_cache).
+
+        `refresh` skips the lookup and stores the new answer. Errors are
+        returned as text like `chat` does and are not cached.
+        """
+        if not ai_service.client:
+            return UNAVAILABLE_MESSAGE, False
+        if mode not in self.ttls:
+            return await ai_service.chat(message, mode, context), False
+
+        key = response_key(mode, message, context)
+        if not refresh:
+            cached = await run_in_threadpool(self.get, db, key)
+            if cached is not None:
+                return cached, True
+            pending = self._inflight.get(key)
+            if pending is not None:
+                try:
+                    return await asyncio.shield(pending), False
+                except asyncio.CancelledError:
+                    # The leading request was cancelled, not this one: generate here
+                    if not pending.cancelled():
+                        raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            try:
+                response = await ai_service.generate(message, mode, context)
+            except Exception as e:
+                response = f"Помилка AI: {str(e)}"
+            else:
+                try:
+                    await run_in_threadpool(self.put, db, key, mode, response)
+                except Exception as e:
+                    db.rollback()
+                    print(f"AI cache write failed: {e}")
+            future.set_result(response)
+            return response, False
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if not future.done():
+                future.cancel()
+
+    def _lookup(self, key: str) -> Optional[str]:
+        with SessionLocal() as db:
+            return self.get(db, key)
+
+    def _store(self, key: str, mode: str, response: str):
+        with SessionLocal() as db:
+            self.put(db, key, mode, response)
+
+    async def stream(
+        self,
+        ai_service: OpenAIService,
+        message: str,
+        mode: str = "general",
+        context: Optional[dict] = None,
+        refresh: bool = False,
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """Streamed answer as ("token", ...) events, then ("done", ...) or ("error", ...).
+
+        Opens its own sessions, since it runs while the response is being
+        sent, after the request's session is closed. A cache hit is sent
+        as a single token; a completed stream is stored for cacheable modes.
+        """
+        if not ai_service.client:
+            yield "token", {"content": UNAVAILABLE_MESSAGE}
+            yield "done", {"mode": mode, "cached": False}
+            return
+
+        key = response_key(mode, message, context) if mode in self.ttls else None
+        if key and not refresh:
+            cached = await run_in_threadpool(self._lookup, key)
+            if cached is not None:
+                yield "token", {"content": cached}
+                yield "done", {"mode": mode, "cached": True}
+                return
+
+        parts = []
+        try:
+            async for delta in ai_service.stream(message, mode, context):
+                parts.append(delta)
+                yield "token", {"content": delta}
+        except Exception as e:
+            yield "error", {"detail": f"Помилка AI: {str(e)}"}
+            return
+
+        if key:
+            try:
+                await run_in_threadpool(self._store, key, mode, "".join(parts))
+            except Exception as e:
+                print(f"AI cache write failed: {e}")
+        yield "done", {"mode": mode, "cached": False}
+
+
+# Global cache instance
+ai_cache = AIResponseCache()
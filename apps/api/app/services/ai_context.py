@@ -0,0 +1,138 @@
+"""User context for AI prompts, built off the event loop."""
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.finance import Transaction, TransactionType
+from app.models.goal import Goal, GoalStatus
+from app.models.habit import Habit, HabitLog
+from app.models.health import HealthLog, MoodLevel
+from app.models.task import Task, TaskPriority, TaskStatus
+from app.services.freebusy import get_freebusy
+
+TASK_PRIORITY_ORDER = [TaskPriority.URGENT, TaskPriority.HIGH, TaskPriority.MEDIUM, TaskPriority.LOW]
+MAX_CONTEXT_TASKS = 30
+
+
+def _tasks(db: Session, today: date) -> list:
+    """Open tasks, MITs and most urgent first; the prompt compactor trims to its budget."""
+    rank = case(*[(Task.priority == priority, i) for i, priority in enumerate(TASK_PRIORITY_ORDER)])
+    rows = db.query(Task.title, Task.priority, Task.is_mit).filter(
+        Task.status.in_([TaskStatus.TODO, TaskStatus.IN_PROGRESS])
+    ).order_by(Task.is_mit.desc(), rank, Task.id).limit(MAX_CONTEXT_TASKS).all()
+    return [
+        {"title": title, "priority": priority.value, "is_mit": is_mit}
+        for title, priority, is_mit in rows
+    ]
+
+
+def _schedule(db: Session, today: date) -> dict:
+    """Free time left today, so the plan can be laid out in real slots."""
+    now = datetime.now(ZoneInfo(settings.timezone))
+    end_of_day = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=now.tzinfo)
+    schedule = get_freebusy(db, now, end_of_day, timedelta(minutes=15))
+    return {
+        "now": now.strftime("%H:%M"),
+        "busy": [f"{b['start'][11:16]}-{b['end'][11:16]}" for b in schedule["busy"]],
+        "free": [f"{f['start'][11:16]}-{f['end'][11:16]}" for f in schedule["free"]],
+    }
+
+
+def _goals(db: Session, today: date) -> list:
+    rows = db.query(Goal.title, Goal.progress_percent, Goal.type).filter(
+        Goal.status.in_([GoalStatus.NOT_STARTED, GoalStatus.IN_PROGRESS])
+    ).order_by(Goal.id).limit(5).all()
+    return [
+        {"title": title, "progress": float(progress or 0), "type": goal_type.value}
+        for title, progress, goal_type in rows
+    ]
+
+
+def _habits(db: Session, today: date) -> list:
+    """Active habits with this week's completions, counted in one grouped join."""
+    week_ago = today - timedelta(days=7)
+    rows = db.query(
+        Habit.name,
+        Habit.current_streak,
+        func.count(HabitLog.id),
+    ).outerjoin(HabitLog, and_(
+        HabitLog.habit_id == Habit.id,
+        HabitLog.log_date >= week_ago,
+        HabitLog.completed == True
+    )).filter(
+        Habit.is_active == True
+    ).group_by(Habit.id, Habit.name, Habit.current_streak).order_by(Habit.id).all()
+    return [
+        {"name": name, "streak": streak, "completed_this_week": completed}
+        for name, streak, completed in rows
+    ]
+
+
+def _health(db: Session, today: date) -> Optional[dict]:
+    week_ago = today - timedelta(days=7)
+    mood_value = case(*[(HealthLog.mood == level, level.value) for level in MoodLevel])
+    avg_sleep, avg_mood, days_logged = db.query(
+        func.avg(HealthLog.sleep_hours),
+        func.avg(mood_value),
+        func.count(HealthLog.id),
+    ).filter(HealthLog.log_date >= week_ago).one()
+    if not days_logged:
+        return None
+    return {
+        "avg_sleep": round(float(avg_sleep or 0), 1),
+        "avg_mood": round(float(avg_mood or 0), 1),
+        "days_logged": days_logged
+    }
+
+
+def _finances(db: Session, today: date) -> dict:
+    this_month_start = today.replace(day=1)
+    expenses = db.query(func.sum(Transaction.amount)).filter(
+        and_(
+            Transaction.type == TransactionType.EXPENSE,
+            Transaction.date >= datetime.combine(this_month_start, datetime.min.time())
+        )
+    ).scalar() or 0
+    return {"month_expenses": float(expenses)}
+
+
+# Context sections in prompt order, with the modes that include them
+CONTEXT_SECTIONS: List[tuple] = [
+    ("tasks", _tasks, {"plan_day", "daily_briefing", "week_summary", "general"}),
+    ("schedule", _schedule, {"plan_day"}),
+    ("goals", _goals, {"plan_day", "week_summary", "general"}),
+    ("habits", _habits, {"week_summary", "daily_briefing"}),
+    ("health", _health, {"week_summary", "daily_briefing"}),
+    ("finances", _finances, {"week_summary"}),
+]
+
+
+def _run_section(build: Callable[[Session, date], object], today: date):
+    # Sessions aren't thread-safe, so every section gets its own
+    with SessionLocal() as db:
+        return build(db, today)
+
+
+async def get_user_context(mode: str) -> dict:
+    """Get relevant user context for AI.
+
+    Each section is a fixed number of queries (grouped, no per-row
+    lookups) run in the threadpool with its own session, and sections run
+    concurrently, so the event loop never blocks on the database.
+    """
+    today = date.today()
+    sections = [(name, build) for name, build, modes in CONTEXT_SECTIONS if mode in modes]
+    values = await asyncio.gather(*(run_in_threadpool(_run_section, build, today) for _, build in sections))
+
+    context: Dict[str, object] = {}
+    for (name, _), value in zip(sections, values):
+        if value is not None:
+            context[name] = value
+    return context
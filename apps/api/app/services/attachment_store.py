@@ -0,0 +1,82 @@
+"""Content-addressed local file store for note attachments."""
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Tuple
+
+from app.config import settings
+
+HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Bytes read from the upload per iteration; bounds memory per request
+CHUNK_SIZE = 1024 * 1024
+
+
+class AttachmentTooLarge(Exception):
+    """Upload exceeded the configured size limit."""
+
+
+class AttachmentStore:
+    """Blobs stored once under their SHA-256: <root>/ab/cd/abcd….
+
+    Identical uploads share a file. Blobs are immutable, so callers can
+    cache them forever by hash.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path_for(self, digest: str) -> Path:
+        if not HASH_RE.match(digest):
+            raise ValueError("Invalid attachment hash")
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path_for(digest).is_file()
+
+    def save(self, source: BinaryIO, max_bytes: int) -> Tuple[str, int]:
+        """Stream `source` into the store; returns (sha256, size).
+
+        Data is hashed while it is copied to a temp file in the store, then
+        renamed into place, or discarded if the blob is already stored.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise AttachmentTooLarge(f"Attachment exceeds {max_bytes} bytes")
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            sha256 = digest.hexdigest()
+            path = self.path_for(sha256)
+            if path.is_file():
+                os.unlink(tmp_path)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, path)
+            return sha256, size
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def delete(self, digest: str):
+        try:
+            self.path_for(digest).unlink()
+        except FileNotFoundError:
+            pass
+
+
+# Global store instance
+attachment_store = AttachmentStore(settings.attachments_dir)
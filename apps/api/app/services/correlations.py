@@ -0,0 +1,203 @@
+"""Cross-domain daily correlations (health, habits, spending, tasks)."""
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.database import local_day
+from app.models.finance import Transaction, TransactionType
+from app.models.habit import Habit, HabitLog
+from app.models.health import HealthLog
+from app.models.task import Task, TaskStatus
+
+HEALTH_VARIABLES = ["sleep_hours", "mood", "energy_level", "water_glasses", "steps", "weight_kg"]
+VARIABLES = HEALTH_VARIABLES + ["habits_completed", "habits_missed", "spend", "tasks_completed"]
+
+# Computed results are cached per request parameters
+CACHE_TTL_SECONDS = 15 * 60
+CACHE_SIZE = 32
+
+
+def _as_date(value) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def daily_matrix(db: Session, start: date, end: date) -> np.ndarray:
+    """Days x VARIABLES matrix; NaN where a health metric wasn't logged.
+
+    One ranged query per table. Counts and spend are true zeros on days
+    without rows; habit days are only counted once any habit was logged.
+    """
+    days = (end - start).days + 1
+    matrix = np.full((days, len(VARIABLES)), np.nan)
+    column = {name: i for i, name in enumerate(VARIABLES)}
+
+    rows = db.query(HealthLog.log_date, *[getattr(HealthLog, name) for name in HEALTH_VARIABLES]).filter(
+        HealthLog.log_date >= start,
+        HealthLog.log_date <= end
+    ).all()
+    for row in rows:
+        day = (row[0] - start).days
+        for i, value in enumerate(row[1:]):
+            if value is not None:
+                matrix[day, i] = float(value)
+
+    habit_rows = db.query(
+        HabitLog.log_date,
+        func.sum(case((HabitLog.completed == True, 1), else_=0)),
+    ).filter(
+        HabitLog.log_date >= start,
+        HabitLog.log_date <= end
+    ).group_by(HabitLog.log_date).all()
+    active_habits = db.query(func.count(Habit.id)).filter(Habit.is_active == True).scalar() or 0
+    for log_date, completed in habit_rows:
+        day = (_as_date(log_date) - start).days
+        matrix[day, column["habits_completed"]] = float(completed or 0)
+        matrix[day, column["habits_missed"]] = float(max(active_habits - (completed or 0), 0))
+
+    range_start = datetime.combine(start, datetime.min.time())
+    range_end = datetime.combine(end + timedelta(days=1), datetime.min.time())
+
+    spend_day = local_day(db, Transaction.date)
+    matrix[:, column["spend"]] = 0.0
+    for day_value, total in db.query(spend_day, func.sum(Transaction.amount)).filter(
+        Transaction.type == TransactionType.EXPENSE,
+        Transaction.date >= range_start,
+        Transaction.date < range_end
+    ).group_by(spend_day).all():
+        day = (_as_date(day_value) - start).days
+        if 0 <= day < days:
+            matrix[day, column["spend"]] = float(total or 0)
+
+    task_day = local_day(db, Task.completed_at)
+    matrix[:, column["tasks_completed"]] = 0.0
+    for day_value, count in db.query(task_day, func.count(Task.id)).filter(
+        Task.status == TaskStatus.DONE,
+        Task.completed_at >= range_start,
+        Task.completed_at < range_end
+    ).group_by(task_day).all():
+        day = (_as_date(day_value) - start).days
+        if 0 <= day < days:
+            matrix[day, column["tasks_completed"]] = float(count)
+
+    return matrix
+
+
+def lagged_correlations(matrix: np.ndarray, max_lag: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Pairwise Pearson r of x(t) against y(t + lag) for every lag, NaN-aware.
+
+    Returns (r, n), both shaped (lags, variables, variables); r[l, i, j]
+    correlates variable i with variable j `l` days later over the n days
+    where both are present. All lags and pairs are computed at once with
+    einsum over masked sums.
+    """
+    days, count = matrix.shape
+    lags = max_lag + 1
+    # Shifted copies: shifted[l, t] = matrix[t + l] (NaN past the end)
+    padded = np.vstack([matrix, np.full((max_lag, count), np.nan)])
+    shifted = np.stack([padded[lag:lag + days] for lag in range(lags)])
+
+    x_valid = ~np.isnan(matrix)
+    y_valid = ~np.isnan(shifted)
+    x = np.where(x_valid, matrix, 0.0)
+    y = np.where(y_valid, shifted, 0.0)
+    xv = x_valid.astype(np.float64)
+    yv = y_valid.astype(np.float64)
+
+    n = np.einsum("ti,ltj->lij", xv, yv)
+    sum_x = np.einsum("ti,ltj->lij", x, yv)
+    sum_y = np.einsum("ti,ltj->lij", xv, y)
+    sum_xx = np.einsum("ti,ltj->lij", x * x, yv)
+    sum_yy = np.einsum("ti,ltj->lij", xv, y * y)
+    sum_xy = np.einsum("ti,ltj->lij", x, y)
+
+    cov = n * sum_xy - sum_x * sum_y
+    var = (n * sum_xx - sum_x ** 2) * (n * sum_yy - sum_y ** 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = np.where((n > 2) & (var > 1e-12), cov / np.sqrt(np.maximum(var, 1e-300)), np.nan)
+    return np.clip(r, -1.0, 1.0), n.astype(np.int64)
+
+
+class CorrelationCache:
+    """Small LRU of computed results per date range, each kept for CACHE_TTL_SECONDS."""
+
+    def __init__(self):
+        self._entries: "OrderedDict[tuple, Tuple[float, dict]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry or time.monotonic() - entry[0] > CACHE_TTL_SECONDS:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: tuple, value: dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+
+correlation_cache = CorrelationCache()
+
+
+def get_correlations(
+    db: Session,
+    start: date,
+    end: date,
+    max_lag: int = 3,
+    min_days: int = 14,
+    top: int = 15,
+    refresh: bool = False,
+) -> dict:
+    """Lagged correlation matrix between daily variables plus the strongest pairs."""
+    key = (start, end, max_lag, min_days, top)
+    if not refresh:
+        cached = correlation_cache.get(key)
+        if cached is not None:
+            return cached
+
+    matrix = daily_matrix(db, start, end)
+    r, n = lagged_correlations(matrix, max_lag)
+    r = np.where(n >= min_days, r, np.nan)
+
+    def cell(value) -> Optional[float]:
+        return None if np.isnan(value) else round(float(value), 3)
+
+    strongest: List[Dict] = []
+    lag_idx, i_idx, j_idx = np.where(~np.isnan(r))
+    for lag, i, j in zip(lag_idx, i_idx, j_idx):
+        # Same-day pairs are symmetric, and a variable with itself is trivial
+        if lag == 0 and i >= j:
+            continue
+        strongest.append({
+            "x": VARIABLES[i],
+            "y": VARIABLES[j],
+            "lag_days": int(lag),
+            "r": round(float(r[lag, i, j]), 3),
+            "n": int(n[lag, i, j]),
+        })
+    strongest.sort(key=lambda item: abs(item["r"]), reverse=True)
+
+    result = {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": int(matrix.shape[0]),
+        "variables": VARIABLES,
+        "coverage": {
+            name: int(np.count_nonzero(~np.isnan(matrix[:, i]))) for i, name in enumerate(VARIABLES)
+        },
+        "lags": list(range(max_lag + 1)),
+        "matrix": [[[cell(v) for v in row] for row in r[lag]] for lag in range(max_lag + 1)],
+        "strongest": strongest[:top],
+    }
+    correlation_cache.put(key, result)
+    return result
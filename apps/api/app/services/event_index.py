@@ -0,0 +1,96 @@
+"""Overlap lookups for calendar events."""
+from datetime import datetime
+from threading import Lock
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, literal_column
+from sqlalchemy.orm import Session, Query
+
+from app.models.calendar_event import CalendarEvent
+from app.utils.intervals import IntervalTree
+
+
+# Inline bounds literal so the planner sees the same expression as the index
+_CLOSED = literal_column("'[]'")
+
+
+def event_period():
+    """Event period as a tstzrange; must match the GiST index expression."""
+    return func.tstzrange(
+        CalendarEvent.start_time,
+        func.coalesce(CalendarEvent.end_time, CalendarEvent.start_time),
+        _CLOSED,
+    )
+
+
+def _naive(value: datetime) -> datetime:
+    """SQLite stores datetimes without offset, so compare them naive."""
+    return value.replace(tzinfo=None) if value.tzinfo else value
+
+
+class EventIntervalIndex:
+    """Per-process interval tree over event periods (SQLite fallback).
+
+    The tree holds only (start, end, id) and is rebuilt when the table
+    fingerprint (row count + newest ``updated_at``) changes, so writes from
+    other workers are picked up on the next lookup.
+    """
+
+    def __init__(self):
+        self._tree: IntervalTree = IntervalTree()
+        self._fingerprint: Optional[Tuple] = None
+        self._lock = Lock()
+
+    def invalidate(self):
+        """Force a rebuild on the next lookup."""
+        with self._lock:
+            self._fingerprint = None
+
+    def lookup(self, db: Session, start: datetime, end: datetime) -> List[int]:
+        """Get ids of events whose period overlaps [start, end]."""
+        fingerprint = tuple(db.query(
+            func.count(CalendarEvent.id),
+            func.max(CalendarEvent.updated_at)
+        ).one())
+
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                rows = db.query(
+                    CalendarEvent.id,
+                    CalendarEvent.start_time,
+                    CalendarEvent.end_time
+                ).all()
+                self._tree = IntervalTree([
+                    (_naive(s), _naive(e or s), event_id) for event_id, s, e in rows
+                ])
+                self._fingerprint = fingerprint
+            tree = self._tree
+
+        return tree.overlap(_naive(start), _naive(end))
+
+
+# Global index instance
+event_index = EventIntervalIndex()
+
+
+def events_overlapping(db: Session, start: datetime, end: datetime) -> Query:
+    """Query events that overlap [start, end]: start before the window ends and end after it starts.
+
+    Postgres uses the GiST range index, SQLite the in-memory interval tree,
+    anything else the (start_time, end_time) btree index.
+    """
+    query = db.query(CalendarEvent)
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        return query.filter(event_period().op("&&")(func.tstzrange(start, end, _CLOSED)))
+
+    if dialect == "sqlite":
+        return query.filter(CalendarEvent.id.in_(event_index.lookup(db, start, end)))
+
+    return query.filter(
+        and_(
+            CalendarEvent.start_time <= end,
+            func.coalesce(CalendarEvent.end_time, CalendarEvent.start_time) >= start
+        )
+    )
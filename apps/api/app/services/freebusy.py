@@ -0,0 +1,111 @@
+"""Free/busy computation over calendar events."""
+from datetime import datetime, timedelta
+from typing import List, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, load_only
+
+from app.config import settings
+from app.models.calendar_event import CalendarEvent, RecurrenceType
+from app.services.event_index import events_overlapping
+from app.utils.recurrence import event_occurrences, local_naive
+
+Interval = Tuple[datetime, datetime]
+
+FREEBUSY_COLUMNS = (
+    CalendarEvent.id,
+    CalendarEvent.start_time,
+    CalendarEvent.end_time,
+    CalendarEvent.all_day,
+    CalendarEvent.recurrence_type,
+    CalendarEvent.recurrence_days,
+    CalendarEvent.recurrence_end_date,
+)
+
+
+def merge_intervals(intervals: List[Interval]) -> List[Interval]:
+    """Sort-and-sweep merge of overlapping or touching intervals."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def open_slots(busy: List[Interval], start: datetime, end: datetime, min_slot: timedelta) -> List[Interval]:
+    """Gaps of at least `min_slot` between merged busy blocks inside [start, end]."""
+    slots: List[Interval] = []
+    cursor = start
+    for busy_start, busy_end in busy:
+        if busy_start - cursor >= min_slot:
+            slots.append((cursor, busy_start))
+        cursor = max(cursor, busy_end)
+    if end - cursor >= min_slot:
+        slots.append((cursor, end))
+    return slots
+
+
+def get_freebusy(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    min_slot: timedelta = timedelta(minutes=30),
+    include_all_day: bool = False,
+) -> dict:
+    """Busy blocks and open slots in [start, end], recurring events expanded.
+
+    Times are wall-clock in the app timezone; aware inputs are converted.
+    """
+    tz = ZoneInfo(settings.timezone)
+    start = local_naive(start, tz)
+    end = local_naive(end, tz)
+    window_start = start.replace(tzinfo=tz)
+    window_end = end.replace(tzinfo=tz)
+
+    # Single events: overlap index. Recurring series: every series still live in the window.
+    single = events_overlapping(db, window_start, window_end).options(
+        load_only(*FREEBUSY_COLUMNS)
+    ).filter(
+        or_(
+            CalendarEvent.recurrence_type == RecurrenceType.NONE,
+            CalendarEvent.recurrence_type.is_(None)
+        )
+    )
+    recurring = db.query(CalendarEvent).options(load_only(*FREEBUSY_COLUMNS)).filter(
+        CalendarEvent.recurrence_type != RecurrenceType.NONE,
+        CalendarEvent.start_time <= window_end,
+        or_(
+            CalendarEvent.recurrence_end_date.is_(None),
+            CalendarEvent.recurrence_end_date >= window_start
+        )
+    )
+    if not include_all_day:
+        single = single.filter(CalendarEvent.all_day == False)
+        recurring = recurring.filter(CalendarEvent.all_day == False)
+
+    intervals: List[Interval] = []
+    for event in single.all() + recurring.all():
+        for occ_start, occ_end in event_occurrences(event, start, end, tz):
+            occ_start, occ_end = max(occ_start, start), min(occ_end, end)
+            if occ_end > occ_start:
+                intervals.append((occ_start, occ_end))
+
+    busy = merge_intervals(intervals)
+    free = open_slots(busy, start, end, min_slot)
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "timezone": settings.timezone,
+        "busy": [{"start": s.isoformat(), "end": e.isoformat()} for s, e in busy],
+        "free": [
+            {"start": s.isoformat(), "end": e.isoformat(), "minutes": int((e - s).total_seconds() // 60)}
+            for s, e in free
+        ],
+        "busy_minutes": int(sum((e - s).total_seconds() for s, e in busy) // 60),
+        "free_minutes": int(sum((e - s).total_seconds() for s, e in free) // 60),
+    }
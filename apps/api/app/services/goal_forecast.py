@@ -0,0 +1,130 @@
+"""Goal progress history and completion forecasts."""
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.goal import Goal, GoalProgressSnapshot, GoalStatus
+
+# History considered by the trend fit
+FORECAST_WINDOW_DAYS = 90
+# Projections further out than this are reported as "no_trend"
+MAX_PROJECTION_DAYS = 3650
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def record_progress(db: Session, goal: Goal, source: str):
+    """Append the goal's current progress to its history; does not commit."""
+    db.add(GoalProgressSnapshot(
+        goal_id=goal.id,
+        progress_percent=goal.progress_percent or Decimal(0),
+        source=source
+    ))
+
+
+def _days(value: datetime) -> float:
+    """Datetime as fractional days since the epoch; naive values are UTC (SQLite)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH).total_seconds() / 86400
+
+
+def forecast_goals(db: Session, goal_ids: Optional[List[int]] = None) -> List[dict]:
+    """Least-squares progress trend per goal and the projected completion date.
+
+    Snapshots of all requested goals (default: active ones) come from one
+    query. The per-goal line fits are computed together with grouped sums
+    (np.bincount) over the flat arrays, without a Python loop per point.
+    The goal's current progress is always included as the latest point.
+    """
+    goals_query = db.query(
+        Goal.id, Goal.progress_percent, Goal.status, Goal.target_date, Goal.completed_date
+    )
+    if goal_ids is not None:
+        goals_query = goals_query.filter(Goal.id.in_(goal_ids))
+    else:
+        goals_query = goals_query.filter(Goal.status.in_([GoalStatus.NOT_STARTED, GoalStatus.IN_PROGRESS]))
+    goals = goals_query.order_by(Goal.id).all()
+    if not goals:
+        return []
+
+    now = datetime.now(timezone.utc)
+    since = now - timedelta(days=FORECAST_WINDOW_DAYS)
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite stores CURRENT_TIMESTAMP as naive UTC text
+        since = since.replace(tzinfo=None)
+    index = {goal.id: i for i, goal in enumerate(goals)}
+    snapshots = db.query(
+        GoalProgressSnapshot.goal_id,
+        GoalProgressSnapshot.recorded_at,
+        GoalProgressSnapshot.progress_percent
+    ).filter(
+        GoalProgressSnapshot.goal_id.in_(list(index)),
+        GoalProgressSnapshot.recorded_at >= since
+    ).all()
+
+    count = len(goals)
+    group = np.fromiter(
+        [index[s.goal_id] for s in snapshots] + list(range(count)), dtype=np.int64,
+        count=len(snapshots) + count
+    )
+    t = np.fromiter(
+        [_days(s.recorded_at) for s in snapshots] + [_days(now)] * count, dtype=np.float64,
+        count=len(snapshots) + count
+    )
+    y = np.fromiter(
+        [float(s.progress_percent) for s in snapshots] + [float(g.progress_percent or 0) for g in goals],
+        dtype=np.float64, count=len(snapshots) + count
+    )
+
+    # Centre time per goal so the sums stay well-conditioned
+    n = np.bincount(group, minlength=count).astype(np.float64)
+    t_mean = np.bincount(group, weights=t, minlength=count) / n
+    y_mean = np.bincount(group, weights=y, minlength=count) / n
+    dt = t - t_mean[group]
+    dy = y - y_mean[group]
+    s_tt = np.bincount(group, weights=dt * dt, minlength=count)
+    s_ty = np.bincount(group, weights=dt * dy, minlength=count)
+    s_yy = np.bincount(group, weights=dy * dy, minlength=count)
+    first = np.full(count, np.inf)
+    np.minimum.at(first, group, t)
+
+    has_trend = s_tt > 1e-9
+    slope = np.divide(s_ty, s_tt, out=np.zeros(count), where=has_trend)
+    r2 = np.divide(s_ty * s_ty, s_tt * s_yy, out=np.zeros(count), where=has_trend & (s_yy > 1e-9))
+    # Days from now until the fitted line reaches 100%
+    current = np.array([float(g.progress_percent or 0) for g in goals])
+    remaining = np.divide(100 - current, slope, out=np.full(count, np.inf), where=slope > 1e-9)
+
+    today = now.date()
+    results = []
+    for i, goal in enumerate(goals):
+        projected: Optional[date] = None
+        if goal.status == GoalStatus.COMPLETED or current[i] >= 100:
+            status = "completed"
+            projected = goal.completed_date or today
+        elif n[i] < 2 or not has_trend[i]:
+            status = "insufficient_data"
+        elif not np.isfinite(remaining[i]) or remaining[i] > MAX_PROJECTION_DAYS:
+            status = "no_trend"
+        else:
+            projected = today + timedelta(days=int(np.ceil(remaining[i])))
+            status = "on_track" if not goal.target_date or projected <= goal.target_date else "behind"
+
+        days_ahead = (goal.target_date - projected).days if projected and goal.target_date else None
+        results.append({
+            "goal_id": goal.id,
+            "progress_percent": round(float(current[i]), 2),
+            "slope_per_day": round(float(slope[i]), 3),
+            "r2": round(float(r2[i]), 3),
+            "points": int(n[i]),
+            "history_days": round(float(_days(now) - first[i]), 1),
+            "target_date": goal.target_date.isoformat() if goal.target_date else None,
+            "projected_completion_date": projected.isoformat() if projected else None,
+            "days_ahead": days_ahead,
+            "status": status,
+        })
+    return results
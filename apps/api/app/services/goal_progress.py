@@ -0,0 +1,101 @@
+"""Automatic goal progress from linked tasks and key results."""
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, List, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session, load_only
+
+from app.models.goal import Goal, GoalStatus
+from app.models.task import Task, TaskStatus
+from app.services.goal_tree import goal_rollups
+from app.services.goal_forecast import record_progress
+
+
+def set_goal_progress(goal: Goal, progress: Decimal):
+    """Set progress and keep status in step: 100% completes, dropping below reopens."""
+    goal.progress_percent = progress
+    if progress == Decimal(100) and goal.status != GoalStatus.COMPLETED:
+        goal.status = GoalStatus.COMPLETED
+        goal.completed_date = date.today()
+    elif progress < Decimal(100) and goal.status == GoalStatus.COMPLETED:
+        goal.status = GoalStatus.IN_PROGRESS
+        goal.completed_date = None
+
+
+def key_result_ratio(key_result) -> Optional[float]:
+    """current / target clamped to [0, 1]; None when the entry has no usable target."""
+    if not isinstance(key_result, dict):
+        return None
+    try:
+        target = float(key_result.get("target"))
+        current = float(key_result.get("current") or 0)
+    except (TypeError, ValueError):
+        return None
+    if target <= 0:
+        return None
+    return min(max(current / target, 0.0), 1.0)
+
+
+def compute_progress(tasks_total: int, tasks_done: int, key_results) -> Optional[Decimal]:
+    """Mean of the task completion ratio (one component) and each key result's ratio.
+
+    None when the goal has neither linked tasks nor measurable key results,
+    so its stored progress is left alone.
+    """
+    ratios: List[float] = []
+    if tasks_total:
+        ratios.append(tasks_done / tasks_total)
+    ratios.extend(r for r in (key_result_ratio(kr) for kr in key_results or []) if r is not None)
+    if not ratios:
+        return None
+    return Decimal(str(round(100 * sum(ratios) / len(ratios), 2)))
+
+
+def refresh_auto_progress(db: Session, goal_ids: Optional[Iterable[int]] = None) -> List[int]:
+    """Recompute progress for auto-progress goals (all, or just `goal_ids`).
+
+    Task counts for every goal come from one grouped query joined to the
+    goals. Changes are appended to the progress history. Returns ids of
+    goals whose progress changed; does not commit.
+    """
+    counts = select(
+        Task.goal_id,
+        func.count(Task.id).label("total"),
+        func.sum(case((Task.status == TaskStatus.DONE, 1), else_=0)).label("done")
+    ).where(Task.goal_id.isnot(None), Task.status != TaskStatus.CANCELLED)
+
+    query = db.query(Goal).options(load_only(
+        Goal.id, Goal.status, Goal.progress_percent, Goal.completed_date, Goal.key_results
+    )).filter(
+        Goal.auto_progress == True,
+        Goal.status != GoalStatus.ABANDONED
+    )
+
+    if goal_ids is not None:
+        goal_ids = {goal_id for goal_id in goal_ids if goal_id is not None}
+        if not goal_ids:
+            return []
+        counts = counts.where(Task.goal_id.in_(goal_ids))
+        query = query.filter(Goal.id.in_(goal_ids))
+
+    counts = counts.group_by(Task.goal_id).subquery()
+    rows = query.outerjoin(counts, counts.c.goal_id == Goal.id).add_columns(counts.c.total, counts.c.done).all()
+
+    changed = []
+    for goal, total, done in rows:
+        progress = compute_progress(total or 0, int(done or 0), goal.key_results)
+        if progress is not None and progress != Decimal(goal.progress_percent or 0):
+            set_goal_progress(goal, progress)
+            record_progress(db, goal, "auto")
+            changed.append(goal.id)
+    return changed
+
+
+def sync_goal_progress(db: Session, *goal_ids: Optional[int]) -> List[int]:
+    """Refresh linked goals after their tasks or key results change, and commit."""
+    changed = refresh_auto_progress(db, goal_ids)
+    if changed:
+        db.commit()
+        goal_rollups.invalidate(*changed)
+    return changed
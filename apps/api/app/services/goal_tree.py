@@ -0,0 +1,156 @@
+"""Goal hierarchy queries and progress roll-up."""
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, exists, func, literal, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.goal import Goal, GoalStatus
+
+# Hard cap on recursion; also stops runaway CTEs on parent_id cycles
+MAX_DEPTH = 32
+
+
+def _weight(priority: Optional[int]) -> float:
+    """Sibling weight in the roll-up: priority 0 counts once, each point adds one."""
+    return 1.0 + max(priority or 0, 0)
+
+
+def _top_level():
+    """Goals shown as roots: no parent, or the parent is missing or abandoned."""
+    parent = aliased(Goal)
+    return or_(
+        Goal.parent_id.is_(None),
+        ~exists().where(and_(parent.id == Goal.parent_id, parent.status != GoalStatus.ABANDONED))
+    )
+
+
+def goal_tree_cte(root_ids: Optional[Sequence[int]] = None, max_depth: int = MAX_DEPTH):
+    """Recursive CTE of (id, parent_id, depth, root_id) below the given roots (default: all roots).
+
+    Abandoned goals and everything under them are left out, as in the
+    goals page; recursion stops at `max_depth`.
+    """
+    anchor = Goal.id.in_(root_ids) if root_ids is not None else _top_level()
+    tree = select(
+        Goal.id,
+        Goal.parent_id,
+        literal(0).label("depth"),
+        Goal.id.label("root_id")
+    ).where(anchor, Goal.status != GoalStatus.ABANDONED).cte("goal_tree", recursive=True)
+
+    child = aliased(Goal)
+    return tree.union_all(
+        select(
+            child.id,
+            child.parent_id,
+            tree.c.depth + 1,
+            tree.c.root_id
+        ).where(
+            child.parent_id == tree.c.id,
+            child.status != GoalStatus.ABANDONED,
+            tree.c.depth < min(max_depth, MAX_DEPTH)
+        )
+    )
+
+
+class GoalRollupCache:
+    """Weighted progress roll-up per goal tree, cached until the tree changes.
+
+    A leaf counts with its own `progress_percent` (100 once completed); a
+    parent is the priority-weighted mean of its children's roll-ups. Each
+    tree is computed from one recursive query over light columns. Local
+    writes call `invalidate()` for the goals they touch, which drops only
+    their trees; writes from other workers are caught by the table
+    fingerprint (row count + newest ``updated_at``), which clears all.
+    """
+
+    def __init__(self):
+        # root id -> {goal id: (rollup, child count)}
+        self._trees: Dict[int, Dict[int, Tuple[float, int]]] = {}
+        # goal id -> roots of the cached trees it appears in (a subtree is cached on its own)
+        self._root_of: Dict[int, Set[int]] = {}
+        self._fingerprint: Optional[Tuple] = None
+        self._lock = Lock()
+
+    def invalidate(self, *goal_ids: Optional[int]):
+        """Drop cached trees containing any of `goal_ids` (None entries ignored)."""
+        with self._lock:
+            for goal_id in goal_ids:
+                for root in list(self._root_of.get(goal_id, ())):
+                    for member in self._trees.pop(root, {}):
+                        roots = self._root_of.get(member)
+                        if roots:
+                            roots.discard(root)
+            # Accept our own write in the fingerprint instead of clearing everything
+            self._fingerprint = None
+
+    def clear(self):
+        with self._lock:
+            self._trees.clear()
+            self._root_of.clear()
+            self._fingerprint = None
+
+    def get(self, db: Session, root_ids: Iterable[int]) -> Dict[int, Tuple[float, int]]:
+        """Get {goal id: (rollup percent, child count)} for every goal under `root_ids`."""
+        fingerprint = tuple(db.query(func.count(Goal.id), func.max(Goal.updated_at)).one())
+
+        with self._lock:
+            if self._fingerprint is not None and fingerprint != self._fingerprint:
+                self._trees.clear()
+                self._root_of.clear()
+            self._fingerprint = fingerprint
+            missing = [root for root in set(root_ids) if root not in self._trees]
+
+        computed = self._compute(db, missing) if missing else {}
+
+        with self._lock:
+            for root, values in computed.items():
+                self._trees[root] = values
+                for goal_id in values:
+                    self._root_of.setdefault(goal_id, set()).add(root)
+            result: Dict[int, Tuple[float, int]] = {}
+            for root in set(root_ids):
+                result.update(self._trees.get(root, {}))
+        return result
+
+    def _compute(self, db: Session, roots: List[int]) -> Dict[int, Dict[int, Tuple[float, int]]]:
+        tree = goal_tree_cte(roots)
+        rows = db.query(
+            Goal.id, Goal.parent_id, Goal.progress_percent, Goal.priority, Goal.status,
+            tree.c.depth, tree.c.root_id
+        ).join(tree, tree.c.id == Goal.id).all()
+
+        by_root: Dict[int, list] = {}
+        for row in rows:
+            by_root.setdefault(row.root_id, []).append(row)
+
+        return {root: self._rollup(root, by_root.get(root, [])) for root in roots}
+
+    @staticmethod
+    def _rollup(root: int, rows: list) -> Dict[int, Tuple[float, int]]:
+        by_id = {row.id: row for row in rows}
+        children: Dict[int, List[int]] = {}
+        for row in rows:
+            if row.id != root and row.parent_id in by_id:
+                children.setdefault(row.parent_id, []).append(row.id)
+
+        values: Dict[int, Tuple[float, int]] = {}
+        # Deepest first, so children are done before their parent
+        for row in sorted(rows, key=lambda r: r.depth, reverse=True):
+            if row.id in values:
+                continue
+            kids = [kid for kid in children.get(row.id, []) if kid in values]
+            if kids:
+                total = sum(_weight(by_id[kid].priority) for kid in kids)
+                rollup = sum(values[kid][0] * _weight(by_id[kid].priority) for kid in kids) / total
+            elif row.status == GoalStatus.COMPLETED:
+                rollup = 100.0
+            else:
+                rollup = float(row.progress_percent or 0)
+            values[row.id] = (round(rollup, 2), len(kids))
+        return values
+
+
+# Global cache instance
+goal_rollups = GoalRollupCache()
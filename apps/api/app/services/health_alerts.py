@@ -0,0 +1,216 @@
+"""Declarative health alert rules."""
+import operator
+from datetime import date, timedelta
+from threading import Lock
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.health import HealthLog
+from app.models.settings import UserSettings
+from app.services.notifications import claim_notifications
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class AlertRule(NamedTuple):
+    """One alert condition over a window of daily values.
+
+    The window is `window` days ending `offset` days before today. With
+    aggregate "count" the rule fires when at least `min_days` days satisfy
+    `value <op> threshold`; with "mean" when the mean of logged days does
+    (needing `min_days` logged); with "latest" when the newest logged day
+    does. `target` names a UserSettings field: the threshold becomes
+    target * `threshold`. `message` is formatted with value and threshold.
+    """
+    key: str
+    type: str
+    metric: str
+    window: int
+    op: str
+    threshold: float
+    aggregate: str = "count"
+    min_days: int = 1
+    offset: int = 0
+    target: Optional[str] = None
+    severity: str = "info"
+    message: str = ""
+
+
+HEALTH_ALERT_RULES: List[AlertRule] = [
+    AlertRule(
+        key="sleep_low_streak",
+        type="sleep",
+        metric="sleep_hours",
+        window=2,
+        offset=1,
+        op="<",
+        threshold=6,
+        aggregate="count",
+        min_days=2,
+        severity="warning",
+        message="Ви спали менше 6 годин 2 дні поспіль. Рекомендуємо лягти раніше сьогодні.",
+    ),
+    AlertRule(
+        key="sleep_below_target_week",
+        type="sleep",
+        metric="sleep_hours",
+        window=7,
+        op="<",
+        threshold=1,
+        target="target_sleep_hours",
+        aggregate="mean",
+        min_days=4,
+        severity="info",
+        message="За тиждень ви спите в середньому {value:.1f} год — менше цілі ({threshold:.0f} год).",
+    ),
+    AlertRule(
+        key="water_low_today",
+        type="water",
+        metric="water_glasses",
+        window=1,
+        op="<",
+        threshold=0.5,
+        target="target_water_glasses",
+        aggregate="latest",
+        severity="info",
+        message="Ви випили тільки {value:.0f} склянок води. Не забудьте пити більше!",
+    ),
+    AlertRule(
+        key="mood_low_streak",
+        type="mood",
+        metric="mood",
+        window=3,
+        op="<=",
+        threshold=2,
+        aggregate="count",
+        min_days=3,
+        severity="warning",
+        message="Настрій низький уже 3 дні поспіль. Знайдіть час для відпочинку або поговоріть з кимось близьким.",
+    ),
+]
+
+
+def _threshold(rule: AlertRule, user_settings: Optional[UserSettings]) -> Optional[float]:
+    if not rule.target:
+        return rule.threshold
+    target = getattr(user_settings, rule.target, None) if user_settings else None
+    if target is None:
+        target = UserSettings.__table__.c[rule.target].default.arg
+    return float(target) * rule.threshold if target else None
+
+
+def evaluate_rules(
+    rules: List[AlertRule],
+    values_by_day: Dict[date, Dict[str, float]],
+    today: date,
+    user_settings: Optional[UserSettings] = None,
+) -> List[dict]:
+    """Evaluate rules against {day: {metric: value}}; pure, no queries."""
+    alerts = []
+    for rule in rules:
+        threshold = _threshold(rule, user_settings)
+        if threshold is None:
+            continue
+        compare = OPERATORS[rule.op]
+        end = today - timedelta(days=rule.offset)
+        days = [end - timedelta(days=i) for i in range(rule.window)]
+        values = [
+            values_by_day[day][rule.metric] for day in days
+            if day in values_by_day and values_by_day[day].get(rule.metric) is not None
+        ]
+
+        value = None
+        if rule.aggregate == "count":
+            hits = [v for v in values if compare(v, threshold)]
+            if len(hits) >= rule.min_days:
+                value = min(hits) if rule.op in ("<", "<=") else max(hits)
+        elif rule.aggregate == "mean":
+            if len(values) >= rule.min_days and compare(sum(values) / len(values), threshold):
+                value = sum(values) / len(values)
+        elif rule.aggregate == "latest":
+            # days are newest first
+            if values and compare(values[0], threshold):
+                value = values[0]
+
+        if value is not None:
+            alerts.append({
+                "rule": rule.key,
+                "type": rule.type,
+                "severity": rule.severity,
+                "value": round(value, 2),
+                "threshold": round(threshold, 2),
+                "message": rule.message.format(value=value, threshold=threshold),
+            })
+    return alerts
+
+
+class HealthAlertEngine:
+    """Evaluates HEALTH_ALERT_RULES over one ranged HealthLog fetch, cached per day.
+
+    The cache is keyed on today's date plus a fingerprint (row count and
+    newest ``updated_at`` in the range), and dropped by `invalidate()` on
+    local writes, so alerts follow new logs without re-evaluating per call.
+    """
+
+    def __init__(self, rules: List[AlertRule] = HEALTH_ALERT_RULES):
+        self.rules = rules
+        self._cache: Optional[Tuple[date, Tuple, List[dict]]] = None
+        self._lock = Lock()
+
+    @property
+    def span(self) -> int:
+        return max(rule.window + rule.offset for rule in self.rules)
+
+    def invalidate(self):
+        with self._lock:
+            self._cache = None
+
+    def get_alerts(self, db: Session, today: Optional[date] = None) -> List[dict]:
+        """Current alerts; empty when the user disabled health alerts."""
+        user_settings = db.query(UserSettings).first()
+        if user_settings and user_settings.enable_health_alerts is False:
+            return []
+
+        today = today or date.today()
+        start = today - timedelta(days=self.span - 1)
+        range_filter = (HealthLog.log_date >= start, HealthLog.log_date <= today)
+        fingerprint = tuple(db.query(func.count(HealthLog.id), func.max(HealthLog.updated_at)).filter(*range_filter).one())
+
+        with self._lock:
+            if self._cache and self._cache[0] == today and self._cache[1] == fingerprint:
+                return list(self._cache[2])
+
+        metrics = sorted({rule.metric for rule in self.rules})
+        rows = db.query(HealthLog.log_date, *[getattr(HealthLog, m) for m in metrics]).filter(*range_filter).all()
+        values_by_day = {
+            row[0]: {m: float(v) for m, v in zip(metrics, row[1:]) if v is not None}
+            for row in rows
+        }
+        alerts = evaluate_rules(self.rules, values_by_day, today, user_settings)
+
+        with self._lock:
+            self._cache = (today, fingerprint, alerts)
+        return list(alerts)
+
+    def new_alerts(self, db: Session, today: Optional[date] = None) -> List[dict]:
+        """Alerts not yet pushed today; commits.
+
+        Each rule fires at most once a day across all workers and restarts:
+        the alert is claimed in `sent_notifications` and only the claiming
+        caller gets it.
+        """
+        today = today or date.today()
+        alerts = {f"health:{today.isoformat()}:{alert['rule']}": alert for alert in self.get_alerts(db, today)}
+        claimed = claim_notifications(db, alerts)
+        return [alert for key, alert in alerts.items() if key in claimed]
+
+
+# Global engine instance
+health_alerts = HealthAlertEngine()
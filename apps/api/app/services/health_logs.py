@@ -0,0 +1,69 @@
+"""Health log writes shared by the API and the Telegram bot."""
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.health import HealthLog
+from app.services.health_alerts import health_alerts
+
+
+def add_water(db: Session, glasses: int = 1, log_date: Optional[date] = None) -> int:
+    """Atomically add glasses to a day's log, creating it if needed; returns the new total.
+
+    A single INSERT ... ON CONFLICT (log_date) DO UPDATE ... RETURNING, so
+    concurrent taps from the web app and the bot can't lose an increment
+    or race on creating the day's row. Commits.
+    """
+    table = HealthLog.__table__
+    stmt = dialect_insert(db, table).values(log_date=log_date or date.today(), water_glasses=glasses)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["log_date"],
+        set_={
+            "water_glasses": func.coalesce(table.c.water_glasses, 0) + glasses,
+            "updated_at": func.now(),
+        }
+    ).returning(table.c.water_glasses)
+    total = db.execute(stmt).scalar_one()
+    db.commit()
+    health_alerts.invalidate()
+    return total
+
+
+def upsert_daily(db: Session, days: Iterable[Tuple[date, Dict[str, float]]], batch_size: int = 500) -> int:
+    """Insert or update logs keyed on log_date, touching only the given metrics.
+
+    Days are grouped by their set of metrics so each batch is one
+    executemany INSERT ... ON CONFLICT with a fixed column list; metrics
+    missing from the import keep their stored values. Returns the number
+    of days written; does not commit.
+    """
+    table = HealthLog.__table__
+    pending: Dict[Tuple[str, ...], list] = {}
+    written = 0
+
+    def flush(metrics: Tuple[str, ...]):
+        nonlocal written
+        rows = pending.pop(metrics, [])
+        if not rows:
+            return
+        stmt = dialect_insert(db, table)
+        update = {metric: stmt.excluded[metric] for metric in metrics}
+        update["updated_at"] = func.now()
+        db.execute(stmt.on_conflict_do_update(index_elements=["log_date"], set_=update), rows)
+        written += len(rows)
+
+    for log_date, values in days:
+        if not values:
+            continue
+        metrics = tuple(sorted(values))
+        pending.setdefault(metrics, []).append({"log_date": log_date, **values})
+        if len(pending[metrics]) >= batch_size:
+            flush(metrics)
+    for metrics in list(pending):
+        flush(metrics)
+
+    health_alerts.invalidate()
+    return written
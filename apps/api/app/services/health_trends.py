@@ -0,0 +1,159 @@
+"""Rolling health metric trends."""
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.health import HealthLog
+from app.models.settings import UserSettings
+from app.utils.downsample import lttb
+
+METRIC_COLUMNS = {
+    "sleep_hours": HealthLog.sleep_hours,
+    "sleep_quality": HealthLog.sleep_quality,
+    "mood": HealthLog.mood,
+    "energy_level": HealthLog.energy_level,
+    "water_glasses": HealthLog.water_glasses,
+    "weight_kg": HealthLog.weight_kg,
+    "steps": HealthLog.steps,
+}
+
+DEFAULT_METRICS = ["sleep_hours", "mood", "water_glasses", "weight_kg", "steps"]
+DEFAULT_WINDOWS = [7, 30, 90]
+MAX_WINDOW = 365
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` days that skips missing (NaN) days; NaN if none logged."""
+    present = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(present, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(present)))
+    start = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+    end = np.arange(1, len(values) + 1)
+    window_sums = sums[end] - sums[start]
+    window_counts = counts[end] - counts[start]
+    return np.divide(window_sums, window_counts, out=np.full(len(values), np.nan), where=window_counts > 0)
+
+
+def _round(value, digits: int = 2) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+def get_health_trends(
+    db: Session,
+    metrics: Sequence[str] = DEFAULT_METRICS,
+    windows: Sequence[int] = DEFAULT_WINDOWS,
+    end: Optional[date] = None,
+) -> dict:
+    """Per-metric window means, deltas vs the previous window, coverage and target adherence.
+
+    All metrics come from one ranged query into day-indexed arrays; days
+    without a log (or without that metric) are NaN and skipped, so gaps
+    lower `coverage` instead of dragging means towards zero.
+    """
+    end = end or date.today()
+    windows = sorted(set(windows))
+    longest = windows[-1]
+    # Two longest windows back, so every window has a previous one to compare with
+    days = 2 * longest
+    start = end - timedelta(days=days - 1)
+
+    rows = db.query(HealthLog.log_date, *[METRIC_COLUMNS[m] for m in metrics]).filter(
+        HealthLog.log_date >= start,
+        HealthLog.log_date <= end
+    ).all()
+
+    data = np.full((len(metrics), days), np.nan)
+    for row in rows:
+        day = (row[0] - start).days
+        for i, value in enumerate(row[1:]):
+            if value is not None:
+                data[i, day] = float(value)
+
+    user_settings = db.query(UserSettings).first()
+    targets: Dict[str, Optional[float]] = {
+        "sleep_hours": float(user_settings.target_sleep_hours) if user_settings and user_settings.target_sleep_hours else 8.0,
+        "water_glasses": float(user_settings.target_water_glasses) if user_settings and user_settings.target_water_glasses else 8.0,
+    }
+
+    dates = [(start + timedelta(days=d)).isoformat() for d in range(days - longest, days)]
+    result = {"start": dates[0], "end": end.isoformat(), "windows": windows, "dates": dates, "metrics": {}}
+
+    for i, metric in enumerate(metrics):
+        values = data[i]
+        target = targets.get(metric)
+        summary = {}
+        for window in windows:
+            current = values[days - window:]
+            previous = values[days - 2 * window:days - window]
+            logged = int(np.count_nonzero(~np.isnan(current)))
+            mean = np.nanmean(current) if logged else np.nan
+            previous_mean = np.nanmean(previous) if np.any(~np.isnan(previous)) else np.nan
+            stats = {
+                "mean": _round(mean),
+                "min": _round(np.nanmin(current)) if logged else None,
+                "max": _round(np.nanmax(current)) if logged else None,
+                "previous_mean": _round(previous_mean),
+                "delta": _round(mean - previous_mean),
+                "days_logged": logged,
+                "coverage": round(logged / window, 2),
+            }
+            if target is not None:
+                stats["target"] = target
+                stats["adherence"] = round(float(np.sum(current[~np.isnan(current)] >= target)) / logged, 2) if logged else None
+            summary[str(window)] = stats
+
+        result["metrics"][metric] = {
+            "values": [_round(v) for v in values[days - longest:]],
+            "rolling": {str(w): [_round(v) for v in _rolling_mean(values, w)[days - longest:]] for w in windows},
+            "windows": summary,
+        }
+
+    return result
+
+
+def get_health_series(
+    db: Session,
+    metrics: Sequence[str],
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    max_points: Optional[int] = None,
+) -> dict:
+    """Logged values per metric over a date range, LTTB-downsampled to `max_points`.
+
+    Days without a value are left out rather than sent as nulls; `points`
+    is the number of logged days before downsampling.
+    """
+    query = db.query(HealthLog.log_date, *[METRIC_COLUMNS[m] for m in metrics])
+    if start:
+        query = query.filter(HealthLog.log_date >= start)
+    if end:
+        query = query.filter(HealthLog.log_date <= end)
+    rows = query.order_by(HealthLog.log_date).all()
+
+    result = {
+        "start": start or (rows[0][0] if rows else None),
+        "end": end or (rows[-1][0] if rows else None),
+        "max_points": max_points,
+        "metrics": {},
+    }
+    if not rows:
+        result["metrics"] = {m: {"points": 0, "dates": [], "values": []} for m in metrics}
+        return result
+
+    origin = rows[0][0]
+    days = np.array([(row[0] - origin).days for row in rows], dtype=np.float64)
+    data = np.array([[np.nan if v is None else float(v) for v in row[1:]] for row in rows], dtype=np.float64)
+
+    for i, metric in enumerate(metrics):
+        present = np.flatnonzero(~np.isnan(data[:, i]))
+        keep = present
+        if max_points:
+            keep = present[lttb(days[present], data[present, i], max_points)]
+        result["metrics"][metric] = {
+            "points": int(len(present)),
+            "dates": [rows[j][0].isoformat() for j in keep],
+            "values": [_round(data[j, i]) for j in keep],
+        }
+    return result
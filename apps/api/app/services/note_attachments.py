@@ -0,0 +1,80 @@
+"""Digest index of note attachments, for deciding when a blob is unused."""
+from typing import Any, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.note import Note, NoteAttachment
+from app.services.attachment_store import HASH_RE, attachment_store
+
+
+def attachment_digests(attachments: Optional[List[Any]]) -> Set[str]:
+    """Blob hashes referenced by a note's `attachments` JSON."""
+    return {
+        ref["sha256"] for ref in attachments or []
+        if isinstance(ref, dict) and isinstance(ref.get("sha256"), str) and HASH_RE.match(ref["sha256"])
+    }
+
+
+def sync_note_attachments(db: Session, note: Note) -> Set[str]:
+    """Match the index to `note.attachments`; returns digests the note no longer uses.
+
+    `note.id` must be assigned (flush first). Does not commit; pass the
+    returned digests to `release_attachments` after committing.
+    """
+    wanted = attachment_digests(note.attachments)
+    existing = {
+        digest for (digest,) in db.query(NoteAttachment.sha256).filter(NoteAttachment.note_id == note.id)
+    }
+    removed = existing - wanted
+    if removed:
+        db.query(NoteAttachment).filter(
+            NoteAttachment.note_id == note.id,
+            NoteAttachment.sha256.in_(removed)
+        ).delete(synchronize_session=False)
+    for digest in wanted - existing:
+        db.add(NoteAttachment(note_id=note.id, sha256=digest))
+    return removed
+
+
+def delete_note_attachments(db: Session, note_id: int) -> Set[str]:
+    """Drop a note's references (SQLite doesn't cascade); returns the digests it used. Does not commit."""
+    rows = db.query(NoteAttachment).filter(NoteAttachment.note_id == note_id)
+    digests = {row.sha256 for row in rows}
+    rows.delete(synchronize_session=False)
+    return digests
+
+
+def release_attachments(db: Session, digests: Set[str]):
+    """Remove blobs from the store once no note references them (one indexed lookup)."""
+    if not digests:
+        return
+    in_use = {
+        digest for (digest,) in db.query(NoteAttachment.sha256).filter(NoteAttachment.sha256.in_(digests)).distinct()
+    }
+    for digest in digests - in_use:
+        attachment_store.delete(digest)
+
+
+def backfill_note_attachments(db: Session) -> int:
+    """Index attachments of notes written before the index existed. Commits.
+
+    Idempotent (ON CONFLICT DO NOTHING), so workers starting together can
+    all run it.
+    """
+    count = 0
+    rows = []
+    for note_id, attachments in db.query(Note.id, Note.attachments).yield_per(500):
+        rows.extend({"note_id": note_id, "sha256": digest} for digest in attachment_digests(attachments))
+        if len(rows) >= 500:
+            count += _insert_refs(db, rows)
+            rows = []
+    if rows:
+        count += _insert_refs(db, rows)
+    db.commit()
+    return count
+
+
+def _insert_refs(db: Session, rows: List[dict]) -> int:
+    stmt = dialect_insert(db, NoteAttachment.__table__).values(rows).on_conflict_do_nothing()
+    return db.execute(stmt).rowcount
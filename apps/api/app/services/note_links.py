@@ -0,0 +1,170 @@
+"""Wiki-link and tag index for notes."""
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import false, text
+from sqlalchemy.orm import Query, Session
+
+from app.database import dialect_insert
+from app.models.note import Note, NoteLink, NoteLinkKind
+
+# [[Title]] or [[Title|alias]]
+WIKI_LINK_RE = re.compile(r"\[\[([^\[\]|\n]+)(?:\|[^\[\]\n]*)?\]\]")
+# #tag: not inside a word/URL fragment, at least one letter, no bare "# heading"
+TAG_RE = re.compile(r"(?<![\w/#&])#(\d*[^\W\d][\w\-/]*)")
+
+LinkKey = Tuple[NoteLinkKind, str]
+
+# pg_advisory_xact_lock key serializing the startup backfill across workers
+BACKFILL_LOCK_KEY = 7_340_021
+
+
+def link_key(text: str) -> str:
+    """Normalized lookup key for a note title or tag."""
+    return " ".join(text.split()).casefold()[:500]
+
+
+def parse_links(content: Optional[str]) -> Dict[LinkKey, str]:
+    """Extract {(kind, key): label} from note content; first spelling wins."""
+    links: Dict[LinkKey, str] = {}
+    if not content:
+        return links
+    for match in WIKI_LINK_RE.finditer(content):
+        label = " ".join(match.group(1).split())
+        if label:
+            links.setdefault((NoteLinkKind.NOTE, link_key(label)), label[:500])
+    for match in TAG_RE.finditer(content):
+        label = match.group(1).rstrip("-/")
+        links.setdefault((NoteLinkKind.TAG, link_key(label)), label[:500])
+    return links
+
+
+def sync_note_links(db: Session, note: Note, old_content: Optional[str] = None):
+    """Apply the diff between old and new content links for `note`.
+
+    Only added links are inserted and removed links deleted; unchanged
+    edges are left alone. `note.id` must be assigned (flush first). Does
+    not commit.
+    """
+    new_links = parse_links(note.content)
+    if old_content is not None and parse_links(old_content).keys() == new_links.keys():
+        return
+
+    existing = {
+        (link.kind, link.target): link
+        for link in db.query(NoteLink).filter(NoteLink.source_id == note.id)
+    }
+    for key in existing.keys() - new_links.keys():
+        db.delete(existing[key])
+    for key in new_links.keys() - existing.keys():
+        kind, target = key
+        db.add(NoteLink(source_id=note.id, kind=kind, target=target, label=new_links[key]))
+
+
+def delete_note_links(db: Session, note_id: int):
+    """Drop a note's outgoing links (SQLite doesn't enforce ON DELETE CASCADE)."""
+    db.query(NoteLink).filter(NoteLink.source_id == note_id).delete(synchronize_session=False)
+
+
+def rebuild_note_links(db: Session) -> int:
+    """Re-index every note; returns the number of links written. Commits.
+
+    Links already inserted meanwhile by a concurrent note write are kept
+    (ON CONFLICT DO NOTHING) rather than failing the rebuild.
+    """
+    db.query(NoteLink).delete(synchronize_session=False)
+    count = 0
+    rows = []
+    for note_id, content in db.query(Note.id, Note.content).yield_per(500):
+        for (kind, target), label in parse_links(content).items():
+            rows.append({"source_id": note_id, "kind": kind, "target": target, "label": label})
+        if len(rows) >= 500:
+            count += _insert_links(db, rows)
+            rows = []
+    if rows:
+        count += _insert_links(db, rows)
+    db.commit()
+    return count
+
+
+def _insert_links(db: Session, rows: List[dict]) -> int:
+    stmt = dialect_insert(db, NoteLink.__table__).values(rows).on_conflict_do_nothing()
+    return db.execute(stmt).rowcount
+
+
+def backfill_note_links(db: Session) -> int:
+    """Index notes written before the link index existed, once. Commits.
+
+    Does nothing when the index already has rows (or there are no notes).
+    Several workers may start at once: on Postgres they queue on an
+    advisory lock and the later ones find the index filled.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": BACKFILL_LOCK_KEY})
+    if db.query(NoteLink.id).first() or not db.query(Note.id).first():
+        db.rollback()
+        return 0
+    return rebuild_note_links(db)
+
+
+def backlinks_query(db: Session, note: Note, include_archived: bool = False) -> Query:
+    """Notes whose content links to `note` by title; one indexed lookup."""
+    if not note.title or not note.title.strip():
+        return db.query(Note).filter(false())
+    query = db.query(Note).join(NoteLink, NoteLink.source_id == Note.id).filter(
+        NoteLink.kind == NoteLinkKind.NOTE,
+        NoteLink.target == link_key(note.title),
+        Note.id != note.id
+    )
+    if not include_archived:
+        query = query.filter(Note.is_archived == False)
+    return query.order_by(Note.updated_at.desc())
+
+
+def get_graph(db: Session, include_tags: bool = True, include_archived: bool = False) -> dict:
+    """Note/tag graph from the link index: one query for edges, one for note titles."""
+    notes_query = db.query(Note.id, Note.title, Note.type)
+    links_query = db.query(NoteLink.source_id, NoteLink.kind, NoteLink.target, NoteLink.label)
+    if not include_archived:
+        notes_query = notes_query.filter(Note.is_archived == False)
+        links_query = links_query.join(Note, Note.id == NoteLink.source_id).filter(Note.is_archived == False)
+    if not include_tags:
+        links_query = links_query.filter(NoteLink.kind == NoteLinkKind.NOTE)
+
+    notes = notes_query.all()
+    by_title: Dict[str, List[int]] = {}
+    for note_id, title, _ in notes:
+        if title and title.strip():
+            by_title.setdefault(link_key(title), []).append(note_id)
+
+    edges = []
+    linked: Set[int] = set()
+    tags: Dict[str, str] = {}
+    missing: Dict[str, str] = {}
+    for source_id, kind, target, label in links_query.all():
+        if kind == NoteLinkKind.TAG:
+            tags.setdefault(target, label)
+            edges.append({"source": f"note:{source_id}", "target": f"tag:{target}", "kind": kind.value})
+            linked.add(source_id)
+            continue
+        target_ids = by_title.get(target)
+        if not target_ids:
+            # Link to a note that doesn't exist (yet)
+            missing.setdefault(target, label)
+            edges.append({"source": f"note:{source_id}", "target": f"missing:{target}", "kind": kind.value})
+            linked.add(source_id)
+            continue
+        for target_id in target_ids:
+            if target_id != source_id:
+                edges.append({"source": f"note:{source_id}", "target": f"note:{target_id}", "kind": kind.value})
+                linked.update((source_id, target_id))
+
+    nodes = [
+        {"id": f"note:{note_id}", "type": "note", "note_id": note_id, "label": title or "", "note_type": note_type.value if note_type else None}
+        for note_id, title, note_type in notes
+        if note_id in linked
+    ]
+    nodes += [{"id": f"tag:{key}", "type": "tag", "label": label} for key, label in sorted(tags.items())]
+    nodes += [{"id": f"missing:{key}", "type": "missing", "label": label} for key, label in sorted(missing.items())]
+
+    return {"nodes": nodes, "edges": edges}
@@ -0,0 +1,86 @@
+"""Ranked full-text search over notes."""
+from typing import Optional, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, Table, Text, func, literal_column, or_
+from sqlalchemy.orm import Session, Query
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.config import settings
+from app.models.note import Note, note_document
+from app.models.settings import UserSettings
+
+# SQLite FTS5 table created alongside `notes` (see app.models.note); kept off Base.metadata
+notes_fts = Table(
+    "notes_fts",
+    MetaData(),
+    Column("rowid", Integer),
+    Column("title", Text),
+    Column("content", Text),
+)
+
+SNIPPET_START = "<mark>"
+SNIPPET_STOP = "</mark>"
+SNIPPET_WORDS = 20
+
+
+def _search_config(db: Session) -> str:
+    """Postgres text search config for the user's language."""
+    language = db.query(UserSettings.language).scalar() or "ua"
+    return settings.search_configs.get(language, settings.search_config_ua)
+
+
+def _fts5_query(text: str) -> str:
+    """Quote each term so user input can't break FTS5 query syntax; last term is a prefix."""
+    terms = [term.replace('"', '""') for term in text.split()]
+    if not terms:
+        return '""'
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def apply_search(
+    db: Session,
+    query: Query,
+    text: str,
+) -> Tuple[Query, Optional[ColumnElement], Optional[ColumnElement]]:
+    """Restrict a Note query to matches of `text`.
+
+    Returns (query, rank, snippet); rank is higher-is-better. Postgres uses
+    the GIN tsvector index, SQLite the FTS5 table; other dialects fall back
+    to an unranked ILIKE.
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        config = _search_config(db)
+        regconfig = literal_column(f"'{config}'::regconfig")
+        document = note_document(config)
+        tsquery = func.websearch_to_tsquery(regconfig, text)
+        rank = func.ts_rank_cd(document, tsquery)
+        snippet = func.ts_headline(
+            regconfig,
+            Note.content,
+            tsquery,
+            f"StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, "
+            f"MaxWords={SNIPPET_WORDS}, MinWords=5, MaxFragments=2"
+        )
+        return query.filter(document.op("@@")(tsquery)), rank, snippet
+
+    if dialect == "sqlite":
+        fts = literal_column("notes_fts")
+        query = query.join(notes_fts, notes_fts.c.rowid == Note.id).filter(
+            fts.op("MATCH")(_fts5_query(text))
+        )
+        # bm25() is lower-is-better
+        rank = -func.bm25(fts)
+        snippet = func.snippet(fts, 1, SNIPPET_START, SNIPPET_STOP, "…", SNIPPET_WORDS)
+        return query, rank, snippet
+
+    query = query.filter(
+        or_(
+            Note.title.ilike(f"%{text}%"),
+            Note.content.ilike(f"%{text}%")
+        )
+    )
+    return query, None, None
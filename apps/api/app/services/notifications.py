@@ -0,0 +1,31 @@
+"""Once-only delivery of pushes across workers and restarts."""
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Set
+
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.notification import SentNotification
+
+# Claims older than this can't be contested any more (reminders fire within
+# minutes, health alerts once a day) and are dropped
+CLAIM_RETENTION = timedelta(days=3)
+
+
+def claim_notifications(db: Session, keys: Iterable[str]) -> Set[str]:
+    """Claim push keys; returns those this call won. Commits.
+
+    A key is won by exactly one caller, whichever worker inserts it first,
+    and stays claimed across restarts. Claiming happens before sending, so
+    a push whose send fails is not retried.
+    """
+    claimed = set()
+    for key in dict.fromkeys(keys):
+        stmt = dialect_insert(db, SentNotification.__table__).values(key=key).on_conflict_do_nothing()
+        if db.execute(stmt).rowcount:
+            claimed.add(key)
+    db.query(SentNotification).filter(
+        SentNotification.claimed_at < datetime.now(timezone.utc) - CLAIM_RETENTION
+    ).delete(synchronize_session=False)
+    db.commit()
+    return claimed
@@ -1,46 +1,267 @@
 """OpenAI service for AI assistant."""
-from typing import Optional
-import json
-from openai import AsyncOpenAI
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import random
+import time
+from collections import deque
+from threading import Lock
+
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError
 
 from app.config import settings
+from app.utils.prompt_context import compact_context
 
+MODEL = "gpt-4o-mini"  # Cost-effective model
 
-class OpenAIService:
-    """Service for OpenAI API interactions."""
-    
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
-        
-        self.system_prompts = {
-            "general": """Ти - персональний AI асистент у дашборді LifeHub. Допомагаєш з плануванням, продуктивністю та організацією життя.
+UNAVAILABLE_MESSAGE = "AI асистент недоступний. Налаштуйте OPENAI_API_KEY."
+
+SYSTEM_PROMPTS = {
+    "general": """Ти - персональний AI асистент у дашборді LifeHub. Допомагаєш з плануванням, продуктивністю та організацією життя.
 Відповідай українською мовою. Будь конкретним і практичним. Уникай банальних порад та мотиваційних цитат.
 Враховуй контекст користувача (задачі, цілі, звички, здоров'я) для персоналізованих відповідей.""",
-            
-            "plan_day": """Ти - експерт з планування та продуктивності. Створюєш оптимальні денні плани.
+    
+    "plan_day": """Ти - експерт з планування та продуктивності. Створюєш оптимальні денні плани.
 Враховуй: пріоритети задач, рівень енергії протягом дня, дедлайни, важливість перерв.
 Давай конкретні часові блоки та послідовність. Українською мовою.""",
-            
-            "break_goal": """Ти - коуч з досягнення цілей. Розбиваєш великі цілі на конкретні кроки.
+    
+    "break_goal": """Ти - коуч з досягнення цілей. Розбиваєш великі цілі на конкретні кроки.
 Використовуй SMART підхід. Визначай milestones та key results.
 Будь практичним і реалістичним. Українською мовою.""",
-            
-            "week_summary": """Ти - аналітик особистої продуктивності. Аналізуєш дані за тиждень.
+    
+    "week_summary": """Ти - аналітик особистої продуктивності. Аналізуєш дані за тиждень.
 Знаходиш патерни, сильні та слабкі сторони. Даєш actionable рекомендації.
 Не критикуй, а підтримуй та спрямовуй. Українською мовою.""",
-            
-            "anti_procrastination": """Ти - експерт з подолання прокрастинації. Допомагаєш почати діяти прямо зараз.
+    
+    "anti_procrastination": """Ти - експерт з подолання прокрастинації. Допомагаєш почати діяти прямо зараз.
 Фокусуйся на: перший мікро-крок, зниження бар'єру входу, негайна дія.
 Будь енергійним але не нав'язливим. Українською мовою.""",
-            
-            "daily_briefing": """Ти - персональний асистент, що готує ранковий брифінг.
+    
+    "daily_briefing": """Ти - персональний асистент, що готує ранковий брифінг.
 Коротко, по суті, мотивуюче. Фокус на найважливішому.
 Персональна мотивація без банальних цитат. Українською мовою.""",
-            
-            "motivation": """Генеруй персоналізовані мотиваційні повідомлення.
+    
+    "motivation": """Генеруй персоналізовані мотиваційні повідомлення.
 НЕ використовуй відомі цитати чи банальності.
 Звертайся напряму до користувача. Будь автентичним. Українською мовою."""
-        }
+}
+
+
+# Seconds allowed per completion; long analyses get more room than quick replies
+MODE_TIMEOUTS = {
+    "general": 30.0,
+    "plan_day": 45.0,
+    "break_goal": 45.0,
+    "week_summary": 60.0,
+    "anti_procrastination": 20.0,
+    "daily_briefing": 30.0,
+    "motivation": 15.0,
+}
+DEFAULT_TIMEOUT = 30.0
+
+# Retry backoff: full jitter over base * 2^attempt, capped
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+
+# Latency samples kept per mode for percentiles
+LATENCY_SAMPLES = 200
+
+
+class AIMetrics:
+    """Per-mode call counters, token usage and latency percentiles (process-local)."""
+
+    def __init__(self):
+        self._modes: Dict[str, dict] = {}
+        self._lock = Lock()
+
+    def _stats(self, mode: str) -> dict:
+        stats = self._modes.get(mode)
+        if stats is None:
+            stats = self._modes[mode] = {
+                "calls": 0,
+                "errors": 0,
+                "retries": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "latencies": deque(maxlen=LATENCY_SAMPLES),
+                "first_tokens": deque(maxlen=LATENCY_SAMPLES),
+            }
+        return stats
+
+    def record(self, mode: str, latency: float, usage=None, error: bool = False, first_token: Optional[float] = None):
+        with self._lock:
+            stats = self._stats(mode)
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["latencies"].append(latency)
+            if first_token is not None:
+                stats["first_tokens"].append(first_token)
+            if usage is not None:
+                stats["prompt_tokens"] += usage.prompt_tokens or 0
+                stats["completion_tokens"] += usage.completion_tokens or 0
+
+    def record_retry(self, mode: str):
+        with self._lock:
+            self._stats(mode)["retries"] += 1
+
+    @staticmethod
+    def _percentiles(samples) -> dict:
+        ordered = sorted(samples)
+        pick = lambda q: round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000) if ordered else None
+        return {"p50": pick(0.5), "p95": pick(0.95), "max": pick(1.0)}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {}
+            for mode, stats in self._modes.items():
+                result[mode] = {
+                    **{k: v for k, v in stats.items() if not isinstance(v, deque)},
+                    "latency_ms": self._percentiles(stats["latencies"]),
+                    "first_token_ms": self._percentiles(stats["first_tokens"]),
+                }
+            return result
+
+
+class OpenAIService:
+    """Service for OpenAI API interactions.
+
+    One instance (and one AsyncOpenAI client with a keep-alive connection
+    pool) is shared per worker. A semaphore caps in-flight completions at
+    `openai_max_concurrency`; 429s, 5xx and connection errors are retried
+    with jittered exponential backoff.
+    """
+
+    system_prompts = SYSTEM_PROMPTS
+
+    def __init__(self):
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url or None,
+            max_retries=0,  # retried here, so attempts are counted and jittered
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.openai_max_concurrency * 2,
+                    max_keepalive_connections=settings.openai_max_concurrency,
+                    keepalive_expiry=60.0,
+                ),
+            ),
+        ) if settings.openai_api_key else None
+        self.metrics = AIMetrics()
+        self._semaphore = asyncio.Semaphore(settings.openai_max_concurrency)
+
+    async def close(self):
+        """Close the pooled HTTP connections."""
+        if self.client:
+            await self.client.close()
+
+    @staticmethod
+    def _retryable(error: Exception) -> bool:
+        if isinstance(error, APIStatusError):
+            return error.status_code == 429 or error.status_code >= 500
+        return isinstance(error, APIConnectionError)  # includes timeouts
+
+    @staticmethod
+    def _retry_delay(error: Exception, attempt: int) -> float:
+        """Server's Retry-After when given, else full-jitter exponential backoff."""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), RETRY_MAX_SECONDS)
+            except ValueError:
+                pass
+        return random.uniform(0, min(RETRY_BASE_SECONDS * 2 ** attempt, RETRY_MAX_SECONDS))
+
+    async def _create(self, mode: str, messages: list, stream: bool = False):
+        """Start a chat completion under the concurrency limit, with retries.
+
+        Returns (response, started). For streams the semaphore slot stays
+        taken and the caller must release it once the stream is consumed;
+        only opening the stream is retried, never a partially sent answer.
+        """
+        timeout = MODE_TIMEOUTS.get(mode, DEFAULT_TIMEOUT)
+        extra = {"stream": True, "stream_options": {"include_usage": True}} if stream else {}
+        attempt = 0
+        while True:
+            await self._semaphore.acquire()
+            started = time.perf_counter()
+            try:
+                response = await self.client.chat.completions.create(
+                    model=MODEL,
+                    messages=messages,
+                    max_tokens=1000,
+                    temperature=0.7,
+                    timeout=timeout,
+                    **extra
+                )
+            except BaseException as e:
+                self._semaphore.release()
+                self.metrics.record(mode, time.perf_counter() - started, error=isinstance(e, Exception))
+                if not isinstance(e, Exception) or attempt >= settings.openai_max_retries or not self._retryable(e):
+                    raise
+                error = e
+            else:
+                if not stream:
+                    self._semaphore.release()
+                    self.metrics.record(mode, time.perf_counter() - started, response.usage)
+                return response, started
+            # Back off outside the semaphore so waiting callers can go first
+            self.metrics.record_retry(mode)
+            await asyncio.sleep(self._retry_delay(error, attempt))
+            attempt += 1
+
+    def _messages(self, message: str, mode: str, context: Optional[dict]) -> list:
+        system_prompt = self.system_prompts.get(mode, self.system_prompts["general"])
+        
+        # Add context to system prompt
+        if context:
+            context_str = f"\n\nКонтекст користувача:\n{compact_context(context, settings.ai_context_token_budget)}"
+            system_prompt += context_str
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": message}
+        ]
+    
+    async def generate(
+        self,
+        message: str,
+        mode: str = "general",
+        context: Optional[dict] = None
+    ) -> str:
+        """Send message to OpenAI and get response; raises on API errors."""
+        response, _ = await self._create(mode, self._messages(message, mode, context))
+        return response.choices[0].message.content
+    
+    async def stream(
+        self,
+        message: str,
+        mode: str = "general",
+        context: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """Yield response text deltas as they arrive; raises on API errors.
+
+        Closing the generator (e.g. when the client disconnects) closes
+        the upstream HTTP stream, so OpenAI stops generating.
+        """
+        stream, started = await self._create(mode, self._messages(message, mode, context), stream=True)
+        usage, first_token, error = None, None, False
+        try:
+            async for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if first_token is None:
+                        first_token = time.perf_counter() - started
+                    yield chunk.choices[0].delta.content
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._semaphore.release()
+            self.metrics.record(mode, time.perf_counter() - started, usage, error, first_token)
+            # Shielded: on disconnect this runs inside an already-cancelled task
+            await asyncio.shield(stream.close())
     
     async def chat(
         self,
@@ -48,29 +269,12 @@ class OpenAIService:
         mode: str = "general",
         context: Optional[dict] = None
     ) -> str:
-        """Send message to OpenAI and get response."""
+        """Send message to OpenAI and get response (errors are returned as text)."""
         if not self.client:
-            return "AI асистент недоступний. Налаштуйте OPENAI_API_KEY."
-        
-        system_prompt = self.system_prompts.get(mode, self.system_prompts["general"])
-        
-        # Add context to system prompt
-        if context:
-            context_str = f"\n\nКонтекст користувача:\n{json.dumps(context, ensure_ascii=False, indent=2)}"
-            system_prompt += context_str
+            return UNAVAILABLE_MESSAGE
         
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",  # Cost-effective model
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": message}
-                ],
-                max_tokens=1000,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content
+            return await self.generate(message, mode, context)
         except Exception as e:
             return f"Помилка AI: {str(e)}"
     
@@ -88,7 +292,11 @@ class OpenAIService:
         return await self.chat(prompt, mode="general", context=context)
 
 
+# Global service instance (shared client and connection pool)
+openai_service = OpenAIService()
+
+
 # Dependency
 def get_openai_service() -> OpenAIService:
     """Get OpenAI service instance."""
-    return OpenAIService()
+    return openai_service
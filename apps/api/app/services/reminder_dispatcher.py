@@ -0,0 +1,236 @@
+"""Timer-heap dispatcher for calendar event reminders."""
+import asyncio
+import heapq
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import load_only
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.calendar_event import CalendarEvent, RecurrenceType
+from app.services.notifications import claim_notifications
+from app.utils.recurrence import event_occurrences
+
+
+class Reminder(NamedTuple):
+    """One pending reminder; ordered by fire time for the heap."""
+    fire_at: datetime
+    event_id: int
+    occurrence: datetime
+    minutes: int
+    title: str
+    location: Optional[str]
+
+    @property
+    def key(self) -> str:
+        return f"reminder:{self.event_id}:{self.occurrence:%Y%m%dT%H%M}:{self.minutes}"
+
+
+class ReminderDispatcher:
+    """Fires `CalendarEvent.reminders` without polling the table every minute.
+
+    Upcoming reminder instants for the next `HORIZON` (recurring events
+    expanded) are loaded in one query into a min-heap. The loop sleeps until
+    the earliest instant, and re-plans only when the horizon runs out, when
+    `notify_changed()` is called after a local write, or when the table
+    fingerprint changes (writes from other workers). Every worker runs a
+    dispatcher; each reminder is claimed in `sent_notifications` before it
+    is sent, so only one of them sends it.
+    """
+
+    HORIZON = timedelta(hours=6)
+    # Longest reminder lead time considered when loading candidates
+    MAX_LEAD = timedelta(days=7)
+    # Reminders missed by more than this (e.g. during a restart) are dropped
+    GRACE = timedelta(minutes=2)
+    # How often to compare the table fingerprint for other workers' writes
+    CHANGE_CHECK_INTERVAL = timedelta(minutes=5)
+
+    def __init__(self):
+        self.tz = ZoneInfo(settings.timezone)
+        self._heap: List[Reminder] = []
+        self._sent: Set[Tuple[int, datetime, int]] = set()
+        self._planned_until: Optional[datetime] = None
+        self._fingerprint: Optional[Tuple] = None
+        self._dirty = True
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the dispatcher loop on the running event loop."""
+        if self._task and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+        print("Event reminder dispatcher started")
+
+    def stop(self):
+        """Stop the dispatcher loop."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+            print("Event reminder dispatcher stopped")
+
+    def notify_changed(self):
+        """Mark the plan stale after events change; safe to call from any thread."""
+        self._dirty = True
+        if self._loop and self._wakeup:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _now(self) -> datetime:
+        return datetime.now(self.tz).replace(tzinfo=None)
+
+    def _table_fingerprint(self, db) -> Tuple:
+        return tuple(db.query(
+            func.count(CalendarEvent.id),
+            func.max(CalendarEvent.updated_at)
+        ).one())
+
+    def _plan(self, now: datetime):
+        """Rebuild the heap for [now, now + HORIZON] from one query.
+
+        Runs in the threadpool; the loop awaits it, so it never races `_run`
+        over the heap.
+        """
+        horizon_end = now + self.HORIZON
+        # Bounds are aware so Postgres compares them exactly
+        query_start = now.replace(tzinfo=self.tz)
+        query_end = (horizon_end + self.MAX_LEAD).replace(tzinfo=self.tz)
+
+        db = SessionLocal()
+        try:
+            self._fingerprint = self._table_fingerprint(db)
+            events = db.query(CalendarEvent).options(load_only(
+                CalendarEvent.id,
+                CalendarEvent.title,
+                CalendarEvent.location,
+                CalendarEvent.start_time,
+                CalendarEvent.end_time,
+                CalendarEvent.recurrence_type,
+                CalendarEvent.recurrence_days,
+                CalendarEvent.recurrence_end_date,
+                CalendarEvent.reminders,
+            )).filter(
+                or_(
+                    and_(
+                        or_(
+                            CalendarEvent.recurrence_type == RecurrenceType.NONE,
+                            CalendarEvent.recurrence_type.is_(None)
+                        ),
+                        CalendarEvent.start_time >= query_start,
+                        CalendarEvent.start_time <= query_end
+                    ),
+                    and_(
+                        CalendarEvent.recurrence_type != RecurrenceType.NONE,
+                        CalendarEvent.start_time <= query_end,
+                        or_(
+                            CalendarEvent.recurrence_end_date.is_(None),
+                            CalendarEvent.recurrence_end_date >= query_start
+                        )
+                    )
+                )
+            ).all()
+        finally:
+            db.close()
+
+        heap: List[Reminder] = []
+        for event in events:
+            leads = [int(m) for m in (event.reminders or []) if m is not None and int(m) >= 0]
+            if not leads:
+                continue
+            occurrences = event_occurrences(event, now, horizon_end + self.MAX_LEAD, self.tz)
+            for occurrence, _ in occurrences:
+                for minutes in leads:
+                    fire_at = occurrence - timedelta(minutes=minutes)
+                    if now - self.GRACE <= fire_at <= horizon_end and occurrence >= now - self.GRACE:
+                        if (event.id, occurrence, minutes) not in self._sent:
+                            heap.append(Reminder(fire_at, event.id, occurrence, minutes, event.title, event.location))
+
+        heapq.heapify(heap)
+        self._heap = heap
+        self._planned_until = horizon_end
+        self._sent = {key for key in self._sent if key[1] >= now - self.GRACE}
+
+    def _changed_elsewhere(self) -> bool:
+        db = SessionLocal()
+        try:
+            return self._table_fingerprint(db) != self._fingerprint
+        finally:
+            db.close()
+
+    def _claim(self, due: List[Reminder]) -> List[Reminder]:
+        with SessionLocal() as db:
+            claimed = claim_notifications(db, [reminder.key for reminder in due])
+        return [reminder for reminder in due if reminder.key in claimed]
+
+    async def _send(self, due: List[Reminder]):
+        from app.services.telegram_service import TelegramService
+
+        due = await run_in_threadpool(self._claim, due)
+        if not due:
+            return
+        db = SessionLocal()
+        try:
+            telegram = TelegramService(db)
+            for reminder in due:
+                text = (
+                    f"🔔 <b>Нагадування</b>\n\n"
+                    f"{reminder.title}\n"
+                    f"🕒 {reminder.occurrence.strftime('%H:%M')}"
+                )
+                if reminder.minutes:
+                    text += f" (через {reminder.minutes} хв)"
+                if reminder.location:
+                    text += f"\n📍 {reminder.location}"
+                await telegram.send_message(text)
+        finally:
+            db.close()
+
+    async def _run(self):
+        last_check = self._now()
+        while True:
+            self._wakeup.clear()
+            try:
+                now = self._now()
+                if not self._dirty and now - last_check >= self.CHANGE_CHECK_INTERVAL:
+                    last_check = now
+                    if await run_in_threadpool(self._changed_elsewhere):
+                        self._dirty = True
+                if self._dirty or not self._planned_until or now >= self._planned_until:
+                    # Cleared before planning, so a change notified meanwhile plans again
+                    self._dirty = False
+                    await run_in_threadpool(self._plan, now)
+
+                due = []
+                while self._heap and self._heap[0].fire_at <= now:
+                    reminder = heapq.heappop(self._heap)
+                    self._sent.add((reminder.event_id, reminder.occurrence, reminder.minutes))
+                    due.append(reminder)
+                if due:
+                    await self._send(due)
+
+                wake_at = min(self._planned_until, last_check + self.CHANGE_CHECK_INTERVAL)
+                if self._heap:
+                    wake_at = min(wake_at, self._heap[0].fire_at)
+                timeout = max((wake_at - self._now()).total_seconds(), 0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Reminder dispatcher error: {e}")
+                self._dirty = True
+                timeout = 60
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Global dispatcher instance
+reminder_dispatcher = ReminderDispatcher()
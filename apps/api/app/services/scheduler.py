@@ -122,6 +122,16 @@ class SchedulerService:
                 )
                 print("Deadline checker scheduled (hourly)")
             
+            # Health alerts - evaluated hourly, each alert pushed once a day
+            if not user_settings or user_settings.enable_health_alerts:
+                self.scheduler.add_job(
+                    lambda: asyncio.create_task(self._run_with_db(self._push_health_alerts)),
+                    CronTrigger(minute=30),
+                    id="health_alerts",
+                    replace_existing=True
+                )
+                print("Health alerts scheduled (hourly)")
+            
         finally:
             db.close()
     
@@ -181,6 +191,21 @@ class SchedulerService:
         
         await telegram.send_message(text)
     
+    async def _push_health_alerts(self, db):
+        """Send health alerts that appeared since the last push."""
+        from app.services.telegram_service import TelegramService
+        from app.services.health_alerts import health_alerts
+        
+        alerts = health_alerts.new_alerts(db)
+        if not alerts:
+            return
+        
+        lines = [
+            f"{'⚠️' if alert['severity'] == 'warning' else '💡'} {alert['message']}"
+            for alert in alerts
+        ]
+        await TelegramService(db).send_message("🩺 <b>Здоров'я</b>\n\n" + "\n\n".join(lines))
+    
     async def _check_deadlines(self, db):
         """Check for upcoming deadlines and send reminders."""
         from app.services.telegram_service import TelegramService
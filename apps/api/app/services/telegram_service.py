@@ -7,17 +7,16 @@ from sqlalchemy.orm import Session
 from app.config import settings
 from app.models.settings import UserSettings
 from app.models.task import Task, TaskStatus
+from app.services.goal_progress import sync_goal_progress
 
 
 class TelegramService:
     """Service for Telegram bot interactions."""
     
-    BASE_URL = "https://api.telegram.org/bot"
-    
     def __init__(self, db: Session):
         self.db = db
         self.token = settings.telegram_bot_token
-        self.api_url = f"{self.BASE_URL}{self.token}"
+        self.api_url = f"{settings.telegram_api_url.rstrip('/')}/bot{self.token}"
     
     def _get_chat_id(self) -> Optional[str]:
         """Get registered chat ID from settings."""
@@ -198,6 +197,7 @@ class TelegramService:
         task.status = TaskStatus.DONE
         task.completed_at = datetime.utcnow()
         self.db.commit()
+        sync_goal_progress(self.db, task.goal_id)
         
         await self.send_message(
             f"🎉 <b>Задачу виконано!</b>\n\n"
@@ -236,20 +236,9 @@ class TelegramService:
     
     async def _cmd_water(self, chat_id: str):
         """Handle /water command - add water intake."""
-        from app.models.health import HealthLog
-        
-        today = date.today()
-        log = self.db.query(HealthLog).filter(HealthLog.log_date == today).first()
-        
-        if not log:
-            log = HealthLog(log_date=today, water_glasses=1)
-            self.db.add(log)
-        else:
-            log.water_glasses = (log.water_glasses or 0) + 1
-        
-        self.db.commit()
+        from app.services.health_logs import add_water
         
-        glasses = log.water_glasses
+        glasses = add_water(self.db, 1)
         progress = "💧" * min(glasses, 8) + "⚪" * max(0, 8 - glasses)
         
         await self.send_message(
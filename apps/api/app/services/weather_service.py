@@ -8,10 +8,9 @@ from app.config import settings
 class WeatherService:
     """Service for weather data."""
     
-    BASE_URL = "https://api.openweathermap.org/data/2.5"
-    
     def __init__(self):
         self.api_key = settings.weather_api_key
+        self.base_url = settings.weather_api_url.rstrip("/")
     
     async def get_current_weather(self, city: str) -> Dict[str, Any]:
         """Get current weather for a city."""
@@ -21,7 +20,7 @@ class WeatherService:
         try:
             async with httpx.AsyncClient() as client:
                 response = await client.get(
-                    f"{self.BASE_URL}/weather",
+                    f"{self.base_url}/weather",
                     params={
                         "q": city,
                         "appid": self.api_key,
@@ -55,7 +54,7 @@ class WeatherService:
         try:
             async with httpx.AsyncClient() as client:
                 response = await client.get(
-                    f"{self.BASE_URL}/forecast",
+                    f"{self.base_url}/forecast",
                     params={
                         "q": city,
                         "appid": self.api_key,
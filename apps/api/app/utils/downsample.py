@@ -0,0 +1,46 @@
+"""Time series downsampling for charts."""
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of at most `max_points` points to keep.
+
+    The first and last points are always kept; the rest are split into
+    equal buckets and each bucket keeps the point forming the largest
+    triangle with the previously kept point and the next bucket's average,
+    which preserves peaks and troughs that plain averaging would flatten.
+    Bucket averages come from one cumulative sum and each bucket's areas
+    are a single vector operation, so the Python loop runs once per
+    output point, not per input point. `x` must be increasing and free of
+    NaN (drop gaps before calling).
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    buckets = max_points - 2
+    # Bucket k covers interior points [edges[k], edges[k + 1])
+    edges = np.linspace(1, n - 1, buckets + 1).astype(np.int64)
+    sum_x = np.concatenate(([0.0], np.cumsum(x)))
+    sum_y = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = np.diff(edges)
+    avg_x = (sum_x[edges[1:]] - sum_x[edges[:-1]]) / sizes
+    avg_y = (sum_y[edges[1:]] - sum_y[edges[:-1]]) / sizes
+    # The last bucket looks ahead to the final point
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for k in range(buckets):
+        lo, hi = edges[k], edges[k + 1]
+        area = np.abs(
+            (x[a] - avg_x[k]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y[k] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[k + 1] = a
+    return selected
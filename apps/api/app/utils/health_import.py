@@ -0,0 +1,227 @@
+"""Streaming parsers for wearable/health exports, aggregated per day."""
+import csv
+import json
+import re
+from datetime import date, datetime, tzinfo
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from dateutil import parser as date_parser
+
+# Column / record type -> HealthLog metric
+METRIC_ALIASES = {
+    "steps": "steps",
+    "step_count": "steps",
+    "hkquantitytypeidentifierstepcount": "steps",
+    "com.google.step_count.delta": "steps",
+    "weight": "weight_kg",
+    "weight_kg": "weight_kg",
+    "body_mass": "weight_kg",
+    "hkquantitytypeidentifierbodymass": "weight_kg",
+    "com.google.weight": "weight_kg",
+    "sleep": "sleep_hours",
+    "sleep_hours": "sleep_hours",
+    "hkcategorytypeidentifiersleepanalysis": "sleep_hours",
+    "com.google.sleep.segment": "sleep_hours",
+    "energy": "energy_level",
+    "energy_level": "energy_level",
+    "mood": "mood",
+    "water_glasses": "water_glasses",
+    "water_ml": "water_ml",
+    "hkquantitytypeidentifierdietarywater": "water_ml",
+    "com.google.hydration": "water_l",
+}
+
+# How intraday samples combine into the day's value
+AGGREGATES = {
+    "steps": "sum",
+    "sleep_hours": "sum",
+    "water_glasses": "sum",
+    "weight_kg": "last",
+    "energy_level": "mean",
+    "mood": "mean",
+}
+
+DATE_FIELDS = ("date", "log_date", "day", "startdate", "start_date", "start", "timestamp", "time", "datetime")
+END_FIELDS = ("enddate", "end_date", "end")
+TYPE_FIELDS = ("type", "metric", "datatype", "data_type")
+VALUE_FIELDS = ("value", "qty", "quantity", "amount")
+
+GLASS_ML = 250
+
+
+def parse_timestamp(value: str, tz: tzinfo) -> Optional[datetime]:
+    """Parse a date/datetime; aware values are converted to `tz`, naive ones taken as local."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    if len(value) > 6 and value[-6] == " " and value[-5] in "+-":
+        # Apple Health "2023-01-01 08:00:00 +0100": drop the space for the fast ISO parser
+        value = value[:-6] + value[-5:]
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = date_parser.parse(value)
+        except (ValueError, OverflowError):
+            return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(tz).replace(tzinfo=None)
+    return parsed
+
+
+def _number(value) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(str(value).replace(",", "."))
+    except ValueError:
+        return None
+
+
+class DailyAggregator:
+    """Accumulates samples into one value per (day, metric).
+
+    Memory grows with the number of distinct days, not samples, so
+    multi-year exports with millions of rows stay small.
+    """
+
+    def __init__(self, tz: tzinfo):
+        self.tz = tz
+        # day -> metric -> [sum, count, last_at, last_value]
+        self.days: Dict[date, Dict[str, list]] = {}
+        self.rows = 0
+        self.skipped = 0
+        self._layouts: Dict[Tuple, tuple] = {}
+
+    def add(self, metric: str, value: float, at: datetime):
+        if metric == "water_ml":
+            metric, value = "water_glasses", value / GLASS_ML
+        elif metric == "water_l":
+            metric, value = "water_glasses", value * 1000 / GLASS_ML
+        slot = self.days.setdefault(at.date(), {}).setdefault(metric, [0.0, 0, None, None])
+        slot[0] += value
+        slot[1] += 1
+        if slot[2] is None or at >= slot[2]:
+            slot[2], slot[3] = at, value
+
+    def _layout(self, keys: Tuple) -> tuple:
+        """Resolve which keys hold the date, end, type, value and metric columns (cached per header)."""
+        layout = self._layouts.get(keys)
+        if layout is None:
+            normalized = {str(k).strip().lower(): k for k in keys if k is not None}
+            pick = lambda names: next((normalized[n] for n in names if n in normalized), None)
+            metrics = [(k, METRIC_ALIASES[n]) for n, k in normalized.items() if n in METRIC_ALIASES]
+            layout = self._layouts[keys] = (
+                [normalized[n] for n in DATE_FIELDS if n in normalized],
+                pick(END_FIELDS), pick(TYPE_FIELDS), pick(VALUE_FIELDS), metrics,
+            )
+        return layout
+
+    def add_record(self, record: Dict[str, str]):
+        """Take one row: wide (date + metric columns) or long (type + value [+ start/end])."""
+        self.rows += 1
+        date_keys, end_key, type_key, value_key, metric_keys = self._layout(tuple(record))
+        at = next((parse_timestamp(str(record[k]), self.tz) for k in date_keys if record.get(k)), None)
+
+        if type_key is not None and record.get(type_key):
+            metric = METRIC_ALIASES.get(str(record[type_key]).strip().lower())
+            raw = record.get(value_key) if value_key is not None else None
+            value = _number(raw)
+            end = None
+            if metric == "sleep_hours" and end_key is not None and record.get(end_key):
+                end = parse_timestamp(str(record[end_key]), self.tz)
+            if end and at:
+                # Sleep segments: duration counts, on the day you woke up; skip "in bed"
+                if raw and "inbed" in str(raw).replace("_", "").lower():
+                    self.skipped += 1
+                    return
+                value, at = (end - at).total_seconds() / 3600, end
+            if not metric or value is None or at is None:
+                self.skipped += 1
+                return
+            self.add(metric, value, at)
+            return
+
+        if at is None:
+            self.skipped += 1
+            return
+        added = False
+        for key, metric in metric_keys:
+            value = _number(record.get(key))
+            if value is not None:
+                self.add(metric, value, at)
+                added = True
+        if not added:
+            self.skipped += 1
+
+    def results(self) -> Iterator[Tuple[date, Dict[str, float]]]:
+        """Per-day values in HealthLog units, in date order."""
+        for day in sorted(self.days):
+            values = {}
+            for metric, (total, count, _, last) in self.days[day].items():
+                how = AGGREGATES[metric]
+                value = total if how == "sum" else last if how == "last" else total / count
+                if metric in ("steps", "water_glasses", "energy_level", "mood"):
+                    value = int(round(value))
+                    if metric in ("energy_level", "mood"):
+                        value = min(max(value, 1), 5)
+                else:
+                    value = round(value, 2)
+                values[metric] = value
+            yield day, values
+
+
+# One line with its ending; like newline="", only CR, LF and CRLF end lines
+LINE_RE = re.compile(r"[^\r\n]*(?:\r\n?|\n)")
+
+
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Lines (endings kept) from decoded text chunks split at arbitrary points."""
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        end = 0
+        for match in LINE_RE.finditer(pending):
+            # A trailing CR may be the first half of a CRLF in the next chunk
+            if match.end() == len(pending) and pending.endswith("\r"):
+                break
+            yield match.group()
+            end = match.end()
+        pending = pending[end:]
+    if pending:
+        yield pending
+
+
+def iter_csv(chunks: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """CSV rows as dicts from decoded text chunks, read incrementally."""
+    yield from csv.DictReader(iter_lines(chunks))
+
+
+def iter_json(chunks: Iterable[str]) -> Iterator[dict]:
+    """Objects from a top-level JSON array or NDJSON, decoded incrementally.
+
+    Raises ValueError on malformed input.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        position = 0
+        while True:
+            # Skip whitespace, array brackets and separators between objects
+            while position < len(buffer) and buffer[position] in " \t\r\n,[]\ufeff":
+                position += 1
+            if position >= len(buffer):
+                break
+            try:
+                obj, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Object continues in the next chunk
+                break
+            if not isinstance(obj, dict):
+                raise ValueError("Expected JSON objects")
+            yield obj
+            position = end
+        buffer = buffer[position:]
+    if buffer.strip(" \t\r\n,]"):
+        raise ValueError("Truncated or malformed JSON")
@@ -0,0 +1,440 @@
+"""iCalendar (RFC 5545) serialization and parsing helpers."""
+import codecs
+import hashlib
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil.rrule import rrulestr
+
+from app.config import settings
+from app.models.calendar_event import CalendarEvent, RecurrenceType, native_uid
+from app.utils.recurrence import local_naive
+
+CRLF = "\r\n"
+
+# RFC 5545 3.1: lines SHOULD NOT be longer than 75 octets
+MAX_LINE_OCTETS = 75
+
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+# Longest RRULE COUNT walked to find the series end (about 27 years of daily events)
+MAX_RRULE_COUNT = 10000
+
+RRULE_FREQ = {
+    RecurrenceType.DAILY: "FREQ=DAILY",
+    RecurrenceType.WEEKLY: "FREQ=WEEKLY",
+    RecurrenceType.BIWEEKLY: "FREQ=WEEKLY;INTERVAL=2",
+    RecurrenceType.MONTHLY: "FREQ=MONTHLY",
+    RecurrenceType.YEARLY: "FREQ=YEARLY",
+}
+
+CALENDAR_HEADER = [
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//LifeHub//EN",
+    "CALSCALE:GREGORIAN",
+    "METHOD:PUBLISH",
+]
+
+CALENDAR_FOOTER = ["END:VCALENDAR"]
+
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT property value (RFC 5545 3.3.11)."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+        .replace("\r", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line at 75 octets without splitting UTF-8 characters."""
+    if len(line.encode("utf-8")) <= MAX_LINE_OCTETS:
+        return line
+
+    parts = []
+    current = ""
+    current_octets = 0
+    # Continuation lines start with a space, which counts toward the limit
+    limit = MAX_LINE_OCTETS
+    for char in line:
+        char_octets = len(char.encode("utf-8"))
+        if current_octets + char_octets > limit:
+            parts.append(current)
+            current = ""
+            current_octets = 0
+            limit = MAX_LINE_OCTETS - 1
+        current += char
+        current_octets += char_octets
+    parts.append(current)
+    return (CRLF + " ").join(parts)
+
+
+def format_utc(value: datetime) -> str:
+    """Format a datetime as UTC DATE-TIME; naive values are taken as UTC."""
+    if value.tzinfo:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def build_rrule(event: CalendarEvent) -> Optional[str]:
+    """Build RRULE value from recurrence_type / recurrence_days."""
+    freq = RRULE_FREQ.get(event.recurrence_type)
+    if not freq:
+        return None
+
+    rule = freq
+    days = event.recurrence_days or []
+    if event.recurrence_type in (RecurrenceType.WEEKLY, RecurrenceType.BIWEEKLY) and days:
+        rule += ";BYDAY=" + ",".join(WEEKDAYS[d] for d in sorted(set(days)) if 0 <= d < 7)
+    if event.recurrence_end_date:
+        rule += f";UNTIL={format_utc(event.recurrence_end_date)}"
+    return rule
+
+
+def event_lines(event: CalendarEvent, dtstamp: str) -> List[str]:
+    """Unfolded content lines for one VEVENT."""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{event.ical_uid or native_uid(event.id)}",
+        f"DTSTAMP:{dtstamp}",
+    ]
+
+    if event.all_day:
+        start_day = event.start_time.date()
+        end_day = event.end_time.date() if event.end_time else start_day
+        lines.append(f"DTSTART;VALUE=DATE:{start_day.strftime('%Y%m%d')}")
+        # DTEND is exclusive for all-day events
+        lines.append(f"DTEND;VALUE=DATE:{(end_day + timedelta(days=1)).strftime('%Y%m%d')}")
+    else:
+        lines.append(f"DTSTART:{format_utc(event.start_time)}")
+        if event.end_time:
+            lines.append(f"DTEND:{format_utc(event.end_time)}")
+
+    lines.append(f"SUMMARY:{escape_text(event.title)}")
+    if event.description:
+        lines.append(f"DESCRIPTION:{escape_text(event.description)}")
+    if event.location:
+        lines.append(f"LOCATION:{escape_text(event.location)}")
+
+    rrule = build_rrule(event)
+    if rrule:
+        lines.append(f"RRULE:{rrule}")
+
+    if event.updated_at:
+        lines.append(f"LAST-MODIFIED:{format_utc(event.updated_at)}")
+
+    for minutes in event.reminders or []:
+        lines.extend([
+            "BEGIN:VALARM",
+            "ACTION:DISPLAY",
+            f"DESCRIPTION:{escape_text(event.title)}",
+            f"TRIGGER:-PT{int(minutes)}M",
+            "END:VALARM",
+        ])
+
+    lines.append("END:VEVENT")
+    return lines
+
+
+def serialize_calendar(events: Iterator[CalendarEvent]) -> Iterator[str]:
+    """Yield a VCALENDAR document chunk by chunk, one VEVENT per chunk."""
+    dtstamp = format_utc(datetime.now(timezone.utc))
+
+    yield CRLF.join(CALENDAR_HEADER) + CRLF
+    for event in events:
+        yield "".join(fold_line(line) + CRLF for line in event_lines(event, dtstamp))
+    yield CRLF.join(CALENDAR_FOOTER) + CRLF
+
+
+# ==================== Parsing ====================
+
+DURATION_RE = re.compile(
+    r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+
+
+def unfold_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode byte chunks and yield unfolded content lines."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    pending: Optional[str] = None
+
+    def feed(raw: str) -> Optional[str]:
+        nonlocal pending
+        raw = raw.rstrip("\r")
+        if raw[:1] in (" ", "\t"):
+            if pending is not None:
+                pending += raw[1:]
+            return None
+        complete, pending = pending, raw
+        return complete
+
+    for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for raw in lines:
+            line = feed(raw)
+            if line:
+                yield line
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        line = feed(buffer)
+        if line:
+            yield line
+    if pending:
+        yield pending
+
+
+def parse_content_line(line: str) -> Tuple[str, Dict[str, str], str]:
+    """Split a content line into (NAME, {PARAM: value}, value)."""
+    in_quotes = False
+    split_at = -1
+    for index, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ":" and not in_quotes:
+            split_at = index
+            break
+    if split_at < 0:
+        return line.upper(), {}, ""
+
+    head, value = line[:split_at], line[split_at + 1:]
+    parts = re.split(r';(?=(?:[^"]*"[^"]*")*[^"]*$)', head)
+    params = {}
+    for part in parts[1:]:
+        key, _, param_value = part.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return parts[0].upper(), params, value
+
+
+def unescape_text(value: str) -> str:
+    """Reverse TEXT escaping (RFC 5545 3.3.11)."""
+    return re.sub(
+        r"\\([\\;,nN])",
+        lambda m: "\n" if m.group(1) in "nN" else m.group(1),
+        value
+    )
+
+
+def parse_duration(value: str) -> Optional[timedelta]:
+    """Parse a DURATION value such as -PT15M or P1DT2H."""
+    match = DURATION_RE.match(value.strip())
+    if not match:
+        return None
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    delta = timedelta(
+        weeks=int(weeks or 0),
+        days=int(days or 0),
+        hours=int(hours or 0),
+        minutes=int(minutes or 0),
+        seconds=int(seconds or 0),
+    )
+    return -delta if sign == "-" else delta
+
+
+def parse_datetime(value: str, params: Dict[str, str]) -> Tuple[datetime, bool]:
+    """Parse DATE / DATE-TIME into (datetime, is_date)."""
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value[:8], "%Y%m%d"), True
+
+    parsed = datetime.strptime(value.rstrip("Z")[:15], "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        return parsed.replace(tzinfo=timezone.utc), False
+    tzid = params.get("TZID")
+    if tzid:
+        try:
+            return parsed.replace(tzinfo=ZoneInfo(tzid)), False
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    # Floating time
+    return parsed, False
+
+
+def iter_vevents(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield VEVENTs as {"props": {NAME: (params, value)}, "alarms": [...]}.
+
+    Raises ValueError when the stream is not a VCALENDAR.
+    """
+    seen_calendar = False
+    event: Optional[Dict[str, Any]] = None
+    alarm: Optional[Dict[str, Tuple[Dict[str, str], str]]] = None
+    # Components nested in a VEVENT other than VALARM are skipped
+    skip_depth = 0
+
+    for line in lines:
+        name, params, value = parse_content_line(line)
+
+        if not seen_calendar:
+            if name == "BEGIN" and value.upper() == "VCALENDAR":
+                seen_calendar = True
+                continue
+            raise ValueError("Not an iCalendar stream")
+
+        if name == "BEGIN":
+            component = value.upper()
+            if skip_depth or (event is not None and component != "VALARM"):
+                skip_depth += 1
+            elif component == "VEVENT":
+                event = {"props": {}, "alarms": []}
+            elif component == "VALARM" and event is not None:
+                alarm = {}
+            continue
+
+        if name == "END":
+            component = value.upper()
+            if skip_depth:
+                skip_depth -= 1
+            elif component == "VALARM" and alarm is not None and event is not None:
+                event["alarms"].append(alarm)
+                alarm = None
+            elif component == "VEVENT" and event is not None:
+                yield event
+                event = None
+            continue
+
+        if skip_depth:
+            continue
+        target = alarm if alarm is not None else (event["props"] if event is not None else None)
+        if target is not None and name not in target:
+            target[name] = (params, value)
+
+    if not seen_calendar:
+        raise ValueError("Not an iCalendar stream")
+
+
+def _parse_rrule(value: str, start: datetime) -> Dict[str, Any]:
+    """Map an RRULE onto recurrence_type / recurrence_days / recurrence_end_date.
+
+    Rules the model can't express (INTERVAL other than 1, or 2 for WEEKLY;
+    malformed INTERVAL/COUNT) are imported as a single, non-recurring event
+    rather than as a different series.
+    """
+    rule = {}
+    for part in value.split(";"):
+        key, _, part_value = part.partition("=")
+        rule[key.upper()] = part_value.upper()
+
+    non_recurring = {"recurrence_type": RecurrenceType.NONE, "recurrence_days": [], "recurrence_end_date": None}
+    try:
+        interval = int(rule.get("INTERVAL") or 1)
+        count = int(rule["COUNT"]) if rule.get("COUNT") else None
+    except ValueError:
+        return non_recurring
+    freq = rule.get("FREQ")
+    if interval == 2 and freq == "WEEKLY":
+        recurrence_type = RecurrenceType.BIWEEKLY
+    elif interval == 1:
+        recurrence_type = {
+            "DAILY": RecurrenceType.DAILY,
+            "WEEKLY": RecurrenceType.WEEKLY,
+            "MONTHLY": RecurrenceType.MONTHLY,
+            "YEARLY": RecurrenceType.YEARLY,
+        }.get(freq, RecurrenceType.NONE)
+    else:
+        recurrence_type = RecurrenceType.NONE
+    if recurrence_type == RecurrenceType.NONE:
+        return non_recurring
+
+    days: List[int] = []
+    if rule.get("BYDAY") and recurrence_type in (RecurrenceType.WEEKLY, RecurrenceType.BIWEEKLY):
+        for token in rule["BYDAY"].split(","):
+            code = token.strip()[-2:]
+            if code in WEEKDAYS:
+                days.append(WEEKDAYS.index(code))
+
+    end = None
+    if rule.get("UNTIL"):
+        end, _ = parse_datetime(rule["UNTIL"], {})
+    elif count is not None and count <= MAX_RRULE_COUNT:
+        # Walk to the last occurrence without keeping the series; longer
+        # COUNTs are treated as open-ended instead of iterated
+        try:
+            for end in rrulestr(value, dtstart=start):
+                pass
+        except (ValueError, TypeError):
+            end = None
+
+    return {
+        "recurrence_type": recurrence_type,
+        "recurrence_days": sorted(set(days)),
+        "recurrence_end_date": end,
+    }
+
+
+def vevent_to_values(vevent: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Convert a parsed VEVENT into calendar_events column values.
+
+    Returns None for entries that cannot be stored (no DTSTART, or a
+    RECURRENCE-ID override that would clobber its master by UID).
+    """
+    props = vevent["props"]
+    if "DTSTART" not in props or "RECURRENCE-ID" in props:
+        return None
+
+    try:
+        start, all_day = parse_datetime(props["DTSTART"][1], props["DTSTART"][0])
+        end = None
+        if "DTEND" in props:
+            end, _ = parse_datetime(props["DTEND"][1], props["DTEND"][0])
+            if all_day:
+                # Exclusive DTEND for all-day events
+                end -= timedelta(days=1)
+            # DTEND == DTSTART all-day events (and malformed feeds) would end before they start
+            tz = ZoneInfo(settings.timezone)
+            if local_naive(end, tz) < local_naive(start, tz):
+                end = start
+        elif "DURATION" in props:
+            duration = parse_duration(props["DURATION"][1])
+            end = start + duration if duration else None
+    except ValueError:
+        return None
+
+    title = unescape_text(props.get("SUMMARY", ({}, ""))[1]).strip() or "(без назви)"
+    uid = props.get("UID", ({}, ""))[1].strip()
+    if not uid:
+        # Deterministic fallback so re-imports don't duplicate
+        uid = hashlib.sha1(f"{props['DTSTART'][1]}|{title}".encode()).hexdigest() + "@import"
+
+    reminders = []
+    for alarm in vevent["alarms"]:
+        params, value = alarm.get("TRIGGER", ({}, ""))
+        if params.get("RELATED", "START").upper() != "START":
+            continue
+        if params.get("VALUE") == "DATE-TIME":
+            try:
+                fire_at, _ = parse_datetime(value, params)
+                offset = start - fire_at if bool(fire_at.tzinfo) == bool(start.tzinfo) else None
+            except ValueError:
+                offset = None
+        else:
+            trigger = parse_duration(value)
+            offset = -trigger if trigger is not None else None
+        if offset is not None and offset >= timedelta(0):
+            reminders.append(int(offset.total_seconds() // 60))
+
+    values = {
+        "ical_uid": uid[:255],
+        "title": title[:500],
+        "description": unescape_text(props["DESCRIPTION"][1]) if "DESCRIPTION" in props else None,
+        "location": unescape_text(props["LOCATION"][1])[:500] if "LOCATION" in props else None,
+        "start_time": start,
+        "end_time": end,
+        "all_day": all_day,
+        "reminders": sorted(set(reminders)),
+        "recurrence_type": RecurrenceType.NONE,
+        "recurrence_days": [],
+        "recurrence_end_date": None,
+    }
+    if "RRULE" in props:
+        values.update(_parse_rrule(props["RRULE"][1], start))
+    return values
@@ -0,0 +1,65 @@
+"""In-memory interval tree for overlap lookups."""
+from typing import Any, Generic, List, Sequence, Tuple, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class IntervalTree(Generic[K, V]):
+    """Static interval tree over closed intervals [start, end].
+
+    Intervals are sorted by start and laid out as an implicit balanced
+    binary tree; every node keeps the maximum end of its subtree so whole
+    branches can be skipped. Build is O(n log n), overlap queries are
+    O(log n + k).
+    """
+
+    def __init__(self, intervals: Sequence[Tuple[K, K, V]] = ()):
+        items = sorted(intervals, key=lambda item: item[0])
+        self._starts: List[Any] = [item[0] for item in items]
+        self._ends: List[Any] = [item[1] for item in items]
+        self._values: List[V] = [item[2] for item in items]
+        self._max_end: List[Any] = list(self._ends)
+        if items:
+            self._build(0, len(items) - 1)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _build(self, lo: int, hi: int) -> Any:
+        """Fill subtree maxima for the slice [lo, hi] and return its max end."""
+        mid = (lo + hi) // 2
+        best = self._ends[mid]
+        if lo <= mid - 1:
+            best = max(best, self._build(lo, mid - 1))
+        if mid + 1 <= hi:
+            best = max(best, self._build(mid + 1, hi))
+        self._max_end[mid] = best
+        return best
+
+    def overlap(self, start: K, end: K) -> List[V]:
+        """Return values of all intervals overlapping [start, end], ordered by start."""
+        result: List[V] = []
+        if not self._values:
+            return result
+
+        stack = [(0, len(self._values) - 1)]
+        found: List[int] = []
+        while stack:
+            lo, hi = stack.pop()
+            if lo > hi:
+                continue
+            mid = (lo + hi) // 2
+            # Nothing in this subtree ends late enough
+            if self._max_end[mid] < start:
+                continue
+            stack.append((lo, mid - 1))
+            # Right side starts even later than mid
+            if self._starts[mid] <= end:
+                if self._ends[mid] >= start:
+                    found.append(mid)
+                stack.append((mid + 1, hi))
+
+        for index in sorted(found):
+            result.append(self._values[index])
+        return result
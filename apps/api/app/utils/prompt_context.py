@@ -0,0 +1,127 @@
+"""Compact, token-budgeted rendering of user context for LLM prompts."""
+import json
+import math
+from typing import Any, Callable, Dict, List, Tuple
+
+# Sections in order of importance; unknown (caller-provided) sections follow
+SECTION_ORDER = ["schedule", "tasks", "goals", "habits", "health", "finances"]
+
+PRIORITY_RANK = {"urgent": 0, "high": 1, "medium": 2, "low": 3}
+
+# Most relevant items first within a section
+ITEM_ORDER: Dict[str, Callable[[dict], Any]] = {
+    "tasks": lambda t: (not t.get("is_mit"), PRIORITY_RANK.get(t.get("priority"), len(PRIORITY_RANK))),
+    "goals": lambda g: -(g.get("progress") or 0),
+    "habits": lambda h: -(h.get("streak") or 0),
+}
+
+MAX_VALUE_CHARS = 120
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough local token count: ~4 ASCII chars per token, ~2.5 for Cyrillic and other scripts.
+
+    Errs on the high side so a budget isn't overrun by the real tokenizer.
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return math.ceil((len(text) - non_ascii) / 4 + non_ascii / 2.5)
+
+
+def _value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        value = round(value, 1)
+        return str(int(value)) if value.is_integer() else str(value)
+    if value is None:
+        return "-"
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+    value = " ".join(value.split()).replace("|", "/")
+    return value if len(value) <= MAX_VALUE_CHARS else value[:MAX_VALUE_CHARS - 1] + "…"
+
+
+def _rows(name: str, items: list) -> Tuple[str, List[str]]:
+    """Header plus one pipe-separated row per item (field names once, in the header)."""
+    if not all(isinstance(item, dict) for item in items):
+        return f"{name}:", [_value(item) for item in items]
+    items = sorted(items, key=ITEM_ORDER[name]) if name in ITEM_ORDER else items
+    fields = list(dict.fromkeys(key for item in items for key in item))
+    rows = ["|".join(_value(item.get(field)) for field in fields) for item in items]
+    return f"{name}[{{n}}]{{{','.join(fields)}}}:", rows
+
+
+def _line(name: str, value: Any) -> str:
+    if isinstance(value, dict):
+        parts = []
+        for key, item in value.items():
+            if isinstance(item, list):
+                item = ",".join(_value(v) for v in item) if item else "-"
+            else:
+                item = _value(item)
+            parts.append(f"{key}={item}")
+        return f"{name}: {' '.join(parts)}"
+    return f"{name}: {_value(value)}"
+
+
+def compact_context(context: dict, budget: int) -> str:
+    """Render context within about `budget` tokens.
+
+    Scalar and dict sections become one `key=value` line each; lists of
+    dicts become a header naming the fields followed by one row per item.
+    Section headers are placed first in SECTION_ORDER, then list rows are
+    added round-robin by rank (e.g. MITs and urgent tasks before the
+    rest), so every section keeps its most important items when the
+    budget runs out. Dropped rows are noted as "(+k more)".
+    """
+    names = sorted(context, key=lambda n: SECTION_ORDER.index(n) if n in SECTION_ORDER else len(SECTION_ORDER))
+    lines: Dict[str, str] = {}
+    lists: Dict[str, Tuple[str, List[str]]] = {}
+    used = 0
+    for name in names:
+        value = context[name]
+        if isinstance(value, list) and value:
+            lists[name] = _rows(name, value)
+            continue
+        line = _line(name, value)
+        cost = estimate_tokens(line) + 1
+        if used + cost <= budget:
+            lines[name] = line
+            used += cost
+
+    # Headers (with room for the "(+k more)" note) before any rows
+    kept: Dict[str, List[str]] = {}
+    for name, (header, _) in lists.items():
+        cost = estimate_tokens(header) + 4
+        if used + cost <= budget:
+            kept[name] = []
+            used += cost
+
+    rank = 0
+    while True:
+        added = False
+        for name in kept:
+            rows = lists[name][1]
+            if rank >= len(rows) or len(kept[name]) != rank:
+                continue
+            cost = estimate_tokens(rows[rank]) + 1
+            if used + cost <= budget:
+                kept[name].append(rows[rank])
+                used += cost
+                added = True
+        if not added:
+            break
+        rank += 1
+
+    output = []
+    for name in names:
+        if name in lines:
+            output.append(lines[name])
+        elif name in kept:
+            header, rows = lists[name]
+            shown = kept[name]
+            header = header.replace("{n}", str(len(rows)), 1)
+            if len(shown) < len(rows):
+                header += f" (+{len(rows) - len(shown)} more)"
+            output.append("\n".join([header, *shown]))
+    return "\n".join(output)
@@ -0,0 +1,102 @@
+"""File responses with HTTP Range support (RFC 9110 single byte ranges)."""
+import mmap
+from typing import Optional, Tuple
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+# Bytes sent per ASGI message when copying from a memory map
+CHUNK_SIZE = 256 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    """Range header does not overlap the file."""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a Range header into an inclusive (start, end), or None for the whole file.
+
+    Multi-range and malformed headers are ignored (full response), as the
+    RFC allows. Raises RangeNotSatisfiable when the range lies past EOF.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+    first, last = (part.strip() for part in spec.split("-", 1))
+    try:
+        if not first:
+            # Suffix range: last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable()
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+class RangeFileResponse(Response):
+    """Serve [start, end] of a file.
+
+    Uses the server's zero-copy sendfile extension when it offers one;
+    otherwise copies from a memory map in CHUNK_SIZE slices, so memory use
+    stays flat regardless of file size.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        byte_range: Optional[Tuple[int, int]] = None,
+        media_type: str = "application/octet-stream",
+        headers: Optional[dict] = None,
+    ):
+        self.path = path
+        self.start, self.end = byte_range if byte_range else (0, size - 1)
+        status_code = 206 if byte_range else 200
+        headers = dict(headers or {})
+        headers["accept-ranges"] = "bytes"
+        headers["content-length"] = str(max(self.end - self.start + 1, 0))
+        if byte_range:
+            headers["content-range"] = f"bytes {self.start}-{self.end}/{size}"
+        super().__init__(content=None, status_code=status_code, headers=headers, media_type=media_type)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        count = self.end - self.start + 1
+        if scope["method"].upper() == "HEAD" or count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        with open(self.path, "rb") as file:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.fileno(),
+                    "offset": self.start,
+                    "count": count,
+                    "more_body": False,
+                })
+                return
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                position = self.start
+                while position <= self.end:
+                    stop = min(position + CHUNK_SIZE, self.end + 1)
+                    # Slicing copies out of the map; page faults happen off the event loop
+                    chunk = await anyio.to_thread.run_sync(mapped.__getitem__, slice(position, stop))
+                    position = stop
+                    await send({
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": position <= self.end,
+                    })
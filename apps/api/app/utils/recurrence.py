@@ -0,0 +1,60 @@
+"""Recurring calendar event expansion."""
+from datetime import datetime, timedelta, tzinfo
+from typing import List, Optional, Tuple
+
+from dateutil.rrule import rrule, DAILY, WEEKLY, MONTHLY, YEARLY, weekday
+
+from app.models.calendar_event import CalendarEvent, RecurrenceType
+
+RRULE_ARGS = {
+    RecurrenceType.DAILY: (DAILY, 1),
+    RecurrenceType.WEEKLY: (WEEKLY, 1),
+    RecurrenceType.BIWEEKLY: (WEEKLY, 2),
+    RecurrenceType.MONTHLY: (MONTHLY, 1),
+    RecurrenceType.YEARLY: (YEARLY, 1),
+}
+
+
+def local_naive(value: datetime, tz: tzinfo) -> datetime:
+    """Convert to naive wall-clock time in `tz`; naive values are already local."""
+    if value.tzinfo:
+        return value.astimezone(tz).replace(tzinfo=None)
+    return value
+
+
+def event_occurrences(
+    event: CalendarEvent,
+    window_start: datetime,
+    window_end: datetime,
+    tz: tzinfo,
+) -> List[Tuple[datetime, datetime]]:
+    """Get (start, end) of every occurrence overlapping [window_start, window_end].
+
+    Expansion runs on naive wall-clock time in `tz`, so a weekly 09:00
+    meeting stays at 09:00 across DST changes. Window bounds must be naive
+    local datetimes too.
+    """
+    start = local_naive(event.start_time, tz)
+    end = local_naive(event.end_time, tz) if event.end_time else start
+    duration = max(end - start, timedelta(0))
+
+    args = RRULE_ARGS.get(event.recurrence_type)
+    if not args:
+        if start <= window_end and end >= window_start:
+            return [(start, end)]
+        return []
+
+    freq, interval = args
+    until: Optional[datetime] = None
+    if event.recurrence_end_date:
+        until = local_naive(event.recurrence_end_date, tz)
+
+    byweekday = None
+    if freq == WEEKLY and event.recurrence_days:
+        byweekday = [weekday(d) for d in sorted(set(event.recurrence_days)) if 0 <= d < 7] or None
+
+    rule = rrule(freq, dtstart=start, interval=interval, byweekday=byweekday, until=until)
+    return [
+        (occurrence, occurrence + duration)
+        for occurrence in rule.between(window_start - duration, window_end, inc=True)
+    ]
@@ -0,0 +1 @@
+"""Development and load-testing helpers (not imported by the app)."""
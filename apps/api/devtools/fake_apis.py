@@ -0,0 +1,232 @@
+"""Local stand-ins for OpenAI, Telegram and OpenWeatherMap, for offline load tests.
+
+Run next to the API and point its settings here:
+
+    uvicorn devtools.fake_apis:app --port 9000
+
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://127.0.0.1:9000/openai/v1
+    TELEGRAM_BOT_TOKEN=fake TELEGRAM_API_URL=http://127.0.0.1:9000/telegram
+    WEATHER_API_KEY=fake WEATHER_API_URL=http://127.0.0.1:9000/openweather
+
+Behaviour per service (openai, telegram, weather) comes from environment
+variables, FAKE_<KEY> for all services or FAKE_<SERVICE>_<KEY> for one:
+
+    LATENCY_MS      base response latency (default 50; OpenAI 300)
+    JITTER_MS       extra uniform random latency (default 20)
+    ERROR_RATE      fraction of requests answered with a 500/503 (default 0)
+    RATE_LIMIT      requests per second before 429s, 0 = unlimited (default 0)
+    TOKEN_DELAY_MS  delay between streamed completion tokens (default 30)
+    TOKENS          completion length in tokens (default 120)
+
+They can also be changed at runtime with PUT /_fake/config/{service}
+and are reported, with request counters, by GET /_fake/stats.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+SERVICES = ("openai", "telegram", "weather")
+
+DEFAULTS = {
+    "latency_ms": 50.0,
+    "jitter_ms": 20.0,
+    "error_rate": 0.0,
+    "rate_limit": 0.0,
+    "token_delay_ms": 30.0,
+    "tokens": 120.0,
+}
+SERVICE_DEFAULTS = {"openai": {"latency_ms": 300.0}}
+
+WORDS = (
+    "сьогодні варто почати з найважливішої задачі потім зробити коротку перерву "
+    "і перевірити календар план на день має бути реалістичним а енергію краще "
+    "берегти для складних справ зранку"
+).split()
+
+
+def _load_config(service: str) -> Dict[str, float]:
+    config = {**DEFAULTS, **SERVICE_DEFAULTS.get(service, {})}
+    for key in config:
+        for name in (f"FAKE_{key.upper()}", f"FAKE_{service.upper()}_{key.upper()}"):
+            if os.environ.get(name):
+                config[key] = float(os.environ[name])
+    return config
+
+
+class FakeService:
+    """Latency, error injection and a token-bucket rate limit for one service."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.config = _load_config(name)
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+        self._tokens = self.config["rate_limit"]
+        self._refilled = time.monotonic()
+
+    def _allow(self) -> bool:
+        rate = self.config["rate_limit"]
+        if rate <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(rate, self._tokens + (now - self._refilled) * rate)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def simulate(self):
+        """Apply rate limit, injected errors and latency; raises HTTPException on failure."""
+        self.stats["requests"] += 1
+        if not self._allow():
+            self.stats["rate_limited"] += 1
+            raise HTTPException(status_code=429, detail="Rate limit exceeded", headers={"Retry-After": "1"})
+        await asyncio.sleep((self.config["latency_ms"] + random.uniform(0, self.config["jitter_ms"])) / 1000)
+        if random.random() < self.config["error_rate"]:
+            self.stats["errors"] += 1
+            raise HTTPException(status_code=random.choice((500, 503)), detail="Injected failure")
+
+
+services = {name: FakeService(name) for name in SERVICES}
+
+app = FastAPI(title="LifeHub fake external APIs", docs_url="/_fake/docs", openapi_url="/_fake/openapi.json")
+
+
+def _service_for(path: str) -> str:
+    return "openai" if path.startswith("/openai") else "telegram" if path.startswith("/telegram") else "weather"
+
+
+@app.exception_handler(StarletteHTTPException)
+async def http_error(request: Request, exc: StarletteHTTPException):
+    """Errors shaped like each real API's error body."""
+    service = _service_for(request.url.path)
+    if service == "openai":
+        body = {"error": {"message": exc.detail, "type": "fake_error", "code": exc.status_code}}
+    elif service == "telegram":
+        body = {"ok": False, "error_code": exc.status_code, "description": exc.detail}
+        if exc.status_code == 429:
+            body["parameters"] = {"retry_after": 1}
+    else:
+        body = {"cod": exc.status_code, "message": exc.detail}
+    return JSONResponse(body, status_code=exc.status_code, headers=exc.headers)
+
+
+@app.get("/_fake/stats")
+def get_stats():
+    return {name: {"config": s.config, **s.stats} for name, s in services.items()}
+
+
+@app.put("/_fake/config/{service}")
+def update_config(service: str, values: Dict[str, float]):
+    if service not in services:
+        raise HTTPException(status_code=404, detail="Unknown service")
+    unknown = set(values) - set(DEFAULTS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown keys: {', '.join(sorted(unknown))}")
+    services[service].config.update(values)
+    return services[service].config
+
+
+# ==================== OpenAI ====================
+
+def _completion_text(count: int) -> list:
+    return [random.choice(WORDS) + " " for _ in range(max(count, 1))]
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    service = services["openai"]
+    await service.simulate()
+    body = await request.json()
+    model = body.get("model", "gpt-4o-mini")
+    count = int(min(body.get("max_tokens") or service.config["tokens"], service.config["tokens"]))
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+    words = _completion_text(count)
+    usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words), "total_tokens": prompt_tokens + len(words)}
+    base = {"id": f"chatcmpl-fake{random.getrandbits(32):x}", "created": int(time.time()), "model": model}
+
+    if not body.get("stream"):
+        return {
+            **base,
+            "object": "chat.completion",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "".join(words)}}],
+            "usage": usage,
+        }
+
+    include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+    async def events():
+        chunk = {**base, "object": "chat.completion.chunk"}
+        yield f"data: {json.dumps({**chunk, 'choices': [{'index': 0, 'delta': {'role': 'assistant', 'content': ''}, 'finish_reason': None}]})}\n\n"
+        for word in words:
+            await asyncio.sleep(service.config["token_delay_ms"] / 1000)
+            yield f"data: {json.dumps({**chunk, 'choices': [{'index': 0, 'delta': {'content': word}, 'finish_reason': None}]}, ensure_ascii=False)}\n\n"
+        yield f"data: {json.dumps({**chunk, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
+        if include_usage:
+            yield f"data: {json.dumps({**chunk, 'choices': [], 'usage': usage})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# ==================== Telegram ====================
+
+@app.post("/telegram/bot{token}/sendMessage")
+async def send_message(token: str, request: Request):
+    await services["telegram"].simulate()
+    body = await request.json()
+    if not body.get("chat_id") or not body.get("text"):
+        raise HTTPException(status_code=400, detail="Bad Request: chat_id and text are required")
+    return {
+        "ok": True,
+        "result": {
+            "message_id": services["telegram"].stats["requests"],
+            "date": int(time.time()),
+            "chat": {"id": body["chat_id"], "type": "private"},
+            "text": body["text"],
+        },
+    }
+
+
+@app.post("/telegram/bot{token}/{method}")
+async def telegram_method(token: str, method: str):
+    await services["telegram"].simulate()
+    return {"ok": True, "result": True}
+
+
+# ==================== OpenWeatherMap ====================
+
+def _weather_item(moment: datetime, city: str) -> dict:
+    temp = 8 + 6 * random.random()
+    return {
+        "dt": int(moment.timestamp()),
+        "dt_txt": moment.strftime("%Y-%m-%d %H:%M:%S"),
+        "main": {"temp": temp, "feels_like": temp - 2, "humidity": random.randint(50, 90)},
+        "weather": [{"description": random.choice(["хмарно", "ясно", "невеликий дощ"]), "icon": random.choice(["04d", "01d", "10d"])}],
+        "wind": {"speed": round(random.uniform(1, 8), 1)},
+    }
+
+
+@app.get("/openweather/weather")
+async def current_weather(q: str = "Warsaw"):
+    await services["weather"].simulate()
+    return {"name": q, "sys": {"country": "PL"}, **_weather_item(datetime.now(timezone.utc), q)}
+
+
+@app.get("/openweather/forecast")
+async def forecast(q: str = "Warsaw", cnt: int = 40):
+    await services["weather"].simulate()
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return {
+        "city": {"name": q, "country": "PL"},
+        "cnt": cnt,
+        "list": [_weather_item(start + timedelta(hours=3 * i), q) for i in range(cnt)],
+    }
@@ -0,0 +1,56 @@
+"""Test fixtures: the app against a throwaway SQLite database."""
+import os
+import tempfile
+
+import pytest
+
+# Settings are read at import time, so the environment is set first
+_tmp = tempfile.mkdtemp(prefix="lifehub-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_tmp}/test.db",
+    "APP_ENV": "development",
+    "ATTACHMENTS_DIR": f"{_tmp}/attachments",
+    "OPENAI_API_KEY": "",
+    "TELEGRAM_BOT_TOKEN": "",
+    "WEATHER_API_KEY": "",
+})
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+
+from app.database import Base, SessionLocal, engine, init_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One client for the session: the scheduler is a singleton bound to the first event loop."""
+    init_db()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(autouse=True)
+def clean_tables(client):
+    """Every test starts with empty tables."""
+    yield
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """A separate empty SQLite database for tables shaped like older releases."""
+    legacy = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    yield legacy
+    legacy.dispose()
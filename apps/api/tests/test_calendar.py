@@ -0,0 +1,178 @@
+"""Calendar: event validation, free/busy, iCal export and import."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import inspect
+
+from app.models.calendar_event import CalendarEvent, ensure_calendar_indexes
+from app.utils.ical import MAX_RRULE_COUNT, _parse_rrule, vevent_to_values
+
+ICS = (
+    "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+    "BEGIN:VEVENT\r\nUID:standup@example.com\r\nSUMMARY:Standup\r\n"
+    "DTSTART:20261020T090000Z\r\nDTEND:20261020T091500Z\r\nEND:VEVENT\r\n"
+    "BEGIN:VEVENT\r\nUID:holiday@example.com\r\nSUMMARY:Holiday\r\n"
+    "DTSTART;VALUE=DATE:20261021\r\nDTEND;VALUE=DATE:20261021\r\nEND:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+def create_event(client, **values):
+    body = {"title": "Event", "start_time": "2026-10-20T10:00:00", "end_time": "2026-10-20T11:00:00", **values}
+    response = client.post("/api/calendar/events", json=body)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def import_ics(client, text):
+    return client.post("/api/calendar/import", files={"file": ("calendar.ics", text.encode())})
+
+
+# ==================== Events ====================
+
+def test_create_rejects_end_before_start(client):
+    response = client.post("/api/calendar/events", json={
+        "title": "Backwards", "start_time": "2026-10-20T10:00:00", "end_time": "2026-10-20T09:00:00",
+    })
+    assert response.status_code == 422
+
+
+def test_update_checks_end_against_stored_start(client):
+    event = create_event(client)
+    response = client.put(f"/api/calendar/events/{event['id']}", json={"end_time": "2026-10-20T09:00:00"})
+    assert response.status_code == 400
+    response = client.put(f"/api/calendar/events/{event['id']}", json={"start_time": "2026-10-20T10:30:00"})
+    assert response.status_code == 200
+
+
+# ==================== Free/busy ====================
+
+@pytest.mark.parametrize("query", [
+    "start=2026-10-20T08:00:00&end=2026-10-20T18:00:00%2B02:00",
+    "start=2026-10-20T06:00:00Z&end=2026-10-20T18:00:00",
+    "start=2026-10-20T06:00:00Z",
+])
+def test_freebusy_accepts_mixed_naive_and_aware_bounds(client, query):
+    create_event(client)
+    response = client.get(f"/api/calendar/freebusy?{query}")
+    assert response.status_code == 200, response.text
+    assert {"start": "2026-10-20T10:00:00", "end": "2026-10-20T11:00:00"} in response.json()["busy"]
+
+
+def test_freebusy_rejects_empty_range_across_zones(client):
+    # 08:00Z is 10:00 in Europe/Warsaw, so the range is empty
+    response = client.get("/api/calendar/freebusy?start=2026-10-20T08:00:00Z&end=2026-10-20T10:00:00")
+    assert response.status_code == 400
+
+
+# ==================== Export ====================
+
+def test_export_etag_round_trip(client):
+    create_event(client)
+    first = client.get("/api/calendar/export/ical")
+    assert first.status_code == 200
+    assert "UID:" in first.text
+    second = client.get("/api/calendar/export/ical", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+
+
+@pytest.mark.parametrize("since, status", [
+    ("{last_modified}", 304),
+    ("Mon, 19 Oct 2099 10:00:00 -0000", 304),
+    ("Mon, 01 Jan 2001 10:00:00 -0000", 200),
+    ("not a date", 200),
+])
+def test_export_if_modified_since(client, since, status):
+    create_event(client)
+    last_modified = client.get("/api/calendar/export/ical").headers["last-modified"]
+    response = client.get("/api/calendar/export/ical", headers={
+        "If-Modified-Since": since.format(last_modified=last_modified),
+    })
+    assert response.status_code == status
+
+
+# ==================== Import ====================
+
+def test_import_is_idempotent(client, db):
+    assert import_ics(client, ICS).json() == {"imported": 2, "skipped": 0}
+    assert import_ics(client, ICS).json() == {"imported": 2, "skipped": 0}
+    assert db.query(CalendarEvent).count() == 2
+
+
+def test_import_clamps_all_day_end_to_start(client, db):
+    import_ics(client, ICS)
+    holiday = db.query(CalendarEvent).filter(CalendarEvent.ical_uid == "holiday@example.com").one()
+    assert holiday.end_time == holiday.start_time
+
+
+def test_importing_own_export_updates_native_events(client, db):
+    create_event(client, title="One")
+    create_event(client, title="Two", start_time="2026-10-21T10:00:00", end_time="2026-10-21T11:00:00")
+    exported = client.get("/api/calendar/export/ical").text
+    assert import_ics(client, exported).status_code == 200
+    assert db.query(CalendarEvent).count() == 2
+
+
+def test_import_rejects_non_calendar(client):
+    assert import_ics(client, "hello").status_code == 400
+
+
+# ==================== RRULE mapping ====================
+
+START = datetime(2026, 10, 19, 9)
+
+
+def test_rrule_count_sets_series_end():
+    rule = _parse_rrule("FREQ=DAILY;COUNT=3", START)
+    assert rule["recurrence_end_date"] == datetime(2026, 10, 21, 9)
+
+
+def test_rrule_huge_count_is_open_ended():
+    rule = _parse_rrule(f"FREQ=DAILY;COUNT={MAX_RRULE_COUNT * 1000}", START)
+    assert rule["recurrence_type"].value == "daily"
+    assert rule["recurrence_end_date"] is None
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE", "biweekly"),
+    ("FREQ=DAILY;INTERVAL=3", "none"),
+    ("FREQ=MONTHLY;INTERVAL=2", "none"),
+    ("FREQ=DAILY;COUNT=x", "none"),
+])
+def test_rrule_intervals(value, expected):
+    assert _parse_rrule(value, START)["recurrence_type"].value == expected
+
+
+def test_vevent_all_day_same_day_end():
+    values = vevent_to_values({"props": {
+        "UID": ({}, "x"),
+        "DTSTART": ({"VALUE": "DATE"}, "20261019"),
+        "DTEND": ({"VALUE": "DATE"}, "20261019"),
+    }, "alarms": []})
+    assert values["end_time"] == values["start_time"]
+
+
+# ==================== Existing databases ====================
+
+def test_legacy_calendar_table_gets_indexes_and_uids(legacy_engine):
+    with legacy_engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TABLE calendar_events (id INTEGER PRIMARY KEY, title VARCHAR(500), "
+            "start_time DATETIME, end_time DATETIME, ical_uid VARCHAR(255))"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO calendar_events (id, title, start_time, end_time, ical_uid) VALUES "
+            "(1, 'native', '2026-10-20 10:00:00', '2026-10-20 09:00:00', NULL), "
+            "(2, 'old copy', '2026-10-20 10:00:00', NULL, 'dup@example.com'), "
+            "(3, 'new copy', '2026-10-20 10:00:00', NULL, 'dup@example.com')"
+        )
+        ensure_calendar_indexes(connection)
+        ensure_calendar_indexes(connection)
+        rows = connection.exec_driver_sql(
+            "SELECT id, ical_uid, end_time >= start_time FROM calendar_events ORDER BY id"
+        ).fetchall()
+
+    assert [tuple(row) for row in rows] == [(1, "1@lifehub", 1), (3, "dup@example.com", None)]
+    indexes = {index["name"]: index for index in inspect(legacy_engine).get_indexes("calendar_events")}
+    assert "ix_calendar_events_start_end" in indexes
+    assert indexes["uq_calendar_events_ical_uid"]["unique"]
@@ -0,0 +1,24 @@
+"""Goals: list summaries and databases created before auto-progress."""
+from sqlalchemy import inspect
+
+from app.models.goal import ensure_goal_columns
+
+
+def test_list_keeps_truncated_description(client):
+    goal = client.post("/api/goals", json={"title": "Run", "description": "x" * 500}).json()
+    for path in ("/api/goals", "/api/goals/active"):
+        (summary,) = [item for item in client.get(path).json() if item["id"] == goal["id"]]
+        assert summary["description"] == "x" * 200
+    assert len(client.get(f"/api/goals/{goal['id']}").json()["description"]) == 500
+
+
+def test_legacy_goals_table_gets_auto_progress(legacy_engine):
+    with legacy_engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE goals (id INTEGER PRIMARY KEY, title VARCHAR(500))")
+        connection.exec_driver_sql("INSERT INTO goals (id, title) VALUES (1, 'Old')")
+        ensure_goal_columns(connection)
+        ensure_goal_columns(connection)
+        auto_progress = connection.exec_driver_sql("SELECT auto_progress FROM goals").scalar()
+
+    assert "auto_progress" in {column["name"] for column in inspect(legacy_engine).get_columns("goals")}
+    assert not auto_progress
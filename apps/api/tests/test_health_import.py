@@ -0,0 +1,50 @@
+"""Health data import: streaming CSV/JSON parsing and error responses."""
+import pytest
+
+from app.models.health import HealthLog
+from app.utils.health_import import iter_csv, iter_lines
+
+
+def upload(client, body: bytes, format: str = "csv"):
+    return client.post(f"/api/health/import?format={format}", files={"file": (f"export.{format}", body)})
+
+
+def test_csv_import_with_bom_and_crlf(client, db):
+    body = "﻿date,steps,sleep_hours\r\n2026-09-01,1234,7.5\r\n2026-09-02,200,\r\n".encode()
+    response = upload(client, body)
+    assert response.status_code == 200, response.text
+    assert response.json()["days"] == 2
+    assert db.query(HealthLog).filter(HealthLog.steps == 1234).count() == 1
+
+
+def test_json_import(client):
+    response = upload(client, b'[{"date": "2026-09-02", "steps": 55}]', "json")
+    assert response.status_code == 200, response.text
+    assert response.json()["rows"] == 1
+
+
+@pytest.mark.parametrize("body", [
+    b"date,steps\n\xff\xfe\n",
+    b"date,steps\n2026-10-01,\"" + b"x" * 200_000 + b"\"\n",
+])
+def test_malformed_csv_is_a_client_error(client, body):
+    response = upload(client, body)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid CSV file")
+
+
+def test_malformed_json_is_a_client_error(client):
+    assert upload(client, b'[{"date": "2026-09-02", "steps": ', "json").status_code == 400
+
+
+TEXT = 'date,steps,note\r\n2026-10-01,100,"a\r\nb"\r\n2026-10-02,200,x\n2026-10-03,300,\x0c\r2026-10-04,1,y'
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 8, 1000])
+def test_lines_do_not_depend_on_chunk_boundaries(size):
+    chunks = [TEXT[i:i + size] for i in range(0, len(TEXT), size)]
+    assert list(iter_lines(chunks)) == [
+        "date,steps,note\r\n", '2026-10-01,100,"a\r\n', 'b"\r\n',
+        "2026-10-02,200,x\n", "2026-10-03,300,\x0c\r", "2026-10-04,1,y",
+    ]
+    assert [row["note"] for row in iter_csv(chunks)] == ["a\r\nb", "x", "\x0c", "y"]
@@ -0,0 +1,60 @@
+"""Notes: full-text search on existing databases and attachment references."""
+from sqlalchemy import text
+
+from app.database import engine, init_db
+from app.models.note import NoteAttachment
+from app.services.attachment_store import attachment_store
+
+
+def create_note(client, **values):
+    response = client.post("/api/notes", json={"title": "Note", "content": "text", **values})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def attach(client, note_id, content: bytes, name="file.txt"):
+    response = client.post(f"/api/notes/{note_id}/attachments", files={"file": (name, content)})
+    assert response.status_code == 200, response.text
+    return response.json()["sha256"]
+
+
+def test_search_finds_new_notes(client):
+    create_note(client, title="Groceries", content="buy apples and milk")
+    results = client.get("/api/notes/search?q=apples").json()
+    assert [note["title"] for note in results] == ["Groceries"]
+    assert "<mark>apples</mark>" in results[0]["snippet"]
+
+
+def test_init_db_indexes_notes_of_databases_without_fts(client):
+    with engine.begin() as connection:
+        for trigger in ("notes_fts_ai", "notes_fts_ad", "notes_fts_au"):
+            connection.exec_driver_sql(f"DROP TRIGGER {trigger}")
+        connection.exec_driver_sql("DROP TABLE notes_fts")
+        connection.execute(text(
+            "INSERT INTO notes (title, content, type, is_pinned, is_archived, is_starred, tags) "
+            "VALUES ('Old', 'written before search existed', 'NOTE', 0, 0, 0, '[]')"
+        ))
+    init_db()
+
+    assert [note["title"] for note in client.get("/api/notes/search?q=written").json()] == ["Old"]
+    assert len(client.get("/api/notes?search=written").json()) == 1
+
+
+def test_shared_blob_is_kept_until_last_reference_goes(client, db):
+    first = create_note(client, title="First")["id"]
+    second = create_note(client, title="Second")["id"]
+    digest = attach(client, first, b"shared")
+    assert attach(client, second, b"shared", "copy.txt") == digest
+    assert db.query(NoteAttachment).filter(NoteAttachment.sha256 == digest).count() == 2
+
+    assert client.delete(f"/api/notes/{first}").status_code == 200
+    assert attachment_store.exists(digest)
+    assert client.delete(f"/api/notes/{second}/attachments/{digest}").status_code == 200
+    assert not attachment_store.exists(digest)
+
+
+def test_clearing_attachments_releases_blob(client):
+    note = create_note(client)["id"]
+    digest = attach(client, note, b"only here")
+    assert client.put(f"/api/notes/{note}", json={"attachments": []}).status_code == 200
+    assert not attachment_store.exists(digest)
@@ -0,0 +1,41 @@
+"""Pushes are claimed once across workers and restarts."""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from app.database import SessionLocal
+from app.models.health import HealthLog
+from app.services.health_alerts import HealthAlertEngine
+from app.services.notifications import claim_notifications
+from app.services.reminder_dispatcher import Reminder, ReminderDispatcher
+
+
+def test_claim_is_won_once(db):
+    assert claim_notifications(db, ["a", "b"]) == {"a", "b"}
+    assert claim_notifications(db, ["b", "c"]) == {"c"}
+
+
+def test_concurrent_dispatchers_send_each_reminder_once():
+    due = [
+        Reminder(datetime(2026, 10, 20, 10), event_id, datetime(2026, 10, 20, 10, 30), 30, "Event", None)
+        for event_id in range(5)
+    ]
+    dispatchers = [ReminderDispatcher() for _ in range(4)]
+    with ThreadPoolExecutor(len(dispatchers)) as pool:
+        claimed = list(pool.map(lambda dispatcher: dispatcher._claim(due), dispatchers))
+    assert sorted(reminder.event_id for batch in claimed for reminder in batch) == list(range(5))
+
+
+def test_health_alert_is_pushed_once_per_day(db):
+    today = date.today()
+    for offset in range(5):
+        db.add(HealthLog(log_date=today - timedelta(days=offset), sleep_hours=4, water_glasses=1, steps=100))
+    db.commit()
+
+    # Separate engines stand in for separate workers (or a restart)
+    first, second = HealthAlertEngine(), HealthAlertEngine()
+    alerts = first.get_alerts(db, today)
+    assert alerts
+    assert len(first.new_alerts(db, today)) == len(alerts)
+    with SessionLocal() as other:
+        assert second.new_alerts(other, today) == []
+    assert first.new_alerts(db, today) == []
@@ -76,7 +76,7 @@ export default function NotesPage({ params: { locale } }: PageProps) {
                 <div className="font-medium">{note.title || 'Без назви'}</div>
               </div>
               <div className="text-sm text-dark-500 whitespace-pre-wrap">
-                {note.content}
+                {note.excerpt}
               </div>
             </Card>
           ))